@@ -12,10 +12,13 @@ import json
 from pathlib import Path
 from typing import Dict
 
+from proc.process_info import ProcessSampler
 from power.power_state import get_power_states
 from budget.policy import BudgetPolicy
 from budget.state import BudgetRuntimeState
-from budget.pid_controller import QuotaPIDController
+from budget.pid_controller import QuotaPIDController, QUOTA_MAX_PCT, QUOTA_MIN_PCT
+from power.live_model import RecursiveLeastSquares
+from telemetry.periodic import PeriodicScheduler
 from budget.enforcers import (
     apply_nice,
     reset_nice,
@@ -29,16 +32,35 @@ from budget.enforcers import (
 CONFIG_DIR  = Path.home() / ".akxos"
 CONFIG_FILE = CONFIG_DIR / "budgets.json"
 
+# Ticks of (util, freq, power) before the quota feedforward is trusted
+QUOTA_FF_MIN_UPDATES = 3
+
 
 class BudgetEngine:
 
-    def __init__(self, interval: float = 1.0):
+    def __init__(self, interval: float = 1.0, cpu_backend: str = "stat"):
         self.interval = interval
         self.policies:         Dict[int, BudgetPolicy]        = {}
         self.runtime:          Dict[int, BudgetRuntimeState]  = {}
         self.enforced:         Dict[int, bool]                = {}
         self._pid_controllers: Dict[int, QuotaPIDController] = {}
-        self._running: bool = False
+        # Per-PID online power = g · (util × GHz) + c, for quota feedforward
+        self._quota_models:    Dict[int, RecursiveLeastSquares] = {}
+        self.feedforward = True
+        self._n_cpus = 1
+        # Tick timing of the latest run(): scheduler.stats
+        self.scheduler = None
+        self._sampler = ProcessSampler(pids=(), backend=cpu_backend)
+        # Optional running TelemetrySampler: V/f averaged over each tick
+        self.telemetry_sampler = None
+        # Optional PowerMeter: control on measured instead of modeled power
+        self.power_meter = None
+        # Leakage model (power.power_model.LEAK_MODELS); "thermal" tracks SoC heating
+        self.leak_model = "linear"
+        # Optional EnergyAccountant: per-process joules of budgeted PIDs
+        self.energy = None
+        # Optional SnapshotCache: reuse a fresh frame from another consumer
+        self.snapshot_cache = None
 
         self._load_policies()
 
@@ -59,6 +81,7 @@ class BudgetEngine:
                 "window_size":     p.window_size,
                 "violation_count": p.violation_count,
                 "active":          p.active,
+                "starttime":       p.starttime,
             }
             for p in self.policies.values()
         ]
@@ -72,6 +95,7 @@ class BudgetEngine:
             with open(CONFIG_FILE, "r") as f:
                 data = json.load(f)
 
+            stale = False
             for entry in data:
                 policy = BudgetPolicy(
                     pid            = entry["pid"],
@@ -81,6 +105,15 @@ class BudgetEngine:
                 )
                 policy.violation_count = entry.get("violation_count", 0)
                 policy.active          = entry.get("active", True)
+                policy.starttime       = entry.get("starttime")
+
+                # The budgeted process exited and its PID was reused
+                # while the engine was down: the budget does not apply.
+                if not policy.bind():
+                    print(f"[akxOS] PID {policy.pid} was reused; "
+                          f"dropping its persisted budget.")
+                    stale = True
+                    continue
 
                 self.policies[policy.pid] = policy
                 self.runtime [policy.pid] = BudgetRuntimeState(
@@ -93,6 +126,9 @@ class BudgetEngine:
                         pid=policy.pid
                     )
 
+            self._sync_sampler()
+            if stale:
+                self._save_policies()
             print("[akxOS] Loaded persisted budgets.")
 
         except Exception as e:
@@ -103,6 +139,10 @@ class BudgetEngine:
     # =================================================
 
     def add_policy(self, policy: BudgetPolicy):
+        if not policy.bind():
+            print(f"[akxOS] PID {policy.pid} is no longer process "
+                  f"{policy.identity}; budget not added.")
+            return
         self.policies[policy.pid] = policy
         self.runtime [policy.pid] = BudgetRuntimeState(
             pid=policy.pid, window_size=policy.window_size
@@ -114,6 +154,7 @@ class BudgetEngine:
                 pid=policy.pid
             )
 
+        self._sync_sampler()
         self._save_policies()
         print(f"[akxOS] Budget added: {policy}")
 
@@ -127,9 +168,21 @@ class BudgetEngine:
         if pid in self._pid_controllers:
             self._pid_controllers[pid].reset()
             del self._pid_controllers[pid]
+        self._quota_models.pop(pid, None)
+        self._sync_sampler()
         self._save_policies()
         print(f"[akxOS] Budget removed for PID {pid}")
 
+    def set_cpu_backend(self, backend: str):
+        """Switch CPU accounting ('stat', 'schedstat', 'auto')."""
+        self._sampler.close()
+        self._sampler = ProcessSampler(pids=self.policies.keys(),
+                                       backend=backend)
+
+    def _sync_sampler(self):
+        """Only budgeted PIDs are sampled; the rest of /proc is skipped."""
+        self._sampler.pids = self.policies.keys()
+
     def list_policies(self):
         if not self.policies:
             print("[akxOS] No active budgets.")
@@ -145,49 +198,89 @@ class BudgetEngine:
 
     def run(self, duration: float = None):
         print("[akxOS] Budget engine started.")
-        self._running = True
-        start_time = time.time()
+        self.scheduler = PeriodicScheduler(self.interval)
 
-        # Catch SIGTERM (systemd stop / kill) so cleanup always runs
+        # Catch SIGTERM (systemd stop / kill) so cleanup always runs.
+        # stop() is signal-safe; anything that takes a lock is not.
         def _sigterm_handler(signum, frame):
-            print("\n[akxOS] SIGTERM received, shutting down cleanly...")
-            self._running = False
+            self.scheduler.stop()
 
         signal.signal(signal.SIGTERM, _sigterm_handler)
 
         try:
-            while self._running:
+            for _ in self.scheduler.ticks(duration or None):
                 self._control_step()
-
-                if duration and (time.time() - start_time) >= duration:
-                    break
-
-                time.sleep(self.interval)
+            if self.scheduler.stopped:
+                print("\n[akxOS] SIGTERM received, shutting down cleanly...")
 
         except KeyboardInterrupt:
             print("\n[akxOS] Budget engine stopped.")
 
+        finally:
+            self.scheduler.close()
+            print(f"[akxOS] Timing: {self.scheduler.stats.summary()}")
+            self._reset_all()
+            if self.energy is not None:
+                self.energy.checkpoint()
+
+    async def run_async(self, frames, duration: float = None):
+        """
+        Enforce on frames from an async iterator (stream_power_states)
+        instead of sampling. Its interval replaces `interval`. Frames may
+        hold more processes than the budgeted ones, so a logger can
+        share the stream.
+        """
+        print("[akxOS] Budget engine started.")
+        start_time = time.time()
+        try:
+            async for frame in frames:
+                self.step(frame)
+                if duration and (time.time() - start_time) >= duration:
+                    break
         finally:
             self._reset_all()
+            if self.energy is not None:
+                self.energy.checkpoint()
 
     # =================================================
     # Control Step
     # =================================================
 
     def _control_step(self):
-        # Single power snapshot per tick — no re-fetching inside enforcers
-        power_states = get_power_states()
-        power_map = {ps["pid"]: ps for ps in power_states}
-
+        # Single power snapshot per tick — no re-fetching inside enforcers.
+        # The sampler only reads budgeted PIDs; exited PIDs are simply absent.
+        frame = get_power_states(leak_model=self.leak_model,
+                                 sampler=self._sampler,
+                                 telemetry_sampler=self.telemetry_sampler,
+                                 power_meter=self.power_meter,
+                                 cache=self.snapshot_cache)
+        self.step(frame)
+
+    def step(self, frame):
+        """One control tick on a PowerFrame holding the budgeted PIDs."""
+        self._n_cpus = len(frame.cores.cpu) if frame.cores is not None else 1
+        if self.energy is not None:
+            # The frame may be a full scan shared with a logger; only the
+            # budgeted processes are accounted here.
+            rows = [i for i in map(frame.index_of, self.policies) if i is not None]
+            self.energy.add(frame.take(sorted(rows)))
+
+        reused = []
         for pid, policy in self.policies.items():
             if not policy.active:
                 continue
-            if pid not in power_map:
+            i = frame.index_of(pid)
+            if i is None:
+                continue
+            if not policy.bind(frame.identity(i)):
+                reused.append(pid)
                 continue
+            current_state = frame.row(i)
 
             state         = self.runtime[pid]
-            current_state = power_map[pid]
-            avg_power     = state.add_sample(current_state["p_total_mw"])
+            load          = (current_state["cpu_percent"] * self._n_cpus
+                             * current_state["freq_hz"] / 1e9)
+            avg_power     = state.add_sample(current_state["p_total_mw"], load)
             violated      = state.check_violation(policy.power_limit_mw)
 
             if violated:
@@ -195,6 +288,31 @@ class BudgetEngine:
 
             self._apply_enforcement(pid, policy, current_state, avg_power, violated)
 
+        for pid in reused:
+            self._expire_policy(pid)
+
+    def _expire_policy(self, pid: int):
+        """
+        Drop the budget of a process whose PID now belongs to another.
+
+        Per-PID enforcement (nice, cgroup membership) is not reset: the
+        budgeted process is gone and resetting would act on the new,
+        unrelated one. Only the global frequency cap is released.
+        """
+        policy = self.policies.pop(pid)
+        print(f"[akxOS] PID {pid} was reused (was {policy.identity}); "
+              f"budget dropped.")
+        if policy.mode == "dvfs_cap" and self.enforced.get(pid):
+            reset_freq_cap()
+        self.runtime.pop(pid, None)
+        self.enforced.pop(pid, None)
+        ctrl = self._pid_controllers.pop(pid, None)
+        if ctrl is not None:
+            ctrl.reset()
+        self._quota_models.pop(pid, None)
+        self._sync_sampler()
+        self._save_policies()
+
     # =================================================
     # Enforcement Logic
     # =================================================
@@ -236,14 +354,39 @@ class BudgetEngine:
             self.enforced[pid] = violated
 
         elif policy.mode == "cpu_quota":
-            self._apply_cpu_quota_pi(pid, policy, avg_power_mw)
+            self._apply_cpu_quota_pi(pid, policy, avg_power_mw, current_state)
             self.enforced[pid] = violated
 
+    def _quota_feedforward(self, pid: int, policy: BudgetPolicy,
+                           state: BudgetRuntimeState, freq_hz: float):
+        """
+        Update the PID's online power model with the window averages in
+        `state` and return the quota (% of one CPU) it predicts meets the
+        budget at `freq_hz`, or None while the model is still unreliable.
+
+        Model: P = g · (U · f_GHz) + c, with U the process's utilisation
+        in % of one CPU, so the gain tracks frequency changes directly.
+        It is fitted to the same averaged power the PI loop sees, so the
+        two agree on what the process draws.
+        """
+        f_ghz = freq_hz / 1e9
+        model = self._quota_models.get(pid)
+        if model is None:
+            model = self._quota_models[pid] = RecursiveLeastSquares([0.0, 0.0])
+        model.update([state.last_load_avg, 1.0], state.last_avg)
+
+        gain, offset = model.theta
+        if model.n_updates < QUOTA_FF_MIN_UPDATES or gain <= 0 or f_ghz <= 0:
+            return None
+        quota = (policy.power_limit_mw - offset) / (gain * f_ghz)
+        return max(QUOTA_MIN_PCT, min(quota, QUOTA_MAX_PCT))
+
     def _apply_cpu_quota_pi(self,
-                             pid:          int,
-                             policy:       BudgetPolicy,
-                             avg_power_mw: float):
-        """PI closed-loop controller for cpu_quota mode."""
+                             pid:           int,
+                             policy:        BudgetPolicy,
+                             avg_power_mw:  float,
+                             current_state: dict = None):
+        """PI closed-loop controller for cpu_quota mode, with RLS feedforward."""
         if avg_power_mw <= 0:
             return
 
@@ -252,9 +395,15 @@ class BudgetEngine:
             ctrl = QuotaPIDController(pid=pid)
             self._pid_controllers[pid] = ctrl
 
+        feedforward = None
+        if self.feedforward and current_state is not None:
+            feedforward = self._quota_feedforward(
+                pid, policy, self.runtime[pid], current_state["freq_hz"])
+
         new_quota_pct = ctrl.step(
             current_power_mw = avg_power_mw,
             budget_mw        = policy.power_limit_mw,
+            feedforward_pct  = feedforward,
         )
 
         period_us = 100_000
@@ -262,13 +411,14 @@ class BudgetEngine:
 
         error  = policy.power_limit_mw - avg_power_mw
         db_tag = "[DB]" if abs(error) < ctrl.deadband_mw else "    "
+        ff_tag = f"ff={feedforward:.1f}%  " if feedforward is not None else ""
 
         print(
             f"[akxOS][quota][PI]{db_tag} PID {pid}: "
             f"avg={avg_power_mw:.1f} mW  "
             f"budget={policy.power_limit_mw:.1f} mW  "
             f"err={error:+.1f} mW  "
-            f"quota={new_quota_pct:.1f}%  "
+            f"quota={new_quota_pct:.1f}%  {ff_tag}"
             f"({quota_us}/{period_us} µs)"
         )
 
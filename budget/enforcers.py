@@ -7,7 +7,9 @@ User-space enforcement primitives for power budgeting.
 """
 
 import os
-from pathlib import Path
+
+from hostfs.roots import proc_root, sys_root
+from telemetry.topology import topology
 
 
 # ==========================================================
@@ -19,7 +21,7 @@ def _warn(msg: str):
 
 
 def _pid_exists(pid: int) -> bool:
-    return Path(f"/proc/{pid}").exists()
+    return proc_root().path(str(pid)).exists()
 
 
 # ==========================================================
@@ -56,28 +58,23 @@ def reset_nice(pid: int):
 # 2. DVFS Frequency Cap
 # ==========================================================
 
-CPU_SYS_PATH = Path("/sys/devices/system/cpu")
-CPU0_FREQ    = CPU_SYS_PATH / "cpu0/cpufreq"
-
-
-def _cpu_list():
-    return sorted(
-        p for p in CPU_SYS_PATH.glob("cpu[0-9]*") if p.is_dir()
-    )
+def _policies():
+    return topology().policies
 
 
 def get_current_freq() -> int | None:
-    path = CPU0_FREQ / "scaling_cur_freq"
-    if path.exists():
-        return int(path.read_text().strip())
+    """Current frequency (kHz) of the first cpufreq policy."""
+    for policy in _policies():
+        try:
+            with open(policy.attr("scaling_cur_freq")) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            pass
     return None
 
 
 def get_available_freqs() -> list[int]:
-    path = CPU0_FREQ / "scaling_available_frequencies"
-    if path.exists():
-        return sorted(int(f) for f in path.read_text().split())
-    return []
+    return topology().available_freqs_khz()
 
 
 def apply_budget_dvfs(current_power_mw: float,
@@ -109,10 +106,10 @@ def apply_budget_dvfs(current_power_mw: float,
     target_freq = max(min(freqs), min(target_freq, max(freqs)))
 
     try:
-        for cpu in _cpu_list():
-            path = cpu / "cpufreq" / "scaling_max_freq"
-            if path.exists():
-                path.write_text(str(target_freq))
+        # One write per policy: CPUs in a policy share scaling_max_freq
+        for policy in _policies():
+            with open(policy.attr("scaling_max_freq"), "w") as f:
+                f.write(str(target_freq))
         print(
             f"[akxOS][dvfs] "
             f"{current_power_mw:.1f} mW → budget {budget_mw:.1f} mW | "
@@ -125,11 +122,10 @@ def apply_budget_dvfs(current_power_mw: float,
 def reset_freq_cap():
     """Reset scaling_max_freq to the hardware maximum."""
     try:
-        for cpu in _cpu_list():
-            max_path   = cpu / "cpufreq" / "cpuinfo_max_freq"
-            scale_path = cpu / "cpufreq" / "scaling_max_freq"
-            if max_path.exists() and scale_path.exists():
-                scale_path.write_text(max_path.read_text().strip())
+        for policy in _policies():
+            if policy.max_khz:
+                with open(policy.attr("scaling_max_freq"), "w") as f:
+                    f.write(str(policy.max_khz))
         print("[akxOS] Reset frequency cap to hardware maximum.")
     except Exception:
         pass
@@ -139,7 +135,8 @@ def reset_freq_cap():
 # 3. CPU Quota (cgroups v2)
 # ==========================================================
 
-CGROUP_ROOT = Path("/sys/fs/cgroup")
+def _cgroup_root():
+    return sys_root().path("fs/cgroup")
 
 
 def apply_cgroup_quota(pid: int, quota_us: int, period_us: int = 100_000):
@@ -153,7 +150,7 @@ def apply_cgroup_quota(pid: int, quota_us: int, period_us: int = 100_000):
         _warn(f"PID {pid} not found.")
         return
 
-    group_path = CGROUP_ROOT / f"akxos_{pid}"
+    group_path = _cgroup_root() / f"akxos_{pid}"
 
     try:
         group_path.mkdir(exist_ok=True)
@@ -173,11 +170,11 @@ def reset_cgroup(pid: int):
     Guards against the process already being dead before attempting the
     cgroup.procs write.
     """
-    group_path = CGROUP_ROOT / f"akxos_{pid}"
+    group_path = _cgroup_root() / f"akxos_{pid}"
 
     try:
         if _pid_exists(pid):
-            (CGROUP_ROOT / "cgroup.procs").write_text(str(pid))
+            (_cgroup_root() / "cgroup.procs").write_text(str(pid))
 
         if group_path.exists():
             group_path.rmdir()
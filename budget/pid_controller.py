@@ -10,6 +10,14 @@ Control law:
     delta_quota  = Kp * e(t) + Ki * integral(t)
     quota(t)     = clamp(quota(t-1) + delta_quota, MIN, MAX)
 
+With a feedforward quota q_ff (the model's estimate of the quota that
+meets the budget), the update also pulls toward q_ff:
+    ff_term(t)   = w(t) * clamp(q_ff - quota(t-1), ±FF_MAX_STEP)
+    quota(t)     = clamp(quota(t-1) + delta_quota + ff_term, MIN, MAX)
+w(t) ramps from 0 to 1 over FF_RAMP_STEPS steps after q_ff appears, so
+the handover from pure PI is gradual. Inside the deadband ff_term is 0,
+like the integral, so the model cannot move a settled quota.
+
 """
 
 import time
@@ -22,6 +30,9 @@ DEFAULT_KI           = 0.01
 DEFAULT_DEADBAND_MW  = 10.0
 DEFAULT_WINDUP_LIMIT = 150.0
 
+DEFAULT_FF_MAX_STEP_PCT = 10.0    # most the feedforward moves the quota per step
+DEFAULT_FF_RAMP_STEPS   = 5
+
 
 class QuotaPIDController:
     """PI controller with deadband for a single budgeted process."""
@@ -31,18 +42,24 @@ class QuotaPIDController:
                  kp:           float = DEFAULT_KP,
                  ki:           float = DEFAULT_KI,
                  deadband_mw:  float = DEFAULT_DEADBAND_MW,
-                 windup_limit: float = DEFAULT_WINDUP_LIMIT):
+                 windup_limit: float = DEFAULT_WINDUP_LIMIT,
+                 ff_max_step_pct: float = DEFAULT_FF_MAX_STEP_PCT,
+                 ff_ramp_steps:   int   = DEFAULT_FF_RAMP_STEPS):
         self.pid          = pid
         self.kp           = kp
         self.ki           = ki
         self.deadband_mw  = deadband_mw
         self.windup_limit = windup_limit
+        self.ff_max_step_pct = ff_max_step_pct
+        self.ff_ramp_steps   = ff_ramp_steps
 
         self._integral:       float = 0.0
         self._last_time:      float = time.monotonic()
         self._last_quota_pct: float = QUOTA_MAX_PCT
+        self._ff_steps:       int   = 0
 
-    def step(self, current_power_mw: float, budget_mw: float) -> float:
+    def step(self, current_power_mw: float, budget_mw: float,
+             feedforward_pct: float = None) -> float:
         """
         Run one PI control step.
 
@@ -52,6 +69,11 @@ class QuotaPIDController:
             Windowed-average power from BudgetRuntimeState.
         budget_mw : float
             Power budget setpoint.
+        feedforward_pct : float, optional
+            Model-predicted quota for the budget (e.g. from an online
+            power model), computed from the same averaged power as
+            `current_power_mw`. Outside the deadband the quota is pulled
+            toward it, rate-limited; None drops it and restarts the ramp.
 
         Returns
         -------
@@ -78,13 +100,23 @@ class QuotaPIDController:
             p_term = self.kp * error
             i_term = self.ki * self._integral
 
-        new_quota_pct = self._last_quota_pct + p_term + i_term
+        ff_term = 0.0
+        if feedforward_pct is None:
+            self._ff_steps = 0
+        elif not in_deadband:
+            self._ff_steps = min(self._ff_steps + 1, self.ff_ramp_steps)
+            pull = feedforward_pct - self._last_quota_pct
+            pull = max(-self.ff_max_step_pct, min(pull, self.ff_max_step_pct))
+            ff_term = self._ff_steps / self.ff_ramp_steps * pull
+
+        new_quota_pct = self._last_quota_pct + p_term + i_term + ff_term
         new_quota_pct = max(QUOTA_MIN_PCT, min(new_quota_pct, QUOTA_MAX_PCT))
         self._last_quota_pct = new_quota_pct
         return new_quota_pct
 
     def reset(self):
         self._integral       = 0.0
+        self._ff_steps       = 0
         self._last_quota_pct = QUOTA_MAX_PCT
         self._last_time      = time.monotonic()
 
@@ -7,7 +7,9 @@ Defines declarative power budget policies.
 """
 
 from dataclasses import dataclass, field
-from typing import Literal
+from typing import Literal, Optional
+
+from proc.identity import ProcessIdentity
 
 
 EnforcementMode = Literal["sched_weight", "dvfs_cap", "cpu_quota"]
@@ -30,6 +32,11 @@ class BudgetPolicy:
     violation_count: int  = 0
     active:          bool = True
 
+    # Field 22 of /proc/<pid>/stat for the process this budget was set
+    # on. None until bound; a different value later means the PID has
+    # been reused and the budget no longer applies.
+    starttime:       Optional[int] = None
+
     # ------------------------------------------------------------------
     # Validation
     # ------------------------------------------------------------------
@@ -50,6 +57,33 @@ class BudgetPolicy:
                 f"and {WINDOW_SIZE_MAX}, got {self.window_size}."
             )
 
+    # ------------------------------------------------------------------
+    # Identity
+    # ------------------------------------------------------------------
+
+    @property
+    def identity(self) -> Optional[ProcessIdentity]:
+        """The budgeted process, or None if not yet bound."""
+        if self.starttime is None:
+            return None
+        return ProcessIdentity(self.pid, self.starttime)
+
+    def bind(self, identity: Optional[ProcessIdentity] = None) -> bool:
+        """
+        Bind to `identity` (default: whoever holds `pid` now) if unbound.
+
+        Returns False if the policy is bound to a different process,
+        i.e. the PID has been reused.
+        """
+        if identity is None:
+            identity = ProcessIdentity.of(self.pid)
+            if identity is None:
+                return True     # not running (yet); bind when seen
+        if self.starttime is None:
+            self.starttime = identity.starttime
+            return True
+        return self.starttime == identity.starttime
+
     # ------------------------------------------------------------------
     # Utility
     # ------------------------------------------------------------------
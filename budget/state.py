@@ -22,13 +22,16 @@ class BudgetRuntimeState:
 
         # Sliding window of recent power samples (mW)
         self.samples: Deque[float] = deque(maxlen=window_size)
+        # Matching window of load samples (utilisation × GHz), if given
+        self.loads: Deque[float] = deque(maxlen=window_size)
 
         self.last_avg: float = 0.0
+        self.last_load_avg: float = 0.0
         self.violated: bool = False
 
     # ---------- Core Operations ----------
 
-    def add_sample(self, power_mw: float) -> float:
+    def add_sample(self, power_mw: float, load: float = None) -> float:
         """
         Add a new power sample and update moving average.
 
@@ -36,6 +39,9 @@ class BudgetRuntimeState:
         ----------
         power_mw : float
             Total power consumption in milliwatts
+        load : float, optional
+            What drove that power (e.g. utilisation × GHz), averaged
+            over the same window into `last_load_avg`
 
         Returns
         -------
@@ -44,6 +50,9 @@ class BudgetRuntimeState:
         """
         self.samples.append(power_mw)
         self.last_avg = self.average()
+        if load is not None:
+            self.loads.append(load)
+            self.last_load_avg = sum(self.loads) / len(self.loads)
         return self.last_avg
 
     def average(self) -> float:
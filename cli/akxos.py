@@ -7,14 +7,29 @@ Includes power monitoring, logging, and power budgeting.
 """
 
 import argparse
+import asyncio
 import os
-import time
+import signal
 from datetime import datetime
 
-from proc.process_info import get_process_stats
-from power.power_state import get_power_states
-from power.power_model import compute_leakage_power
+import numpy as np
+
+from proc.process_info import ProcessSampler, CPU_BACKENDS
+from proc.thread_info import ThreadSampler
+from power.calibration import (
+    CALIBRATION_FILE, DEFAULT_HOST_TARGET, DEFAULT_TARGET, fit_logs,
+    save_calibration,
+)
+from power.energy import ENERGY_FILE, EnergyAccountant
+from power.live_model import LivePowerModel
+from power.power_state import (
+    get_power_states, get_thread_power_states, stream_power_states,
+)
+from power.snapshot_cache import SNAPSHOT_FILE, SnapshotCache
 from log.logger import PowerLogger
+from telemetry.periodic import PeriodicScheduler
+from telemetry.power_meter import PowerMeter
+from telemetry.sampler import TelemetrySampler
 
 from budget.budget_engine import BudgetEngine
 from budget.policy import BudgetPolicy
@@ -25,6 +40,21 @@ from budget.policy import BudgetPolicy
 
 budget_engine = BudgetEngine(interval=1.0)
 
+# Shared by the ps/power views so live refresh only blocks on the first tick
+process_sampler = ProcessSampler()
+
+# Background telemetry (--telemetry-hz); None reads V/f/T once per tick
+telemetry_sampler = None
+
+# Measured power (--power-source measured); None uses the power model
+power_meter = None
+
+# Online-adapted model (power --live-model); needs power_meter
+live_model = None
+
+# Frame reuse within --snapshot-max-age (optionally across processes)
+snapshot_cache = None
+
 
 # --------------------------------------------------
 # Visual Styling
@@ -45,17 +75,18 @@ def clear_screen():
 # --------------------------------------------------
 
 def display_ps():
-    processes = get_process_stats()
+    procs = process_sampler.sample_columns()
+    top = np.argsort(-procs.cpu, kind="stable")[:15]
 
     print(f"{'PID':<8}{'Name':<25}{'CPU%':<10}{'Mem(KB)':<10}")
     print("-" * 60)
 
-    for p in sorted(processes, key=lambda x: x["cpu"], reverse=True)[:15]:
+    for i in top:
         print(
-            f"{p['pid']:<8}"
-            f"{p['name']:<25}"
-            f"{p['cpu']:<10.2f}"
-            f"{p['mem']:<10}"
+            f"{procs.pid[i]:<8}"
+            f"{procs.name[i]:<25}"
+            f"{procs.cpu[i]:<10.2f}"
+            f"{procs.mem[i]:<10}"
         )
 
 
@@ -63,24 +94,27 @@ def display_ps():
 # Power Table
 # --------------------------------------------------
 
-from power.power_model import compute_leakage_power
+from power.power_model import LEAK_MODELS, compute_leakage_power_batch
 
 def display_power(leak_model="linear", compare=False):
 
     # ------------------------------
-    # Get baseline snapshot (linear)
+    # Get snapshot (selected leakage model)
     # ------------------------------
-    base_states = get_power_states(core_id=0, leak_model="linear")
+    base_states = get_power_states(
+        core_id=0, leak_model=leak_model, sampler=process_sampler,
+        telemetry_sampler=telemetry_sampler, power_meter=power_meter,
+        cache=snapshot_cache,
+    )
+    measured_mw = base_states.measured_mw
+    if live_model is not None and live_model.update(base_states):
+        base_states = live_model.apply(base_states)
 
-    # Sort by CPU%
-    base_states = sorted(
-        base_states,
-        key=lambda x: x["cpu_percent"],
-        reverse=True
-    )[:10]
+    # Top 10 by CPU%
+    base_states = base_states.top(10, key="cpu_percent")
 
     # ==================================================
-    # COMPARE MODE (Linear vs Quad vs Exp)
+    # COMPARE MODE (Linear vs Quad vs Exp vs Thermal)
     # ==================================================
     if compare:
 
@@ -89,27 +123,31 @@ def display_power(leak_model="linear", compare=False):
             f"{'Linear(mW)':<14}"
             f"{'Quad(mW)':<14}"
             f"{'Exp(mW)':<14}"
+            f"{'Therm(mW)':<14}"
         )
-        print("-" * 70)
+        print("-" * 84)
 
-        for ps in base_states:
+        # All three models for all rows in one pass each
+        mem = base_states.mem_kb
+        V   = base_states.voltage_v
 
-            mem = ps["mem_kb"]
-            V = ps["voltage_v"]
+        linear = compute_leakage_power_batch(mem, V, "linear")
+        quad   = compute_leakage_power_batch(mem, V, "quadratic")
+        exp    = compute_leakage_power_batch(mem, V, "exponential")
+        therm  = compute_leakage_power_batch(mem, V, "thermal",
+                                             base_states.temperature_c)
 
-            linear = compute_leakage_power(mem, V, "linear")
-            quad   = compute_leakage_power(mem, V, "quadratic")
-            exp    = compute_leakage_power(mem, V, "exponential")
-
-            S = (exp - linear) / max(linear, 1e-6)
+        S = (exp - linear) / np.maximum(linear, 1e-6)
 
+        for i in range(len(base_states)):
             print(
-                f"{ps['pid']:<6}"
-                f"{ps['name']:<18}"
-                f"{linear:<14.4f}"
-                f"{quad:<14.4f}"
-                f"{exp:<14.4f}"
-                f"{S:<10.3f}"
+                f"{base_states.pid[i]:<6}"
+                f"{base_states.name[i]:<18}"
+                f"{linear[i]:<14.4f}"
+                f"{quad[i]:<14.4f}"
+                f"{exp[i]:<14.4f}"
+                f"{therm[i]:<14.4f}"
+                f"{S[i]:<10.3f}"
             )
 
         return
@@ -151,14 +189,76 @@ def display_power(leak_model="linear", compare=False):
             f"{I:<12.3f}"
         )
 
+    cores = base_states.cores
+    if cores is not None and len(cores.cpu):
+        print("\nPer-core: " + "  ".join(
+            f"cpu{c} {100 * b:.0f}% @{f / 1e6:.0f}MHz {p:.1f}mW"
+            for c, b, f, p in zip(cores.cpu.tolist(), cores.busy.tolist(),
+                                  cores.freq_hz.tolist(),
+                                  base_states.core_p_dyn_mw.tolist())
+        ))
+    if measured_mw is not None and live_model is not None:
+        k = live_model.rls.theta
+        print(f"Measured ({power_meter.kind}): {measured_mw:.1f} mW | "
+              f"live model: dyn x{k[0]:.3f}  leak x{k[1]:.3f}  "
+              f"idle {live_model.idle_mw:.0f} mW  "
+              f"({live_model.rls.n_updates} updates)")
+    elif measured_mw is not None:
+        print(f"Measured ({power_meter.kind}): {measured_mw:.1f} mW, "
+              f"less idle baseline, apportioned by CPU share")
+
+
+# --------------------------------------------------
+# Thread Table
+# --------------------------------------------------
+
+def display_threads(sampler, leak_model="linear"):
+    state = get_thread_power_states(sampler, leak_model=leak_model,
+                                    telemetry_sampler=telemetry_sampler)
+    threads = state.threads
+    top = np.argsort(-threads.cpu, kind="stable")[:15]
+
+    print(f"{'PID':<8}{'TID':<8}{'Name':<20}{'CPU%':<8}{'Core':<6}{'Pdyn':<10}")
+    print("-" * 60)
+    for i in top:
+        print(
+            f"{threads.pid[i]:<8}"
+            f"{threads.tid[i]:<8}"
+            f"{threads.name[i]:<20}"
+            f"{threads.cpu[i]:<8.2f}"
+            f"{threads.last_cpu[i]:<6}"
+            f"{state.p_dyn_mw[i]:<10.2f}"
+        )
+
+    print(f"\n{'PID':<8}{'Name':<20}{'Threads':<9}{'CPU%':<8}"
+          f"{'Pdyn':<10}{'Pleak':<10}{'Ptot':<10}")
+    print("-" * 75)
+    counts = np.bincount(np.searchsorted(state.process.pid, threads.pid),
+                         minlength=len(state.process))
+    for i, ps in enumerate(state.process):
+        print(
+            f"{ps['pid']:<8}"
+            f"{ps['name']:<20}"
+            f"{counts[i]:<9}"
+            f"{ps['cpu_percent']:<8.2f}"
+            f"{ps['p_dyn_mw']:<10.2f}"
+            f"{ps['p_leak_mw']:<10.4f}"
+            f"{ps['p_total_mw']:<10.2f}"
+        )
+
+    print("\nPer-core Pdyn (mW): " + "  ".join(
+        f"cpu{c}={mw:.2f}" for c, mw in enumerate(state.core_mw)
+    ))
+
 
 # --------------------------------------------------
 # Refresh Mode
 # --------------------------------------------------
 
 def refresh_mode(display_func, interval=1.0):
+    scheduler = PeriodicScheduler(interval)
     try:
-        while True:
+        for _ in scheduler.ticks():
             clear_screen()
             print_banner()
             print(
@@ -166,8 +266,9 @@ def refresh_mode(display_func, interval=1.0):
                 f"{datetime.now().strftime('%H:%M:%S')}\n"
             )
             display_func()
-            print("\nPress Ctrl+C to stop...")
-            time.sleep(interval)
+            stats = scheduler.stats
+            print(f"\nTick late p99 {stats.p99_late_ms:.1f} ms, "
+                  f"{stats.overruns} overruns. Press Ctrl+C to stop...")
     except KeyboardInterrupt:
         print("\n[akxOS] Live mode stopped.")
 
@@ -176,17 +277,176 @@ def refresh_mode(display_func, interval=1.0):
 # Logging
 # --------------------------------------------------
 
-def cmd_log(interval, duration):
-    logger = PowerLogger(interval=interval, duration=duration)
+def cmd_log(interval, duration, cpu_backend="stat", energy=False):
+    logger = PowerLogger(
+        interval=interval, duration=duration, cpu_backend=cpu_backend,
+        telemetry_sampler=telemetry_sampler, power_meter=power_meter,
+        energy=EnergyAccountant() if energy else None,
+        snapshot_cache=snapshot_cache,
+    )
     logger.run()
 
 
+# --------------------------------------------------
+# Budget engine + logger on one stream
+# --------------------------------------------------
+
+async def _budget_and_log(duration=None, cpu_backend="stat"):
+    """
+    Enforce budgets and log every process from one snapshot per tick,
+    in one event loop.
+    """
+    logger = PowerLogger(interval=budget_engine.interval,
+                         duration=duration or float("inf"),
+                         cpu_backend=cpu_backend)
+    scheduler = PeriodicScheduler(budget_engine.interval)
+    frames = stream_power_states(
+        budget_engine.interval, leak_model=budget_engine.leak_model,
+        telemetry_sampler=telemetry_sampler, power_meter=power_meter,
+        cache=snapshot_cache, cpu_backend=cpu_backend, scheduler=scheduler,
+    )
+
+    async def logged(writer):
+        async for frame in frames:
+            logger.write_frame(writer, frame)
+            yield frame
+
+    # Catch SIGTERM (systemd stop / kill) as a cancellation, so the
+    # engine's cleanup runs and the CSV is closed
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+    print(f"[akxOS] Logging → {logger.log_file}")
+    try:
+        with logger.open_writer() as writer:
+            await budget_engine.run_async(logged(writer), duration=duration)
+    except asyncio.CancelledError:
+        print("\n[akxOS] SIGTERM received, shutting down cleanly...")
+    finally:
+        loop.remove_signal_handler(signal.SIGTERM)
+        await frames.aclose()
+        print(f"[akxOS] Timing: {scheduler.stats.summary()}")
+    print(f"[akxOS] Logging completed → {logger.log_file}")
+
+
+def cmd_budget_run(duration=None, log=False, cpu_backend="stat"):
+    if not log:
+        budget_engine.run(duration=duration)
+        return
+    try:
+        asyncio.run(_budget_and_log(duration, cpu_backend))
+    except KeyboardInterrupt:
+        print("\n[akxOS] Budget engine stopped.")
+
+
+# --------------------------------------------------
+# Energy
+# --------------------------------------------------
+
+def cmd_energy_run(interval, duration=None):
+    """Integrate every process's power into ENERGY_FILE until stopped."""
+    energy = EnergyAccountant()
+    print(f"[akxOS] Energy accounting → {energy.path} "
+          f"(checkpoint every {energy.checkpoint_s:.0f}s)")
+    try:
+        for _ in PeriodicScheduler(interval).ticks(duration):
+            energy.add(get_power_states(
+                sampler=process_sampler, telemetry_sampler=telemetry_sampler,
+                power_meter=power_meter, cache=snapshot_cache,
+            ))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        energy.checkpoint()
+    print("[akxOS] Energy accounting stopped.")
+
+
+def cmd_energy_top(n=10, total=False):
+    energy = EnergyAccountant()
+    rows = energy.top(n, window=not total)
+    span = "since first seen" if total else \
+        f"last {energy.n_buckets * energy.bucket_s / 60:.0f} min"
+    print(f"Top {n} processes by energy ({span}, {energy.path})\n")
+    if not rows:
+        print("[akxOS] No energy recorded; run 'akxos energy run' "
+              "or 'akxos log --energy'.")
+        return
+    print(f"{'PID':>7}  {'Name':<20} {'Energy (J)':>12}")
+    print("-" * 42)
+    for r in rows:
+        print(f"{r['pid']:>7}  {r['name'][:20]:<20} {r['joules']:>12.3f}")
+
+
+# --------------------------------------------------
+# Calibration
+# --------------------------------------------------
+
+def cmd_calibrate(paths, target, host_target, output=None, dry_run=False):
+    try:
+        result = fit_logs(paths, target=target, host_target=host_target)
+    except (OSError, ValueError) as e:
+        print(f"[akxOS] Calibration failed: {e}")
+        return
+
+    host, kern = result.get("host"), result.get("kernel")
+    if host:
+        print(f"Host model   ({host['rows']} ticks)")
+        print(f"  alpha*C_eff   = {host['k_dyn']:.4e}")
+        held = "" if host["k_leak_fitted"] else "  (kept: Σ M·V hardly varies)"
+        print(f"  LEAK_LINEAR_A = {host['k_leak']:.4e}{held}")
+        print(f"  idle power    = {host['p_idle_mw']:.1f} mW")
+        print(f"  RMSE {host['rmse_before_mw']:.3f} → {host['rmse_mw']:.3f} mW")
+    if kern:
+        print(f"Kernel model ({kern['rows']} rows)")
+        print(f"  MODEL_CONST_FP = {kern['model_const_fp']:.2f}")
+        print(f"  RMSE {kern['rmse_before_mw']:.3f} → {kern['rmse_mw']:.3f} mW")
+
+    if not dry_run:
+        save_calibration(result, output)
+        print(f"[akxOS] Calibration saved → {output or CALIBRATION_FILE}")
+
+
 # --------------------------------------------------
 # CLI Entry
 # --------------------------------------------------
 
 def main():
+    global process_sampler, telemetry_sampler, power_meter, live_model, snapshot_cache
+
     parser = argparse.ArgumentParser(description="akxOS unified CLI")
+    parser.add_argument(
+        "--cpu-backend",
+        choices=CPU_BACKENDS,
+        default="stat",
+        help="CPU accounting: stat ticks, schedstat ns, or auto-detect",
+    )
+    parser.add_argument(
+        "--telemetry-hz",
+        type=float,
+        default=0.0,
+        help="Sample V/f/T in the background at this rate and average "
+             "them over each CPU%% window (0 = read once per tick)",
+    )
+    parser.add_argument(
+        "--power-source",
+        choices=["model", "measured"],
+        default="model",
+        help="Modeled power, or measured hwmon/powercap power "
+             "apportioned by CPU share",
+    )
+    parser.add_argument(
+        "--snapshot-max-age",
+        type=float,
+        default=0.0,
+        help="Reuse a power snapshot taken within this many seconds "
+             "instead of rescanning (0 = always rescan)",
+    )
+    parser.add_argument(
+        "--shared-snapshots",
+        action="store_true",
+        help=f"Share snapshots with other akxos processes through "
+             f"{SNAPSHOT_FILE} (needs --snapshot-max-age)",
+    )
     subparsers = parser.add_subparsers(dest="command", help="Subcommands")
 
     # ---------------- ps ----------------
@@ -200,17 +460,70 @@ def main():
     power_parser.add_argument("--interval", type=float, default=1.0)
     power_parser.add_argument(
     "--leak-model",
-    choices=["linear", "quadratic", "exponential"],
+    choices=LEAK_MODELS,
     default="linear" )
+    power_parser.add_argument(
+        "--live-model",
+        action="store_true",
+        help="Adapt the model online (RLS) to measured power; "
+             "requires --power-source measured",
+    )
     power_parser.add_argument(
     "--compare-models",
     action="store_true",
-    help="Compare linear and quadratic leakage models" )
+    help="Compare linear, quadratic, exponential and thermal leakage models" )
+
+    # ---------------- threads ----------------
+    threads_parser = subparsers.add_parser(
+        "threads", help="Show per-thread CPU and power for selected PIDs"
+    )
+    threads_parser.add_argument("pids", type=int, nargs="+", help="Process IDs")
+    threads_parser.add_argument("-r", "--refresh", action="store_true")
+    threads_parser.add_argument("--interval", type=float, default=1.0)
+    threads_parser.add_argument(
+        "--leak-model",
+        choices=LEAK_MODELS,
+        default="linear",
+    )
 
     # ---------------- log ----------------
     log_parser = subparsers.add_parser("log", help="Log power over time")
     log_parser.add_argument("--interval", type=float, default=1.0)
     log_parser.add_argument("--duration", type=float, default=10.0)
+    log_parser.add_argument("--energy", action="store_true",
+                            help=f"Also accumulate per-process energy in {ENERGY_FILE}")
+
+    # ---------------- energy ----------------
+    energy_parser = subparsers.add_parser(
+        "energy", help="Per-process energy accounting"
+    )
+    energy_sub = energy_parser.add_subparsers(dest="energy_cmd")
+    energy_run = energy_sub.add_parser(
+        "run", help="Integrate per-process power until stopped"
+    )
+    energy_run.add_argument("--interval", type=float, default=1.0)
+    energy_run.add_argument("--duration", type=float, default=None)
+    energy_top = energy_sub.add_parser(
+        "top", help="Processes that used the most energy in the last hour"
+    )
+    energy_top.add_argument("-n", type=int, default=10, help="Rows to show")
+    energy_top.add_argument("--total", action="store_true",
+                            help="Rank by energy since first seen instead")
+
+    # ---------------- calibrate ----------------
+    cal_parser = subparsers.add_parser(
+        "calibrate", help="Fit power model constants from logged CSVs"
+    )
+    cal_parser.add_argument("csv", nargs="+",
+                            help="PowerLogger or experiment CSV files")
+    cal_parser.add_argument("--target", default=DEFAULT_TARGET,
+                            help="Measured power column (mW) of experiment CSVs")
+    cal_parser.add_argument("--host-target", default=DEFAULT_HOST_TARGET,
+                            help="System power column (mW) of PowerLogger CSVs")
+    cal_parser.add_argument("--output", default=None,
+                            help=f"Calibration file (default {CALIBRATION_FILE})")
+    cal_parser.add_argument("--dry-run", action="store_true",
+                            help="Print the fit without saving it")
 
     # ---------------- budget ----------------
     budget_parser = subparsers.add_parser(
@@ -239,11 +552,69 @@ def main():
     # budget run
     run_parser = budget_sub.add_parser("run", help="Run budget enforcement engine")
     run_parser.add_argument("--duration", type=float, default=None)
+    run_parser.add_argument(
+        "--leak-model",
+        choices=LEAK_MODELS,
+        default="linear",
+        help="Leakage model the budgets are checked against",
+    )
+    run_parser.add_argument(
+        "--no-feedforward",
+        action="store_true",
+        help="cpu_quota: disable the online-model quota feedforward",
+    )
+    run_parser.add_argument(
+        "--energy",
+        action="store_true",
+        help=f"Accumulate energy of budgeted processes in {ENERGY_FILE}",
+    )
+    run_parser.add_argument(
+        "--log",
+        action="store_true",
+        help="Also log every process, from the same snapshot per tick",
+    )
 
     args = parser.parse_args()
 
     # ---------------- Dispatch ----------------
 
+    if args.cpu_backend != "stat":
+        process_sampler.close()
+        process_sampler = ProcessSampler(backend=args.cpu_backend)
+        budget_engine.set_cpu_backend(args.cpu_backend)
+
+    if args.telemetry_hz > 0:
+        telemetry_sampler = TelemetrySampler(rate_hz=args.telemetry_hz).start()
+        budget_engine.telemetry_sampler = telemetry_sampler
+
+    if args.power_source == "measured":
+        power_meter = PowerMeter()
+        if power_meter.available:
+            budget_engine.power_meter = power_meter
+        else:
+            print("[akxOS] No hwmon power*_input or powercap energy_uj found; "
+                  "using the power model.")
+            power_meter = None
+
+    if args.snapshot_max_age > 0:
+        try:
+            snapshot_cache = SnapshotCache(
+                args.snapshot_max_age,
+                path=SNAPSHOT_FILE if args.shared_snapshots else None,
+            )
+        except OSError as e:
+            print(f"[akxOS] Cannot open {SNAPSHOT_FILE} ({e}); "
+                  "caching snapshots in this process only.")
+            snapshot_cache = SnapshotCache(args.snapshot_max_age)
+        budget_engine.snapshot_cache = snapshot_cache
+
+    if getattr(args, "live_model", False):
+        if power_meter is None:
+            print("[akxOS] --live-model needs measured power "
+                  "(--power-source measured); showing the fixed model.")
+        else:
+            live_model = LivePowerModel(leak_model=args.leak_model)
+
     if args.command == "ps":
         refresh_mode(display_ps, args.interval) if args.refresh else display_ps()
 
@@ -262,8 +633,25 @@ def main():
               compare=args.compare_models
           )
 
+    elif args.command == "threads":
+        sampler = ThreadSampler(args.pids, backend=args.cpu_backend)
+        show = lambda: display_threads(sampler, leak_model=args.leak_model)
+        refresh_mode(show, args.interval) if args.refresh else show()
+
     elif args.command == "log":
-        cmd_log(args.interval, args.duration)
+        cmd_log(args.interval, args.duration, args.cpu_backend, args.energy)
+
+    elif args.command == "energy":
+        if args.energy_cmd == "run":
+            cmd_energy_run(args.interval, args.duration)
+        elif args.energy_cmd == "top":
+            cmd_energy_top(args.n, args.total)
+        else:
+            energy_parser.print_help()
+
+    elif args.command == "calibrate":
+        cmd_calibrate(args.csv, args.target, args.host_target,
+                      args.output, args.dry_run)
 
     elif args.command == "budget":
 
@@ -282,7 +670,12 @@ def main():
             budget_engine.remove_policy(args.pid)
 
         elif args.budget_cmd == "run":
-            budget_engine.run(duration=args.duration)
+            budget_engine.leak_model = args.leak_model
+            budget_engine.feedforward = not args.no_feedforward
+            if args.energy:
+                budget_engine.energy = EnergyAccountant()
+            cmd_budget_run(args.duration, log=args.log,
+                           cpu_backend=args.cpu_backend)
 
         else:
             budget_parser.print_help()
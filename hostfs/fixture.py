@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+akxOS Synthetic Host Fixture
+----------------------------
+Writes a fake /proc and /sys tree so the sampler, logger and budget
+engine can be tested and benchmarked on any Linux box.
+
+The tree contains N processes whose utime/stime/rss evolve over time,
+aggregate and per-CPU /proc/stat counters, one shared cpufreq policy
+(Raspberry Pi 4 layout: cpuN/cpufreq -> cpufreq/policy0, with
+stats/time_in_state), a voltage regulator, a thermal zone, a board
+power sensor (hwmon power1_input) with a matching powercap energy
+counter, and a cgroup v2 hierarchy. Each process also has a schedstat
+file with nanosecond runtime; monotonic_ns() gives the matching
+simulated clock.
+Threads appear under /proc/<pid>/task/<tid>; the main thread's TID is
+the PID, and changing `threads[i]` before advance() spawns or reaps
+threads.
+
+Usage:
+    host = FakeHost(tmp_dir, n_procs=10_000).build()
+    with host.activate():
+        ...             # proc_root()/sys_root() now point into tmp_dir
+        host.advance(1.0)
+
+    python3 -m hostfs.fixture /tmp/akxos_host --procs 10000
+    AKXOS_PROC_ROOT=/tmp/akxos_host/proc AKXOS_SYS_ROOT=/tmp/akxos_host/sys akxos ps
+
+"""
+
+import argparse
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from hostfs.roots import ProcRoot, SysRoot, use_roots
+
+
+DEFAULT_FREQS_KHZ = (600_000, 750_000, 1_000_000, 1_200_000, 1_500_000)
+DEFAULT_CLK_TCK   = 100
+DEFAULT_REG_UV    = 900_000
+IDLE_POWER_MW     = 2_000     # board power at 0% load
+LOAD_POWER_MW     = 1_500     # additional board power at 100% load
+ENERGY_RANGE_UJ   = 262_143_328_850
+FIRST_PID         = 1000
+PAGE_KB           = 4
+
+
+class FakeHost:
+    """
+    Synthetic procfs + sysfs tree rooted at `base`.
+
+    Parameters
+    ----------
+    base : str | PathLike
+        Directory to write into; `proc/` and `sys/` are created below it.
+    n_procs : int
+        Number of synthetic processes.
+    n_cpus : int
+        Number of CPUs, all in one cpufreq policy.
+    freqs_khz : tuple of int
+        Available frequencies, ascending.
+    seed : int
+        RNG seed so runs are reproducible.
+    threads : int
+        Threads per process; process time is split evenly across them.
+    """
+
+    def __init__(self,
+                 base,
+                 n_procs:   int   = 100,
+                 n_cpus:    int   = 4,
+                 freqs_khz: tuple = DEFAULT_FREQS_KHZ,
+                 seed:      int   = 0,
+                 clk_tck:   int   = DEFAULT_CLK_TCK,
+                 threads:   int   = 1):
+        self.base      = Path(base)
+        self.n_cpus    = n_cpus
+        self.freqs_khz = tuple(sorted(freqs_khz))
+        self.clk_tck   = clk_tck
+
+        self.proc = ProcRoot(self.base / "proc")
+        self.sys  = SysRoot(self.base / "sys")
+
+        self._rng = np.random.default_rng(seed)
+
+        # Most processes idle, a few busy — like a real box
+        self.pids  = np.arange(FIRST_PID, FIRST_PID + n_procs, dtype=np.int64)
+        # Every 10th comm has a space or parentheses, as real ones do
+        self.names = [
+            f"worker{i}" if i % 10 else ("Web Content" if i % 20 else f"kw/{i} (ev)")
+            for i in range(n_procs)
+        ]
+        self.util  = np.where(self._rng.random(n_procs) < 0.9,
+                              self._rng.random(n_procs) * 0.02,
+                              self._rng.random(n_procs))
+        self.utime = np.zeros(n_procs)
+        self.stime = np.zeros(n_procs)
+        self.rss   = self._rng.integers(64, 65536, n_procs).astype(np.float64)
+        self.threads  = np.full(n_procs, threads, dtype=np.int64)
+        self._written = np.zeros(n_procs, dtype=np.int64)
+
+        self.uptime_ticks = 1000.0 * clk_tck
+        self.starttime    = self._rng.integers(0, int(self.uptime_ticks), n_procs)
+
+        self.cpu_busy = np.zeros(n_cpus)
+        self.cpu_idle = np.zeros(n_cpus)
+
+        self.cur_freq_khz = self.freqs_khz[-1]
+        self.temp_mc      = 45_000
+        self.power_mw     = float(IDLE_POWER_MW)
+        self.energy_uj    = 0
+
+        # cpufreq/stats/time_in_state, in 10 ms units per frequency
+        self.time_in_state = np.zeros(len(self.freqs_khz), dtype=np.int64)
+
+    # ---------- Activation ----------
+
+    def activate(self):
+        """Context manager that points proc_root()/sys_root() here."""
+        return use_roots(proc=self.proc, sys=self.sys)
+
+    def monotonic_ns(self) -> int:
+        """Simulated CLOCK_MONOTONIC, advanced by advance()."""
+        return int(self.uptime_ticks * (1e9 / self.clk_tck))
+
+    # ---------- Construction ----------
+
+    def build(self) -> "FakeHost":
+        """Write the full tree once. Returns self for chaining."""
+        self._build_cpu()
+        self._build_misc_sys()
+        self._write_proc()
+        return self
+
+    def _write(self, path: Path, text: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    def _build_cpu(self):
+        cpu_dir = self.sys.path("devices/system/cpu")
+        span    = f"0-{self.n_cpus - 1}" if self.n_cpus > 1 else "0"
+        for name in ("online", "possible", "present"):
+            self._write(cpu_dir / name, span + "\n")
+
+        policy = cpu_dir / "cpufreq" / "policy0"
+        cpus   = " ".join(map(str, range(self.n_cpus)))
+        files  = {
+            "related_cpus":                  cpus,
+            "affected_cpus":                 cpus,
+            "cpuinfo_min_freq":              self.freqs_khz[0],
+            "cpuinfo_max_freq":              self.freqs_khz[-1],
+            "scaling_min_freq":              self.freqs_khz[0],
+            "scaling_max_freq":              self.freqs_khz[-1],
+            "scaling_cur_freq":              self.cur_freq_khz,
+            "scaling_available_frequencies": " ".join(map(str, self.freqs_khz)),
+            "scaling_governor":              "ondemand",
+        }
+        for name, value in files.items():
+            self._write(policy / name, f"{value}\n")
+        self._write_time_in_state()
+
+        for cpu in range(self.n_cpus):
+            d = cpu_dir / f"cpu{cpu}"
+            d.mkdir(parents=True, exist_ok=True)
+            link = d / "cpufreq"
+            if not link.exists():
+                os.symlink("../cpufreq/policy0", link)
+
+    def _build_misc_sys(self):
+        reg = self.sys.path("class/regulator/regulator.0")
+        self._write(reg / "name", "vdd-core\n")
+        self._write(reg / "microvolts", f"{DEFAULT_REG_UV}\n")
+
+        tz = self.sys.path("class/thermal/thermal_zone0")
+        self._write(tz / "type", "cpu-thermal\n")
+        self._write(tz / "temp", f"{self.temp_mc}\n")
+
+        hw = self.sys.path("class/hwmon/hwmon0")
+        self._write(hw / "name", "ina219\n")
+        rapl = self.sys.path("class/powercap/intel-rapl:0")
+        self._write(rapl / "name", "package-0\n")
+        self._write(rapl / "max_energy_range_uj", f"{ENERGY_RANGE_UJ}\n")
+        # Sub-zone: already counted in its parent
+        sub = rapl / "intel-rapl:0:0"
+        self._write(sub / "name", "core\n")
+        self._write(sub / "max_energy_range_uj", f"{ENERGY_RANGE_UJ}\n")
+        self._write_power()
+
+        cg = self.sys.path("fs/cgroup")
+        self._write(cg / "cgroup.controllers", "cpuset cpu io memory pids\n")
+        self._write(cg / "cgroup.subtree_control", "cpu memory pids\n")
+        self._write(cg / "cgroup.procs",
+                    "".join(f"{p}\n" for p in self.pids.tolist()))
+
+    # ---------- Evolution ----------
+
+    def advance(self, dt: float = 1.0):
+        """
+        Move simulated time forward by `dt` seconds and rewrite the files
+        that change: per-process stat, /proc/stat, /proc/uptime,
+        scaling_cur_freq, the thermal zone and the power sensors.
+        """
+        n = len(self.pids)
+        capacity = dt * self.clk_tck
+
+        jitter = self._rng.uniform(0.8, 1.2, n)
+        busy   = np.minimum(self.util * jitter, 1.0) * capacity
+        self.utime += 0.8 * busy
+        self.stime += 0.2 * busy
+        self.rss    = np.maximum(
+            self.rss + self._rng.normal(0.0, 8.0, n) * dt, 16.0
+        )
+        self.uptime_ticks += capacity
+
+        # Spread process time over CPUs, saturating each at `capacity`
+        per_cpu = min(busy.sum() / self.n_cpus, capacity)
+        self.cpu_busy += per_cpu
+        self.cpu_idle += capacity - per_cpu
+
+        load = per_cpu / capacity if capacity else 0.0
+        idx  = min(int(load * len(self.freqs_khz)), len(self.freqs_khz) - 1)
+        self.cur_freq_khz = self.freqs_khz[idx]
+        self.time_in_state[idx] += int(round(dt * 100))
+        self.temp_mc      = int(40_000 + 35_000 * load
+                                + self._rng.normal(0.0, 500.0))
+        self.power_mw     = IDLE_POWER_MW + LOAD_POWER_MW * load
+        self.energy_uj    = int(self.energy_uj + self.power_mw * 1e3 * dt
+                                ) % ENERGY_RANGE_UJ
+
+        self._write_proc()
+        self._write(
+            self.sys.path("devices/system/cpu/cpufreq/policy0/scaling_cur_freq"),
+            f"{self.cur_freq_khz}\n",
+        )
+        self._write(self.sys.path("class/thermal/thermal_zone0/temp"),
+                    f"{self.temp_mc}\n")
+        self._write_time_in_state()
+        self._write_power()
+
+    def _write_power(self):
+        self._write(self.sys.path("class/hwmon/hwmon0/power1_input"),
+                    f"{int(self.power_mw * 1000)}\n")      # µW
+        rapl = self.sys.path("class/powercap/intel-rapl:0")
+        self._write(rapl / "energy_uj", f"{self.energy_uj}\n")
+        self._write(rapl / "intel-rapl:0:0" / "energy_uj",
+                    f"{self.energy_uj // 2}\n")
+
+    def _write_time_in_state(self):
+        self._write(
+            self.sys.path("devices/system/cpu/cpufreq/policy0/stats/time_in_state"),
+            "".join(f"{f} {t}\n" for f, t in
+                    zip(self.freqs_khz, self.time_in_state.tolist())),
+        )
+
+    def respawn(self, i: int):
+        """
+        Simulate PID reuse: process `i` exits and a new process takes
+        its PID, with a later starttime and no accumulated CPU time.
+        Takes effect on the next advance().
+        """
+        self.starttime[i] = int(self.uptime_ticks)
+        self.utime[i] = 0.0
+        self.stime[i] = 0.0
+
+    def _write_proc(self):
+        root = self.proc.path()
+        root.mkdir(parents=True, exist_ok=True)
+
+        busy = np.floor(self.cpu_busy).astype(np.int64).tolist()
+        idle = np.floor(self.cpu_idle).astype(np.int64).tolist()
+        lines = [f"cpu  {sum(busy)} 0 0 {sum(idle)} 0 0 0 0 0 0"]
+        lines += [f"cpu{i} {b} 0 0 {d} 0 0 0 0 0 0"
+                  for i, (b, d) in enumerate(zip(busy, idle))]
+        (root / "stat").write_text("\n".join(lines) + "\n")
+
+        up = self.uptime_ticks / self.clk_tck
+        (root / "uptime").write_text(f"{up:.2f} {up * self.n_cpus * 0.5:.2f}\n")
+
+        utime = np.floor(self.utime).astype(np.int64).tolist()
+        stime = np.floor(self.stime).astype(np.int64).tolist()
+        rss   = self.rss.astype(np.int64).tolist()
+        # schedstat keeps the sub-tick precision that stat rounds away
+        runtime_ns = ((self.utime + self.stime) * (1e9 / self.clk_tck)
+                      ).astype(np.int64).tolist()
+        threads = self.threads.tolist()
+        for i, pid in enumerate(self.pids.tolist()):
+            d = root / str(pid)
+            if not d.exists():
+                d.mkdir()
+            start = int(self.starttime[i])
+            (d / "stat").write_text(self._stat_line(
+                pid, self.names[i], utime[i], stime[i],
+                start, rss[i], i % self.n_cpus, threads[i],
+            ))
+            (d / "schedstat").write_text(self._schedstat_line(runtime_ns[i]))
+
+            # Process time split evenly; thread j last ran on CPU i+j
+            n = threads[i]
+            for j in range(n):
+                tid = self.tid(pid, j)
+                t = d / "task" / str(tid)
+                t.mkdir(parents=True, exist_ok=True)
+                comm = self.names[i] if j == 0 else f"{self.names[i][:10]}:w{j}"
+                (t / "stat").write_text(self._stat_line(
+                    tid, comm, utime[i] // n, stime[i] // n, start, rss[i],
+                    (i + j) % self.n_cpus, n, pgid=pid,
+                ))
+                (t / "schedstat").write_text(
+                    self._schedstat_line(runtime_ns[i] // n)
+                )
+            for j in range(n, self._written[i]):
+                shutil.rmtree(d / "task" / str(self.tid(pid, j)))
+            self._written[i] = n
+
+    @staticmethod
+    def tid(pid: int, j: int) -> int:
+        """TID of thread `j` of `pid` (thread 0 is the main thread)."""
+        return pid if j == 0 else pid * 1000 + j
+
+    @staticmethod
+    def _schedstat_line(runtime_ns: int) -> str:
+        return f"{runtime_ns} 0 {int(runtime_ns // 4_000_000)}\n"
+
+    @staticmethod
+    def _stat_line(pid, comm, utime, stime, starttime, rss_pages, cpu,
+                   num_threads=1, pgid=None) -> str:
+        """Format one /proc/<pid>/stat line (52 fields, see proc(5))."""
+        pgid = pid if pgid is None else pgid
+        fields = [
+            "S", 1, pgid, pgid, 0, -1, 4194560,     # 3–9   state … flags
+            0, 0, 0, 0,                             # 10–13 faults
+            utime, stime, 0, 0,                     # 14–17 utime … cstime
+            20, 0, num_threads, 0,                  # 18–21 prio, nice, threads
+            starttime,                              # 22
+            rss_pages * PAGE_KB * 1024, rss_pages,  # 23–24 vsize, rss
+            18446744073709551615,                   # 25    rsslim
+            0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,     # 26–37
+            17, cpu,                                # 38–39 exit_signal, processor
+            0, 0, 0, 0, 0,                          # 40–44
+            0, 0, 0, 0, 0, 0, 0, 0,                 # 45–52
+        ]
+        return f"{pid} ({comm}) " + " ".join(map(str, fields)) + "\n"
+
+
+# --- Standalone Execution ---
+
+def main():
+    ap = argparse.ArgumentParser(description="Write a synthetic /proc + /sys tree")
+    ap.add_argument("out", help="Output directory")
+    ap.add_argument("--procs", type=int, default=1000)
+    ap.add_argument("--cpus",  type=int, default=4)
+    ap.add_argument("--threads", type=int, default=1,
+                    help="Threads per process")
+    ap.add_argument("--ticks", type=int, default=1,
+                    help="Number of 1 s advances to apply after building")
+    args = ap.parse_args()
+
+    host = FakeHost(args.out, n_procs=args.procs, n_cpus=args.cpus,
+                    threads=args.threads).build()
+    for _ in range(args.ticks):
+        host.advance(1.0)
+    print(f"[akxOS] Synthetic host written → {args.out}")
+    print(f"  AKXOS_PROC_ROOT={host.proc}  AKXOS_SYS_ROOT={host.sys}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+akxOS Host Filesystem Roots
+---------------------------
+Single place that decides where /proc and /sys live.
+
+Every module that reads kernel interfaces resolves paths through
+proc_root() / sys_root() instead of hard-coding "/proc" and "/sys", so
+the whole stack can run against a synthetic tree (see hostfs.fixture)
+for tests and benchmarks off a Raspberry Pi.
+
+The defaults can be overridden with the AKXOS_PROC_ROOT and
+AKXOS_SYS_ROOT environment variables, or at runtime with set_roots() /
+use_roots().
+
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class HostRoot:
+    """
+    A mount point for a kernel pseudo-filesystem.
+
+    `base` is kept as a plain string because hot paths (the /proc sampler)
+    build thousands of paths per tick with f-strings; `path()` returns a
+    pathlib.Path for everything else.
+    """
+
+    def __init__(self, base):
+        self.base = os.fspath(base).rstrip("/") or "/"
+
+    def path(self, *parts) -> Path:
+        """Path to `parts` under this root."""
+        return Path(self.base, *parts)
+
+    def join(self, *parts) -> str:
+        """String path to `parts` under this root (fast path)."""
+        return "/".join((self.base, *map(str, parts)))
+
+    def __fspath__(self) -> str:
+        return self.base
+
+    def __str__(self) -> str:
+        return self.base
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.base!r})"
+
+
+class ProcRoot(HostRoot):
+    """Root of procfs (normally /proc)."""
+
+
+class SysRoot(HostRoot):
+    """Root of sysfs (normally /sys)."""
+
+
+_proc_root = ProcRoot(os.environ.get("AKXOS_PROC_ROOT", "/proc"))
+_sys_root  = SysRoot(os.environ.get("AKXOS_SYS_ROOT", "/sys"))
+
+
+def proc_root() -> ProcRoot:
+    """Current procfs root."""
+    return _proc_root
+
+
+def sys_root() -> SysRoot:
+    """Current sysfs root."""
+    return _sys_root
+
+
+def set_roots(proc=None, sys=None):
+    """
+    Replace the procfs and/or sysfs roots for the whole process.
+
+    Parameters
+    ----------
+    proc : str | PathLike | ProcRoot, optional
+    sys : str | PathLike | SysRoot, optional
+    """
+    global _proc_root, _sys_root
+    if proc is not None:
+        _proc_root = proc if isinstance(proc, ProcRoot) else ProcRoot(proc)
+    if sys is not None:
+        _sys_root = sys if isinstance(sys, SysRoot) else SysRoot(sys)
+
+
+@contextmanager
+def use_roots(proc=None, sys=None):
+    """Temporarily switch roots; the previous ones are restored on exit."""
+    saved = (_proc_root, _sys_root)
+    set_roots(proc=proc, sys=sys)
+    try:
+        yield
+    finally:
+        set_roots(proc=saved[0], sys=saved[1])
@@ -21,7 +21,6 @@ import argparse
 import os
 import subprocess
 import sys
-import time
 from pathlib import Path
 
 PROC_PATH = Path("/proc/akxos_sched")
@@ -83,12 +82,20 @@ def cmd_reset(args):
 
 def cmd_watch(args):
     ensure_proc_exists()
+    # Shared periodic scheduler from the akxOS checkout; only watch needs it
+    sys.path.insert(0, str(REPO_ROOT))
     try:
-        while True:
+        from telemetry.periodic import PeriodicScheduler
+    except ImportError as e:
+        die(f"Cannot import telemetry.periodic from {REPO_ROOT}: {e}")
+    scheduler = PeriodicScheduler(args.interval)
+    try:
+        for _ in scheduler.ticks():
             os.system("clear")
             print(proc_read(), end="")
-            print(f"\nRefreshing every {args.interval}s. Ctrl+C to stop.")
-            time.sleep(args.interval)
+            print(f"\nRefreshing every {args.interval}s "
+                  f"(late p99 {scheduler.stats.p99_late_ms:.1f} ms, "
+                  f"{scheduler.stats.overruns} overruns). Ctrl+C to stop.")
     except KeyboardInterrupt:
         print("\n[akxOS] watch stopped.")
 
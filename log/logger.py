@@ -10,10 +10,11 @@ Time-series logger for per-process power states.
 import csv
 import os
 import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict
-
+from proc.process_info import ProcessSampler
 from power.power_state import get_power_states
+from telemetry.periodic import PeriodicScheduler
 
 
 DEFAULT_LOG_DIR = "logs"
@@ -27,7 +28,12 @@ class PowerLogger:
     def __init__(self,
                  interval: float = 1.0,
                  duration: float = 10.0,
-                 log_dir: str = DEFAULT_LOG_DIR):
+                 log_dir: str = DEFAULT_LOG_DIR,
+                 cpu_backend: str = "stat",
+                 telemetry_sampler=None,
+                 power_meter=None,
+                 energy=None,
+                 snapshot_cache=None):
         """
         Parameters
         ----------
@@ -37,11 +43,28 @@ class PowerLogger:
             Total logging duration in seconds
         log_dir : str
             Directory to store log files
+        cpu_backend : str
+            ProcessSampler CPU accounting backend ('stat', 'schedstat', 'auto')
+        telemetry_sampler : TelemetrySampler, optional
+            Running background sampler; logged V/f/T become window means
+        power_meter : PowerMeter, optional
+            Log measured power apportioned by CPU share instead of the model
+        energy : EnergyAccountant, optional
+            Also integrate every snapshot into per-process energy totals
+        snapshot_cache : SnapshotCache, optional
+            Log a snapshot another consumer took within its max age
         """
         self.interval = interval
         self.duration = duration
         self.log_dir = log_dir
         self.log_file = self._create_log_file()
+        self._sampler = ProcessSampler(backend=cpu_backend)
+        self.telemetry_sampler = telemetry_sampler
+        self.power_meter = power_meter
+        self.energy = energy
+        self.snapshot_cache = snapshot_cache
+        # Tick timing of the latest run(): scheduler.stats
+        self.scheduler = None
 
     # ---------- Internal Helpers ----------
 
@@ -65,8 +88,20 @@ class PowerLogger:
             "p_dyn_mw",
             "p_leak_mw",
             "p_total_mw",
+            "measured_mw",
+            "system_measured_mw",
         ])
 
+    @contextmanager
+    def open_writer(self):
+        """
+        CSV writer on the log file, header written; closed on exit.
+        """
+        with open(self.log_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            self._write_header(writer)
+            yield writer
+
     # ---------- Core Logging ----------
 
     def run(self):
@@ -76,35 +111,50 @@ class PowerLogger:
         print(f"[akxOS] Logging started → {self.log_file}")
         print(f"[akxOS] Interval: {self.interval}s | Duration: {self.duration}s")
 
-        end_time = time.time() + self.duration
-
-        with open(self.log_file, "w", newline="") as f:
-            writer = csv.writer(f)
-            self._write_header(writer)
+        self.scheduler = PeriodicScheduler(self.interval)
 
-            while time.time() < end_time:
+        with self.open_writer() as writer:
+            for _ in self.scheduler.ticks(self.duration):
                 self._log_snapshot(writer)
-                time.sleep(self.interval)
 
+        if self.energy is not None:
+            self.energy.checkpoint()
+        print(f"[akxOS] Logging completed → {self.log_file}")
+        print(f"[akxOS] Timing: {self.scheduler.stats.summary()}")
+
+    async def run_async(self, frames):
+        """
+        Log frames from an async iterator, e.g. stream_power_states(),
+        for `duration` seconds. The stream sets the cadence, so one
+        stream can also feed other consumers in the same event loop.
+        """
+        print(f"[akxOS] Logging started → {self.log_file}")
+        end_time = time.time() + self.duration
+
+        with self.open_writer() as writer:
+            async for frame in frames:
+                self.write_frame(writer, frame)
+                if time.time() >= end_time:
+                    break
+
+        if self.energy is not None:
+            self.energy.checkpoint()
         print(f"[akxOS] Logging completed → {self.log_file}")
 
     def _log_snapshot(self, writer: csv.writer):
         """
         Capture and log one power-state snapshot.
         """
-        power_states: List[Dict] = get_power_states()
-
-        for ps in power_states:
-            writer.writerow([
-                ps["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
-                ps["pid"],
-                ps["name"],
-                f"{ps['cpu_percent']:.2f}",
-                ps["mem_kb"],
-                f"{ps['voltage_v']:.3f}",
-                f"{ps['freq_hz']:.0f}",
-                f"{ps['temperature_c']:.1f}",
-                f"{ps['p_dyn_mw']:.3f}",
-                f"{ps['p_leak_mw']:.3f}",
-                f"{ps['p_total_mw']:.3f}",
-            ])
+        frame = get_power_states(sampler=self._sampler,
+                                 telemetry_sampler=self.telemetry_sampler,
+                                 power_meter=self.power_meter,
+                                 cache=self.snapshot_cache)
+        self.write_frame(writer, frame)
+
+    def write_frame(self, writer: csv.writer, frame):
+        """
+        Log one PowerFrame taken elsewhere.
+        """
+        writer.writerows(frame.csv_rows())
+        if self.energy is not None:
+            self.energy.add(frame)
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+akxOS Model Calibration
+-----------------------
+Fits power-model coefficients to recorded logs, and loads the result.
+
+Two models are fitted, each from the CSVs that carry its inputs:
+
+- Host model (power_model), from PowerLogger CSVs. Only the system as
+  a whole is measured, so the fit is per tick, against the logged
+  system measurement (`system_measured_mw`) and the tick's totals:
+      P_sys = k_dyn · Σ V²·f·U  +  k_leak · Σ M·V  +  p_idle
+  with U = cpu_percent / 100 and M = mem_kb / 1024, summed over the
+  tick's processes. k_dyn is the product α·C_eff, because the two
+  cannot be told apart from power alone. k_leak is LEAK_LINEAR_A and
+  p_idle the static power drawn with every CPU idle. The per-process
+  `measured_mw` column is not used: it is that same measurement split
+  by CPU share, so fitting it would only recover the split.
+  Every coefficient is constrained to be non-negative. Σ M·V hardly
+  moves while the process table is stable, and is then collinear with
+  p_idle. If it varies by less than LEAK_MIN_CV across ticks, k_leak
+  keeps its current value and only k_dyn and p_idle are fitted.
+- Kernel model (akxos_sched), from experiment CSVs (freq_khz, util):
+      P = K · freq_khz · util_permille / 1e9
+  against `measured_mw` by default. K is the measured counterpart of
+  the kernel's MODEL_CONST_FP = 162.
+
+Rows whose target is blank are skipped. A saved section is used as a
+whole or not at all: one unphysical coefficient discards its section.
+CSVs are read in chunks, and each chunk only adds to the normal
+equations (XᵀX, Xᵀy), so memory use does not grow with log length.
+
+The result is written to ~/.akxos/calibration.json, which power_model
+loads at import time and tests/experiment_model_accuracy.py reads for
+its calibrated prediction.
+
+"""
+
+import csv
+import itertools
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from power.constants import ALPHA, C_EFF, LEAK_LINEAR_A
+
+
+CALIBRATION_FILE    = Path.home() / ".akxos" / "calibration.json"
+CALIBRATION_VERSION = 2
+
+DEFAULT_TARGET      = "measured_mw"
+DEFAULT_HOST_TARGET = "system_measured_mw"
+DEFAULT_CHUNK_ROWS  = 65_536
+
+# Σ M·V must vary by this much across ticks (std / mean) for k_leak to
+# be told apart from p_idle
+LEAK_MIN_CV = 0.05
+
+# Uncalibrated values, in calibration-file keys
+DEFAULTS = {
+    "k_dyn":          ALPHA * C_EFF,
+    "k_leak":         LEAK_LINEAR_A,
+    "p_idle_mw":      0.0,          # unknown until fitted
+    "model_const_fp": 162.0,
+}
+
+# Keys of each saved section, and whether 0 is a valid value
+SECTIONS = {
+    "host":   {"k_dyn": False, "k_leak": True, "p_idle_mw": True},
+    "kernel": {"model_const_fp": False},
+}
+
+
+# ==========================================================
+# Streaming least squares
+# ==========================================================
+
+class StreamingLeastSquares:
+    """
+    Least squares y ≈ X·w accumulated chunk by chunk.
+
+    Only the normal equations are kept, so each update costs
+    O(rows · features²) and the memory used is O(features²).
+    `baseline` (optional weights) is scored on the same rows for a
+    before/after comparison.
+    """
+
+    def __init__(self, n_features: int, baseline=None):
+        self.xtx  = np.zeros((n_features, n_features))
+        self.xty  = np.zeros(n_features)
+        self.xsum = np.zeros(n_features)
+        self.yty  = 0.0
+        self.n    = 0
+        self.baseline = None if baseline is None else np.asarray(baseline, dtype=np.float64)
+        self._baseline_sse = 0.0
+
+    def update(self, X: np.ndarray, y: np.ndarray):
+        self.xtx  += X.T @ X
+        self.xty  += X.T @ y
+        self.xsum += X.sum(axis=0)
+        self.yty  += float(y @ y)
+        self.n    += len(y)
+        if self.baseline is not None:
+            r = y - X @ self.baseline
+            self._baseline_sse += float(r @ r)
+
+    def cv(self, j: int) -> float:
+        """Coefficient of variation (std / |mean|) of feature `j`."""
+        mean = self.xsum[j] / max(self.n, 1)
+        var  = self.xtx[j, j] / max(self.n, 1) - mean * mean
+        return float(np.sqrt(max(var, 0.0)) / abs(mean)) if mean else 0.0
+
+    def solve(self, nonnegative: bool = False, fixed: dict = None) -> np.ndarray:
+        """
+        Weights minimising the squared error; raises on too few rows.
+
+        `fixed` ({feature: weight}) holds those weights and fits the
+        rest. With `nonnegative`, the fitted weights are constrained to
+        ≥ 0: every subset of them is solved and the best feasible one
+        kept, which is exact and cheap for a handful of features.
+        """
+        fixed = fixed or {}
+        free  = [j for j in range(len(self.xty)) if j not in fixed]
+        if self.n < len(free):
+            raise ValueError(f"Need at least {len(free)} rows, got {self.n}.")
+
+        base = np.zeros(len(self.xty))
+        for j, value in fixed.items():
+            base[j] = value
+        if not nonnegative:
+            return self._solve_subset(base, free)
+
+        best = base
+        for k in range(1, len(free) + 1):
+            for subset in itertools.combinations(free, k):
+                w = self._solve_subset(base, list(subset))
+                if (w[list(subset)] >= 0).all() and self.sse(w) < self.sse(best):
+                    best = w
+        return best
+
+    def _solve_subset(self, base: np.ndarray, idx: list) -> np.ndarray:
+        """`base` with the weights at `idx` refitted, the others held."""
+        w = base.copy()
+        A = self.xtx[np.ix_(idx, idx)]
+        b = self.xty[idx] - self.xtx[idx] @ base
+        # Features differ by ~1e9 in scale (V²·f vs M·V): equilibrate
+        # the columns so the small one is not cut off as rank-deficient.
+        d = np.sqrt(np.diag(A))
+        d[d == 0] = 1.0
+        sol, *_ = np.linalg.lstsq(A / np.outer(d, d), b / d, rcond=None)
+        w[idx] = sol / d
+        return w
+
+    def sse(self, w) -> float:
+        """Sum of squared errors of weights `w`, from the normal equations."""
+        return max(self.yty - 2.0 * (w @ self.xty) + w @ self.xtx @ w, 0.0)
+
+    def rmse(self, w) -> float:
+        """RMSE of weights `w` over all rows seen, from the normal equations."""
+        return float(np.sqrt(self.sse(w) / max(self.n, 1)))
+
+    def baseline_rmse(self) -> float:
+        return float(np.sqrt(self._baseline_sse / max(self.n, 1)))
+
+
+# ==========================================================
+# CSV readers
+# ==========================================================
+
+def _chunks(path, columns, target: str, chunk_rows: int):
+    """
+    Yield (features dict of float arrays, target array) per chunk of
+    `path`, keeping only rows whose `columns` and target all parse.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        try:
+            idx = [header.index(c) for c in (*columns, target)]
+        except ValueError:
+            return
+        rows = []
+        for row in reader:
+            try:
+                rows.append([float(row[i]) for i in idx])
+            except (IndexError, ValueError):
+                continue        # blank target, truncated row, …
+            if len(rows) >= chunk_rows:
+                yield _split(rows, columns)
+                rows = []
+        if rows:
+            yield _split(rows, columns)
+
+
+def _split(rows, columns):
+    a = np.array(rows, dtype=np.float64)
+    return {c: a[:, i] for i, c in enumerate(columns)}, a[:, -1]
+
+
+HOST_COLUMNS   = ("voltage_v", "freq_hz", "cpu_percent", "mem_kb")
+KERNEL_COLUMNS = ("freq_khz", "util")
+
+
+def host_features(cols: dict) -> np.ndarray:
+    """[V²·f·U · 1e3, M·V] per process row; summed per tick by _host_ticks."""
+    V = cols["voltage_v"]
+    dyn  = V ** 2 * cols["freq_hz"] * (cols["cpu_percent"] / 100.0) * 1e3
+    leak = np.maximum(cols["mem_kb"] / 1024.0, 0.001) * V
+    return np.column_stack((dyn, leak))
+
+
+def _tick_totals(rows, starts):
+    """[Σ dyn, Σ leak, 1] and the target, one row per tick."""
+    cols, y = _split(rows, HOST_COLUMNS)
+    X = np.add.reduceat(host_features(cols), starts, axis=0)
+    return np.column_stack((X, np.ones(len(starts)))), y[starts]
+
+
+def _host_ticks(path, target: str, chunk_rows: int):
+    """
+    Yield (X, y) per chunk of a PowerLogger CSV, with one row per tick:
+    X = [Σ V²·f·U · 1e3, Σ M·V, 1] over the tick's processes, so that
+    P_sys = X · [k_dyn, k_leak, p_idle], and y its system measurement.
+
+    A tick's rows are written together and share the timestamp and the
+    measurement; a new tick starts when either changes or a PID repeats.
+    Rows with a blank measurement are skipped.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        try:
+            t, p = header.index("timestamp"), header.index("pid")
+            idx = [header.index(c) for c in (*HOST_COLUMNS, target)]
+        except ValueError:
+            return
+        rows, starts = [], []
+        key, seen = None, set()
+        for row in reader:
+            try:
+                values = [float(row[i]) for i in idx]
+                tick, pid = (row[t], row[idx[-1]]), row[p]
+            except (IndexError, ValueError):
+                continue        # blank target, truncated row, …
+            if tick != key or pid in seen:
+                if len(rows) >= chunk_rows:     # only whole ticks per chunk
+                    yield _tick_totals(rows, starts)
+                    rows, starts = [], []
+                starts.append(len(rows))
+                key, seen = tick, set()
+            seen.add(pid)
+            rows.append(values)
+        if starts:
+            yield _tick_totals(rows, starts)
+
+
+def kernel_features(cols: dict) -> np.ndarray:
+    """[freq_khz · util_permille / 1e9] per row, so that P_mW = X · [K]."""
+    return (cols["freq_khz"] * cols["util"] / 1e9)[:, None]
+
+
+# ==========================================================
+# Fitting
+# ==========================================================
+
+def fit_logs(paths,
+             target:      str = DEFAULT_TARGET,
+             chunk_rows:  int = DEFAULT_CHUNK_ROWS,
+             current:     dict = None,
+             host_target: str = DEFAULT_HOST_TARGET) -> dict:
+    """
+    Fit both models from `paths` (PowerLogger and/or experiment CSVs).
+
+    `host_target` is the system-power column of PowerLogger CSVs and
+    `target` the measured column of experiment CSVs. Returns a
+    calibration dict; a model section is present only if at least one
+    file had its columns and enough rows (ticks, for the host model).
+    `current` is the calibration to compare against (default:
+    load_calibration()).
+    """
+    current = load_calibration() if current is None else current
+    host = StreamingLeastSquares(3, baseline=[
+        current["k_dyn"], current["k_leak"], current["p_idle_mw"],
+    ])
+    kern = StreamingLeastSquares(1, baseline=[current["model_const_fp"]])
+
+    for path in paths:
+        for X, y in _host_ticks(path, host_target, chunk_rows):
+            host.update(X, y)
+        for cols, y in _chunks(path, KERNEL_COLUMNS, target, chunk_rows):
+            kern.update(kernel_features(cols), y)
+
+    result = {
+        "version": CALIBRATION_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "target":  {"host": host_target, "kernel": target},
+    }
+    if host.n >= 3:
+        # Σ M·V that hardly varies is collinear with the idle term
+        leak_fitted = host.cv(1) >= LEAK_MIN_CV
+        fixed = None if leak_fitted else {1: current["k_leak"]}
+        w = host.solve(nonnegative=True, fixed=fixed)
+        result["host"] = {
+            "k_dyn": float(w[0]), "k_leak": float(w[1]),
+            "p_idle_mw": float(w[2]), "k_leak_fitted": leak_fitted,
+            "rows": host.n,
+            "rmse_mw": host.rmse(w), "rmse_before_mw": host.baseline_rmse(),
+        }
+    if kern.n >= 1:
+        w = kern.solve(nonnegative=True)
+        result["kernel"] = {
+            "model_const_fp": float(w[0]), "rows": kern.n,
+            "rmse_mw": kern.rmse(w), "rmse_before_mw": kern.baseline_rmse(),
+        }
+    if "host" not in result and "kernel" not in result:
+        raise ValueError(
+            f"No rows with a '{host_target}' or '{target}' column and "
+            f"model inputs in: "
+            + ", ".join(map(str, paths))
+        )
+    return result
+
+
+# ==========================================================
+# Persistence
+# ==========================================================
+
+def save_calibration(result: dict, path=None):
+    """Write a fit_logs() result, keeping sections it did not refit."""
+    path = Path(path or CALIBRATION_FILE)
+    try:
+        old = json.loads(path.read_text())
+        if old.get("version") != CALIBRATION_VERSION:
+            old = {}
+    except (OSError, ValueError):
+        old = {}
+    merged = {**old, **result}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(merged, indent=4))
+
+
+def _valid_section(section, keys: dict) -> bool:
+    """True if `section` has every key of `keys` with a physical value."""
+    if not isinstance(section, dict):
+        return False
+    for key, zero_ok in keys.items():
+        value = section.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        if not (value >= 0 if zero_ok else value > 0):
+            return False
+    return True
+
+
+def load_calibration(path=None) -> dict:
+    """
+    Flat {k_dyn, k_leak, p_idle_mw, model_const_fp}: calibrated values where the
+    file has them, DEFAULTS otherwise (missing, unreadable, or another
+    version). Each section is taken whole: if any of its coefficients is
+    missing or not physical (negative, or zero where that is
+    meaningless), the whole section falls back to DEFAULTS.
+    """
+    values = dict(DEFAULTS)
+    try:
+        data = json.loads(Path(path or CALIBRATION_FILE).read_text())
+    except (OSError, ValueError):
+        return values
+    if not isinstance(data, dict) or data.get("version") != CALIBRATION_VERSION:
+        return values
+    for name, keys in SECTIONS.items():
+        section = data.get(name)
+        if _valid_section(section, keys):
+            values.update({key: float(section[key]) for key in keys})
+    return values
@@ -54,3 +54,15 @@ V_NOM = 0.90
 
 # Exponential sensitivity factor (subthreshold-like behavior)
 LEAK_EXP_B = 2.0
+
+
+# ----------------------------------------------------------
+# Leakage Temperature Dependence
+# ----------------------------------------------------------
+
+# Arrhenius activation term Ea / k_B, in Kelvin. Subthreshold leakage
+# roughly doubles every ~20 °C around 60 °C with this value.
+LEAK_THERMAL_EA_K = 4000.0
+
+# Temperature at which the thermal model equals the linear model (°C)
+T_NOM_C = 45.0
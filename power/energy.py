@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+akxOS Energy Accountant
+-----------------------
+Streaming per-process energy integration.
+
+Each PowerFrame adds, per process identity (pid, starttime), the
+trapezoid between its previous and current p_total_mw over the
+monotonic time between them. Energy is kept twice:
+
+- `total_uj`: since the process was first seen
+- a ring of time buckets (60 × 1 min by default), whose running sum
+  `window_uj` is the energy of the last hour
+
+so "top processes by energy in the last hour" is a partial sort of one
+array. It never re-reads logs or sums buckets per query.
+
+State is checkpointed to a compact .npz file (~/.akxos/energy.npz) at
+a fixed interval, atomically, and reloaded on start. Buckets are
+aligned to wall-clock time, so after a restart the window just rotates
+past the downtime. Identities with no energy in the window that have
+not been seen for a whole window are pruned at checkpoint time.
+
+"""
+
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from power.power_frame import PowerFrame
+
+
+ENERGY_FILE    = Path.home() / ".akxos" / "energy.npz"
+ENERGY_VERSION = 1
+
+_DEFAULT_PATH = object()   # ENERGY_FILE, resolved when the accountant is built
+
+DEFAULT_WINDOW_S     = 3600.0
+DEFAULT_BUCKET_S     = 60.0
+DEFAULT_CHECKPOINT_S = 60.0
+
+# Gaps longer than this (process filtered out, sampler paused) are not
+# bridged by a trapezoid
+MAX_GAP_S = 60.0
+
+# (starttime << 22) | pid is unique per identity (pid_max ≤ 2^22)
+_PID_BITS = 22
+
+
+def _keys(pid: np.ndarray, starttime: np.ndarray) -> np.ndarray:
+    return (starttime.astype(np.int64) << _PID_BITS) | pid.astype(np.int64)
+
+
+class EnergyAccountant:
+    """
+    Per-identity energy totals and a sliding-window energy ranking.
+
+    Parameters
+    ----------
+    path : str | PathLike | None
+        Checkpoint file (default ENERGY_FILE); None disables checkpointing.
+    window_s, bucket_s : float
+        Ranking window and its resolution.
+    checkpoint_s : float
+        Minimum wall time between automatic checkpoints in add().
+    clock_ns, wall : callables
+        Monotonic clock for integration, wall clock for buckets. Frame
+        `sample_ns` values must be on the same clock as `clock_ns`.
+    """
+
+    def __init__(self,
+                 path=_DEFAULT_PATH,
+                 window_s:     float = DEFAULT_WINDOW_S,
+                 bucket_s:     float = DEFAULT_BUCKET_S,
+                 checkpoint_s: float = DEFAULT_CHECKPOINT_S,
+                 clock_ns=time.monotonic_ns,
+                 wall=time.time):
+        if path is _DEFAULT_PATH:
+            path = ENERGY_FILE
+        self.path         = None if path is None else Path(path)
+        self.bucket_s     = bucket_s
+        self.n_buckets    = max(int(round(window_s / bucket_s)), 1)
+        self.checkpoint_s = checkpoint_s
+        self.clock_ns     = clock_ns
+        self.wall         = wall
+
+        self._reset(capacity=256)
+        self._epoch = int(self.wall() // self.bucket_s)   # bucket number of _cur
+        self._cur   = 0
+        self._last_checkpoint = self.wall()
+
+        if self.path is not None:
+            self.load()
+
+    def _reset(self, capacity: int):
+        self.n         = 0
+        self.pid       = np.zeros(capacity, dtype=np.int64)
+        self.starttime = np.zeros(capacity, dtype=np.int64)
+        self.name      = np.empty(capacity, dtype=object)
+        self.total_uj  = np.zeros(capacity)
+        self.window_uj = np.zeros(capacity)
+        self._buckets  = np.zeros((self.n_buckets, capacity))
+        self._last_mw  = np.zeros(capacity)
+        self._last_ns  = np.full(capacity, -1, dtype=np.int64)
+        self._sorted_keys  = np.zeros(0, dtype=np.int64)
+        self._sorted_slots = np.zeros(0, dtype=np.int64)
+
+    # ---------- Slots ----------
+
+    def _grow(self, need: int):
+        cap = len(self.pid)
+        if need <= cap:
+            return
+        new = max(need, 2 * cap)
+        pad = new - cap
+        self.pid       = np.concatenate((self.pid, np.zeros(pad, dtype=np.int64)))
+        self.starttime = np.concatenate((self.starttime, np.zeros(pad, dtype=np.int64)))
+        self.name      = np.concatenate((self.name, np.empty(pad, dtype=object)))
+        self.total_uj  = np.concatenate((self.total_uj, np.zeros(pad)))
+        self.window_uj = np.concatenate((self.window_uj, np.zeros(pad)))
+        self._buckets  = np.concatenate((self._buckets, np.zeros((self.n_buckets, pad))), axis=1)
+        self._last_mw  = np.concatenate((self._last_mw, np.zeros(pad)))
+        self._last_ns  = np.concatenate((self._last_ns, np.full(pad, -1, dtype=np.int64)))
+
+    def _reindex(self):
+        keys = _keys(self.pid[:self.n], self.starttime[:self.n])
+        order = np.argsort(keys, kind="stable")
+        self._sorted_keys, self._sorted_slots = keys[order], order
+
+    def _slots(self, pid, starttime, name) -> np.ndarray:
+        """Slot of each identity, creating slots for new ones."""
+        keys = _keys(pid, starttime)
+        pos  = np.searchsorted(self._sorted_keys, keys)
+        pos  = np.minimum(pos, max(len(self._sorted_keys) - 1, 0))
+        found = (self._sorted_keys[pos] == keys) if len(self._sorted_keys) \
+            else np.zeros(len(keys), dtype=bool)
+        slots = np.where(found, self._sorted_slots[pos] if len(self._sorted_slots)
+                         else 0, -1)
+
+        new = np.flatnonzero(~found)
+        if len(new):
+            first = self.n
+            self._grow(first + len(new))
+            idx = np.arange(first, first + len(new))
+            self.pid[idx]       = pid[new]
+            self.starttime[idx] = starttime[new]
+            self.name[idx]      = name[new]
+            self.n += len(new)
+            slots[new] = idx
+            self._reindex()
+        return slots
+
+    # ---------- Time buckets ----------
+
+    def _rotate(self):
+        """Advance the ring to the current wall-clock bucket."""
+        epoch = int(self.wall() // self.bucket_s)
+        steps = min(epoch - self._epoch, self.n_buckets)
+        for _ in range(max(steps, 0)):
+            self._cur = (self._cur + 1) % self.n_buckets
+            self.window_uj -= self._buckets[self._cur]
+            self._buckets[self._cur] = 0.0
+        if steps > 0:
+            np.maximum(self.window_uj, 0.0, out=self.window_uj)  # rounding
+        self._epoch = max(epoch, self._epoch)
+
+    # ---------- Accounting ----------
+
+    def add(self, frame: PowerFrame, t_ns: int = None):
+        """
+        Integrate one frame; checkpoints when checkpoint_s has passed.
+
+        The frame is placed at `t_ns`, else at its `sample_ns`, else at
+        the time of the call. A frame consumed late (from a queue or a
+        shared snapshot) is thus still integrated over its own window.
+        """
+        if t_ns is None:
+            t_ns = frame.sample_ns if frame.sample_ns is not None else self.clock_ns()
+        self._rotate()
+
+        start = (frame.starttime if frame.starttime is not None
+                 else np.zeros(len(frame), dtype=np.int64))
+        slots = self._slots(np.asarray(frame.pid), np.asarray(start),
+                            np.asarray(frame.name, dtype=object))
+        p_mw  = np.asarray(frame.p_total_mw, dtype=np.float64)
+
+        last = self._last_ns[slots]
+        dt_s = (t_ns - last) / 1e9
+        ok   = (last >= 0) & (dt_s > 0) & (dt_s <= MAX_GAP_S)
+        e_uj = np.where(ok, (self._last_mw[slots] + p_mw) * 0.5 * dt_s * 1e3, 0.0)
+
+        self.total_uj[slots]       += e_uj     # identities are unique per frame
+        self.window_uj[slots]      += e_uj
+        self._buckets[self._cur, slots] += e_uj
+        self._last_mw[slots] = p_mw
+        self._last_ns[slots] = t_ns
+
+        if self.path is not None and self.wall() - self._last_checkpoint >= self.checkpoint_s:
+            self.checkpoint()
+
+    def top(self, k: int = 10, window: bool = True) -> list:
+        """
+        The `k` identities with the most energy, descending: in the
+        window (default) or since first seen. Rows are dicts with pid,
+        starttime, name and joules.
+        """
+        self._rotate()
+        values = (self.window_uj if window else self.total_uj)[:self.n]
+        k = min(k, self.n)
+        if k <= 0:
+            return []
+        part  = np.argpartition(-values, k - 1)[:k]
+        order = part[np.argsort(-values[part], kind="stable")]
+        return [
+            {"pid": int(self.pid[i]), "starttime": int(self.starttime[i]),
+             "name": self.name[i], "joules": float(values[i] / 1e6)}
+            for i in order if values[i] > 0
+        ]
+
+    # ---------- Checkpointing ----------
+
+    def _prune(self):
+        """Drop identities idle for a whole window with nothing in it."""
+        now = self.clock_ns()
+        window_ns = self.n_buckets * self.bucket_s * 1e9
+        n = self.n
+        seen = (self._last_ns[:n] >= 0) & (now - self._last_ns[:n] <= window_ns)
+        keep = np.flatnonzero(seen | (self.window_uj[:n] > 0))
+        if len(keep) == n:
+            return
+        for arr in ("pid", "starttime", "name", "total_uj", "window_uj",
+                    "_last_mw", "_last_ns"):
+            a = getattr(self, arr)
+            a[:len(keep)] = a[keep]
+        self._buckets[:, :len(keep)] = self._buckets[:, keep]
+        self._buckets[:, len(keep):n] = 0.0
+        self.window_uj[len(keep):n] = 0.0
+        self._last_ns[len(keep):n] = -1
+        self.n = len(keep)
+        self._reindex()
+
+    def checkpoint(self):
+        """Atomically write the state to `path`; a no-op without one."""
+        if self.path is None:
+            return
+        self._rotate()
+        self._prune()
+        n = self.n
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                version   = ENERGY_VERSION,
+                bucket_s  = self.bucket_s,
+                epoch     = self._epoch,
+                cur       = self._cur,
+                pid       = self.pid[:n],
+                starttime = self.starttime[:n],
+                name      = np.array([str(s) for s in self.name[:n]], dtype=str),
+                total_uj  = self.total_uj[:n],
+                buckets   = self._buckets[:, :n],
+            )
+        os.replace(tmp, self.path)
+        self._last_checkpoint = self.wall()
+
+    def load(self) -> bool:
+        """Restore a checkpoint; False if absent or incompatible."""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if int(data["version"]) != ENERGY_VERSION:
+                    return False
+                pid, start = data["pid"], data["starttime"]
+                name, total = data["name"], data["total_uj"]
+                buckets = data["buckets"]
+                same_grid = (float(data["bucket_s"]) == self.bucket_s
+                             and buckets.shape[0] == self.n_buckets)
+                epoch, cur = int(data["epoch"]), int(data["cur"])
+        except (OSError, KeyError, ValueError):
+            return False
+
+        n = len(pid)
+        self._reset(capacity=max(256, n))
+        self.n = n
+        self.pid[:n], self.starttime[:n] = pid, start
+        self.name[:n], self.total_uj[:n] = name.astype(object), total
+        if same_grid:
+            self._buckets[:, :n] = buckets
+            self.window_uj[:n] = buckets.sum(axis=0)
+            self._epoch, self._cur = epoch, cur
+            self._rotate()
+        self._reindex()
+        return True
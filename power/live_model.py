@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+akxOS Live Power Model
+----------------------
+Online adaptation of power-model coefficients by recursive least
+squares (RLS) with exponential forgetting.
+
+The fixed model (power_model, optionally calibrated offline) assumes
+one gain from activity to power. The real gain changes with frequency,
+temperature and workload mix. RLS refines the coefficients every tick
+from what was just observed. Each update costs O(n²) in the number of
+coefficients, which is a small constant (2–3), and no history is
+stored. The forgetting factor λ sets the memory: about 1 / (1 − λ)
+ticks.
+
+Two users:
+
+- LivePowerModel ("akxos power --live-model"): learns multipliers on
+  the modeled dynamic and leakage power, plus an idle baseline, from
+  measured system power. It then re-prices every process with them.
+- BudgetEngine cpu_quota: a per-process RecursiveLeastSquares maps
+  utilisation × frequency to power. Its inverse gives the quota that
+  should meet the budget, which is fed forward to QuotaPIDController.
+
+"""
+
+import numpy as np
+
+from power.power_frame import PowerFrame
+from power.power_model import (
+    compute_dynamic_power_batch,
+    compute_leakage_power_batch,
+)
+
+
+DEFAULT_FORGETTING = 0.95     # ~20-tick memory
+DEFAULT_P0         = 1e3      # initial covariance: weak prior
+MAX_TRACE          = 1e6      # bound on covariance growth without excitation
+
+# The baseline regressor is this constant, so θ_idle is in watts and
+# of the same order as the two multipliers
+_IDLE_UNIT_MW = 1000.0
+
+
+class RecursiveLeastSquares:
+    """
+    y ≈ θ · φ, updated one observation at a time.
+
+    Parameters
+    ----------
+    theta0 : array-like
+        Initial coefficients (the prior model).
+    forgetting : float
+        λ in (0, 1]; 1 keeps all history.
+    p0 : float
+        Initial covariance scale; larger trusts theta0 less.
+    """
+
+    def __init__(self, theta0, forgetting: float = DEFAULT_FORGETTING,
+                 p0: float = DEFAULT_P0):
+        if not 0.0 < forgetting <= 1.0:
+            raise ValueError("forgetting must be in (0, 1].")
+        self.theta      = np.array(theta0, dtype=np.float64)
+        self.forgetting = forgetting
+        self.P          = np.eye(len(self.theta)) * p0
+        self.n_updates  = 0
+
+    def predict(self, phi) -> float:
+        return float(self.theta @ np.asarray(phi, dtype=np.float64))
+
+    def update(self, phi, y: float) -> float:
+        """Fold in one observation; returns the a-priori error."""
+        phi = np.asarray(phi, dtype=np.float64)
+        Pphi  = self.P @ phi
+        gain  = Pphi / (self.forgetting + phi @ Pphi)
+        error = y - self.theta @ phi
+
+        self.theta += gain * error
+        P = (self.P - np.outer(gain, Pphi)) / self.forgetting
+        self.P = 0.5 * (P + P.T)
+        # Without excitation P grows by 1/λ per tick; keep it bounded
+        trace = np.trace(self.P)
+        if trace > MAX_TRACE:
+            self.P *= MAX_TRACE / trace
+        self.n_updates += 1
+        return float(error)
+
+
+class LivePowerModel:
+    """
+    Measured system power ≈ θ_dyn · ΣP_dyn + θ_leak · ΣP_leak + θ_idle.
+
+    ΣP_dyn is the modeled per-core dynamic power and ΣP_leak the modeled
+    leakage of every process in the frame, so the frame must cover all
+    processes. θ starts at [1, 1, 0] (the offline model, no baseline).
+    """
+
+    def __init__(self, leak_model: str = "linear",
+                 forgetting: float = DEFAULT_FORGETTING):
+        self.leak_model = leak_model
+        self.rls = RecursiveLeastSquares([1.0, 1.0, 0.0], forgetting)
+        self.error_mw = None    # a-priori error of the last update
+
+    @property
+    def idle_mw(self) -> float:
+        return float(self.rls.theta[2]) * _IDLE_UNIT_MW
+
+    def _modeled(self, frame: PowerFrame):
+        p_dyn = compute_dynamic_power_batch(
+            voltage_v=frame.voltage_v,
+            freq_hz=frame.freq_hz,
+            activity=frame.cpu_percent / 100.0,
+        )
+        p_leak = compute_leakage_power_batch(
+            mem_kb=frame.mem_kb,
+            voltage_v=frame.voltage_v,
+            model=self.leak_model,
+            temperature_c=frame.temperature_c,
+        )
+        return p_dyn, p_leak
+
+    def update(self, frame: PowerFrame) -> bool:
+        """Learn from a frame with measured power; False if it has none."""
+        if frame.measured_mw is None:
+            return False
+        p_dyn, p_leak = self._modeled(frame)
+        if frame.cores is not None:
+            # Modeled per-core sum: also covers time not owned by a process
+            dyn_total = float(compute_dynamic_power_batch(
+                voltage_v=frame.voltage_v,
+                freq_hz=frame.cores.freq_hz,
+                activity=frame.cores.share,
+            ).sum())
+        else:
+            dyn_total = float(p_dyn.sum())
+        self.error_mw = self.rls.update(
+            [dyn_total, float(p_leak.sum()), _IDLE_UNIT_MW], frame.measured_mw
+        )
+        return True
+
+    def apply(self, frame: PowerFrame) -> PowerFrame:
+        """New frame whose power columns use the live coefficients."""
+        p_dyn, p_leak = self._modeled(frame)
+        k_dyn, k_leak = np.maximum(self.rls.theta[:2], 0.0)
+        p_dyn, p_leak = p_dyn * k_dyn, p_leak * k_leak
+        return PowerFrame(
+            frame.timestamp, frame.voltage_v, frame.freq_hz, frame.temperature_c,
+            pid=frame.pid, name=frame.name,
+            cpu_percent=frame.cpu_percent, mem_kb=frame.mem_kb,
+            p_dyn_mw=p_dyn, p_leak_mw=p_leak, p_total_mw=p_dyn + p_leak,
+            starttime=frame.starttime,
+            cores=frame.cores,
+            core_p_dyn_mw=frame.core_p_dyn_mw,
+            measured_mw=frame.measured_mw,
+            sample_ns=frame.sample_ns,
+        )
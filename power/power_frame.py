@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+akxOS Power Frame
+-----------------
+Columnar per-tick power snapshot.
+
+Per-process values live in NumPy arrays; telemetry that is identical
+for every process (timestamp, voltage, frequency, temperature) is held
+once as scalars. Iterating or indexing a frame yields the legacy
+per-process dicts, built lazily, so list-of-dicts callers keep working.
+
+"""
+
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from proc.identity import ProcessIdentity
+
+
+class PowerFrame:
+    """
+    Power state for a set of processes at one instant.
+
+    Columns : pid, name, cpu_percent, mem_kb, p_dyn_mw, p_leak_mw, p_total_mw
+    Scalars : timestamp, voltage_v, freq_hz, temperature_c
+
+    `starttime` (optional) pairs with `pid` to give each row's
+    ProcessIdentity, so consumers can detect PID reuse.
+
+    `cores` (optional, proc.cpu_stat.CoreUtil) and `core_p_dyn_mw` give
+    per-core busy fraction, frequency and dynamic power for the window;
+    `freq_hz` is then the busy-weighted mean across cores.
+
+    `measured_mw` (optional) is the measured system power the power
+    columns were apportioned from; None when they are modeled.
+
+    `sample_ns` (optional) is when the sample was taken, on the
+    sampler's monotonic clock (the end of its CPU% window). Unlike
+    `timestamp` it does not jump with the wall clock, so integrate
+    over it.
+    """
+
+    COLUMNS = (
+        "pid",
+        "name",
+        "cpu_percent",
+        "mem_kb",
+        "p_dyn_mw",
+        "p_leak_mw",
+        "p_total_mw",
+    )
+
+    def __init__(self,
+                 timestamp:     datetime,
+                 voltage_v:     float,
+                 freq_hz:       float,
+                 temperature_c: float,
+                 pid:           np.ndarray,
+                 name:          np.ndarray,
+                 cpu_percent:   np.ndarray,
+                 mem_kb:        np.ndarray,
+                 p_dyn_mw:      np.ndarray,
+                 p_leak_mw:     np.ndarray,
+                 p_total_mw:    np.ndarray,
+                 starttime:     Optional[np.ndarray] = None,
+                 cores=None,
+                 core_p_dyn_mw: Optional[np.ndarray] = None,
+                 measured_mw:   Optional[float] = None,
+                 sample_ns:     Optional[int] = None):
+        self.timestamp     = timestamp
+        self.voltage_v     = voltage_v
+        self.freq_hz       = freq_hz
+        self.temperature_c = temperature_c
+
+        self.pid         = pid
+        self.name        = name
+        self.cpu_percent = cpu_percent
+        self.mem_kb      = mem_kb
+        self.p_dyn_mw    = p_dyn_mw
+        self.p_leak_mw   = p_leak_mw
+        self.p_total_mw  = p_total_mw
+        self.starttime   = starttime
+
+        self.cores         = cores
+        self.core_p_dyn_mw = core_p_dyn_mw
+        self.measured_mw   = measured_mw
+        self.sample_ns     = sample_ns
+
+        self._index: Optional[Dict[int, int]] = None
+
+    # ---------- Sequence Protocol (legacy row view) ----------
+
+    def __len__(self) -> int:
+        return len(self.pid)
+
+    def __getitem__(self, i: int) -> Dict:
+        return self.row(i)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def row(self, i: int) -> Dict:
+        """Return row `i` as a legacy power-state dict."""
+        return {
+            "timestamp":     self.timestamp,
+            "pid":           int(self.pid[i]),
+            "name":          self.name[i],
+            "cpu_percent":   float(self.cpu_percent[i]),
+            "mem_kb":        int(self.mem_kb[i]),
+            "voltage_v":     self.voltage_v,
+            "freq_hz":       self.freq_hz,
+            "temperature_c": self.temperature_c,
+            "p_dyn_mw":      float(self.p_dyn_mw[i]),
+            "p_leak_mw":     float(self.p_leak_mw[i]),
+            "p_total_mw":    float(self.p_total_mw[i]),
+        }
+
+    def rows(self) -> List[Dict]:
+        return list(self)
+
+    # ---------- Selection ----------
+
+    def take(self, indices) -> "PowerFrame":
+        """Return a new frame holding only the rows at `indices`."""
+        return PowerFrame(
+            self.timestamp, self.voltage_v, self.freq_hz, self.temperature_c,
+            **{col: getattr(self, col)[indices] for col in self.COLUMNS},
+            starttime=None if self.starttime is None else self.starttime[indices],
+            cores=self.cores,
+            core_p_dyn_mw=self.core_p_dyn_mw,
+            measured_mw=self.measured_mw,
+            sample_ns=self.sample_ns,
+        )
+
+    def top(self, n: int, key: str = "cpu_percent") -> "PowerFrame":
+        """Return the `n` rows with the largest `key`, descending."""
+        order = np.argsort(-getattr(self, key), kind="stable")
+        return self.take(order[:n])
+
+    def index_of(self, pid: int) -> Optional[int]:
+        """Row index of `pid`, or None. The lookup table is built once."""
+        if self._index is None:
+            self._index = {p: i for i, p in enumerate(self.pid.tolist())}
+        return self._index.get(pid)
+
+    def identity(self, i: int) -> Optional[ProcessIdentity]:
+        """ProcessIdentity of row `i`, or None without starttimes."""
+        if self.starttime is None:
+            return None
+        return ProcessIdentity(int(self.pid[i]), int(self.starttime[i]))
+
+    def get(self, pid: int) -> Optional[Dict]:
+        """Row dict for `pid`, or None if it is not in this frame."""
+        i = self.index_of(pid)
+        return None if i is None else self.row(i)
+
+    # ---------- Export ----------
+
+    def csv_rows(self) -> Iterator[list]:
+        """
+        Yield rows in PowerLogger CSV column order.
+
+        Per-frame scalars are formatted once; per-process columns are
+        formatted array-wise.
+        """
+        ts   = self.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        volt = f"{self.voltage_v:.3f}"
+        freq = f"{self.freq_hz:.0f}"
+        temp = f"{self.temperature_c:.1f}"
+
+        cols = zip(
+            self.pid.tolist(),
+            self.name.tolist(),
+            np.char.mod("%.2f", self.cpu_percent).tolist(),
+            self.mem_kb.tolist(),
+            np.char.mod("%.3f", self.p_dyn_mw).tolist(),
+            np.char.mod("%.3f", self.p_leak_mw).tolist(),
+            np.char.mod("%.3f", self.p_total_mw).tolist(),
+        )
+        # measured_mw: this row's share of measured power, and
+        # system_measured_mw: the whole measurement; blank when modeled
+        measured = self.measured_mw is not None
+        system = f"{self.measured_mw:.3f}" if measured else ""
+        for pid, name, cpu, mem, p_dyn, p_leak, p_total in cols:
+            yield [ts, pid, name, cpu, mem, volt, freq, temp,
+                   p_dyn, p_leak, p_total, p_total if measured else "", system]
+
+    def __repr__(self):
+        return (
+            f"PowerFrame(n={len(self)}, "
+            f"V={self.voltage_v:.3f}, f={self.freq_hz:.0f}, "
+            f"T={self.temperature_c:.1f})"
+        )
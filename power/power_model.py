@@ -8,16 +8,53 @@ Pure power modeling equations.
 
 import math
 
+import numpy as np
+
+from power.calibration import load_calibration
 from power.constants import (
-    ALPHA,
-    C_EFF,
-    LEAK_LINEAR_A,
     LEAK_QUAD_B,
     LEAK_EXP_B,
+    LEAK_THERMAL_EA_K,
+    T_NOM_C,
     V_NOM,
 )
 
 
+LEAK_MODELS = ("linear", "quadratic", "exponential", "thermal")
+
+# α·C_eff and LEAK_LINEAR_A, replaced by ~/.akxos/calibration.json if present.
+# K_LEAK_LINEAR is not constants.K_LEAK, the unused base scale.
+K_DYN         = 0.0
+K_LEAK_LINEAR = 0.0
+
+# Measured system power with every CPU idle, in mW; 0.0 when not calibrated
+P_IDLE_MW = 0.0
+
+
+def reload_calibration(path=None):
+    """(Re)load the constants above from the calibration file (see power.calibration)."""
+    global K_DYN, K_LEAK_LINEAR, P_IDLE_MW
+    cal = load_calibration(path)
+    K_DYN, K_LEAK_LINEAR, P_IDLE_MW = cal["k_dyn"], cal["k_leak"], cal["p_idle_mw"]
+
+
+reload_calibration()
+
+
+def thermal_leakage_factor(temperature_c) -> float:
+    """
+    Arrhenius leakage scaling relative to T_NOM_C.
+
+    exp(Ea/k · (1/T_nom − 1/T)), with T in Kelvin. 1.0 at T_NOM_C; a
+    missing reading (None or 0.0, as returned by get_cpu_temp) is taken
+    as T_NOM_C.
+    """
+    t_c = temperature_c if temperature_c else T_NOM_C
+    return math.exp(LEAK_THERMAL_EA_K * (
+        1.0 / (T_NOM_C + 273.15) - 1.0 / (t_c + 273.15)
+    ))
+
+
 def compute_dynamic_power(voltage_v: float,
                           freq_hz: float,
                           activity: float) -> float:
@@ -40,13 +77,14 @@ def compute_dynamic_power(voltage_v: float,
     float
         Dynamic power in milliwatts
     """
-    p_dyn_w = ALPHA * C_EFF * (voltage_v ** 2) * freq_hz * activity
+    p_dyn_w = K_DYN * (voltage_v ** 2) * freq_hz * activity
     return p_dyn_w * 1e3  # W → mW
 
 
 def compute_leakage_power(mem_kb: float,
                           voltage_v: float,
-                          model: str) -> float:
+                          model: str,
+                          temperature_c: float = None) -> float:
     """
     Compute leakage power in milliwatts.
 
@@ -57,7 +95,9 @@ def compute_leakage_power(mem_kb: float,
     voltage_v : float
         Supply voltage in Volts
     model : str
-        One of: 'linear', 'quadratic', 'exponential'
+        One of LEAK_MODELS
+    temperature_c : float, optional
+        SoC temperature in °C; used by the 'thermal' model only
 
     Returns
     -------
@@ -68,19 +108,96 @@ def compute_leakage_power(mem_kb: float,
     V = voltage_v
 
     if model == "linear":
-        return LEAK_LINEAR_A * M * V
+        return K_LEAK_LINEAR * M * V
 
     elif model == "quadratic":
         return (
-            LEAK_LINEAR_A * M * V +
+            K_LEAK_LINEAR * M * V +
             LEAK_QUAD_B  * M * (V - V_NOM) ** 2
         )
 
     elif model == "exponential":
         return (
-            LEAK_LINEAR_A * M *
+            K_LEAK_LINEAR * M *
             math.exp(LEAK_EXP_B * (V - V_NOM))
         )
 
+    elif model == "thermal":
+        return K_LEAK_LINEAR * M * V * thermal_leakage_factor(temperature_c)
+
+    else:
+        raise ValueError(f"Unknown leakage model: {model!r}")
+
+
+# --- Batch (vectorized) API ---
+
+def compute_dynamic_power_batch(voltage_v: float,
+                                freq_hz,
+                                activity: np.ndarray) -> np.ndarray:
+    """
+    Vectorized compute_dynamic_power over an array of activity factors.
+
+    Parameters
+    ----------
+    voltage_v : float
+        Supply voltage in Volts
+    freq_hz : float or np.ndarray
+        Clock frequency in Hertz, shared or one per element of `activity`
+    activity : np.ndarray
+        Normalized activity factors (0.0–1.0), one per process
+
+    Returns
+    -------
+    np.ndarray
+        Dynamic power in milliwatts, same shape as `activity`
+    """
+    scale = K_DYN * (voltage_v ** 2) * freq_hz * 1e3  # W → mW
+    return scale * np.asarray(activity, dtype=np.float64)
+
+
+def compute_leakage_power_batch(mem_kb: np.ndarray,
+                                voltage_v: float,
+                                model: str,
+                                temperature_c: float = None) -> np.ndarray:
+    """
+    Vectorized compute_leakage_power over an array of memory sizes.
+
+    The model is dispatched once per call, not once per process.
+
+    Parameters
+    ----------
+    mem_kb : np.ndarray
+        Process resident memory in KB, one per process
+    voltage_v : float
+        Supply voltage in Volts
+    model : str
+        One of LEAK_MODELS
+    temperature_c : float, optional
+        SoC temperature in °C; used by the 'thermal' model only
+
+    Returns
+    -------
+    np.ndarray
+        Leakage power in milliwatts, same shape as `mem_kb`
+    """
+    # Normalize to MB; floor to avoid zero
+    M = np.maximum(np.asarray(mem_kb, dtype=np.float64) / 1024.0, 0.001)
+    V = voltage_v
+
+    if model == "linear":
+        return (K_LEAK_LINEAR * V) * M
+
+    elif model == "quadratic":
+        return (
+            K_LEAK_LINEAR * V +
+            LEAK_QUAD_B * (V - V_NOM) ** 2
+        ) * M
+
+    elif model == "exponential":
+        return (K_LEAK_LINEAR * math.exp(LEAK_EXP_B * (V - V_NOM))) * M
+
+    elif model == "thermal":
+        return (K_LEAK_LINEAR * V * thermal_leakage_factor(temperature_c)) * M
+
     else:
         raise ValueError(f"Unknown leakage model: {model!r}")
@@ -3,79 +3,312 @@
 akxOS Power State
 -----------------
 Composes per-process OS statistics with hardware telemetry
-and power models to produce per-process power state.
+and power models to produce per-process power state, and per-thread
+power attributed to the core each thread last ran on.
 
 """
 
-from typing import List, Dict
+import asyncio
+import functools
+import time
 from datetime import datetime
+from typing import AsyncIterator, NamedTuple
 
-from proc.process_info import get_process_stats
-from telemetry.sys_telemetry import (
-    get_cpu_voltage,
-    get_cpu_freq,
-    get_cpu_temp,
-)
+import numpy as np
+
+from proc.process_info import ProcessSampler
+from proc.thread_info import ThreadColumns, ThreadSampler
+from power import power_model
 from power.power_model import (
-    compute_dynamic_power,
-    compute_leakage_power,
+    compute_dynamic_power_batch,
+    compute_leakage_power_batch,
 )
+from power.power_frame import PowerFrame
+from power.snapshot_cache import SnapshotCache
+from telemetry.periodic import PeriodicScheduler
+from telemetry.power_meter import PowerMeter
+from telemetry.sampler import TelemetrySampler
+
+
+def _window_telemetry(sampler, telemetry_sampler: TelemetrySampler = None):
+    """
+    Telemetry for the sampler's latest window: the background sampler's
+    time-weighted mean when one is running, else the single read taken
+    with the snapshot.
+    """
+    if telemetry_sampler is not None and sampler.window_ns is not None:
+        t = telemetry_sampler.window_mean(*sampler.window_ns)
+        if t is not None:
+            return t
+    return sampler.telemetry
 
 
 def get_power_states(core_id: int = 0,
-                     leak_model: str = "linear") -> List[Dict]:
+                     leak_model: str = "linear",
+                     sampler: ProcessSampler = None,
+                     pids=None,
+                     telemetry_sampler: TelemetrySampler = None,
+                     power_meter: PowerMeter = None,
+                     cache: SnapshotCache = None) -> PowerFrame:
     """
     Compute power state for all active processes.
 
     Parameters
     ----------
     core_id : int
-        CPU core index for telemetry sampling (default: 0)
+        CPU core whose frequency is used when no per-core utilization
+        is available (default: 0)
+    sampler : ProcessSampler, optional
+        Persistent sampler for periodic callers. CPU% is then measured
+        over the window since its previous call, with no sleep. When
+        omitted, a blocking one-shot sample is taken.
+    pids : iterable of int, optional
+        Restrict the one-shot sample to these PIDs. Ignored when a
+        sampler is given (set `sampler.pids` instead).
+    telemetry_sampler : TelemetrySampler, optional
+        Running background sampler. Voltage, temperature and per-core
+        frequency are then averaged over the exact CPU% window instead
+        of read once.
+    power_meter : PowerMeter, optional
+        Measured system power, read right after the process snapshot.
+        When it returns a value, process and per-core power are its
+        dynamic part split by share of busy CPU time instead of the
+        model. The dynamic part is the measurement minus the static
+        baseline: the calibrated idle power (power_model.P_IDLE_MW), or
+        if uncalibrated the meter's own idle estimate (power_meter.idle).
+        The baseline is not charged to processes; leakage is reported
+        as 0.
+    cache : SnapshotCache, optional
+        Return a frame another consumer computed within the cache's
+        max age instead of sampling, if it has every PID requested.
+        Fresh samples are stored in it. On a hit `sampler` does not
+        advance, so its next window is longer.
 
     Returns
     -------
-    List[Dict]
-        List of power-annotated process states
+    PowerFrame
+        Columnar power-annotated process states. Iterating it yields the
+        legacy per-process dicts.
     """
-    # --- Sample hardware telemetry ONCE ---
-    voltage_v = get_cpu_voltage(core_id)
-    freq_hz = get_cpu_freq(core_id) * 1e6  # MHz → Hz
-    temperature_c = get_cpu_temp()
+    if cache is not None:
+        key = f"{leak_model}:{'measured' if power_meter is not None else 'model'}"
+        scope = pids if sampler is None else sampler.pids
+        if scope is not None:
+            scope = [int(p) for p in scope]
+        frame = cache.get(key, scope)
+        if frame is None:
+            frame = get_power_states(core_id, leak_model, sampler, pids,
+                                     telemetry_sampler, power_meter)
+            cache.put(key, frame, scope)
+        return frame
 
-    timestamp = datetime.now()
+    if sampler is None:
+        with ProcessSampler(pids=pids) as one_shot:
+            return get_power_states(core_id, leak_model, one_shot, None,
+                                    telemetry_sampler, power_meter)
 
-    power_states = []
+    timestamp = datetime.now()
 
     # --- Fetch per-process OS stats ---
-    processes = get_process_stats()
-
-    for proc in processes:
-        cpu_activity = proc["cpu"] / 100.0
-
-        p_dyn = compute_dynamic_power(
-            voltage_v=voltage_v,
-            freq_hz=freq_hz,
-            activity=cpu_activity,
-        )
-
-        p_leak = compute_leakage_power(
-          mem_kb=proc["mem"],
-          voltage_v=voltage_v,
-          model=leak_model,
-        )
-
-        power_states.append({
-            "timestamp": timestamp,
-            "pid": proc["pid"],
-            "name": proc["name"],
-            "cpu_percent": proc["cpu"],
-            "mem_kb": proc["mem"],
-            "voltage_v": voltage_v,
-            "freq_hz": freq_hz,
-            "temperature_c": temperature_c,
-            "p_dyn_mw": p_dyn,
-            "p_leak_mw": p_leak,
-            "p_total_mw": p_dyn + p_leak,
-        })
-
-    return power_states
+    procs = sampler.sample_columns()
+
+    # --- Hardware telemetry for the same window ---
+    telemetry     = _window_telemetry(sampler, telemetry_sampler)
+    voltage_v     = telemetry.voltage_v
+    temperature_c = telemetry.temperature_c
+
+    # --- Per-core dynamic power ---
+    # Each core at its own policy frequency; activity is the core's share
+    # of all-core time so that, at one shared clock, the cores sum to the
+    # same total as the lumped model.
+    cores = sampler.cores._replace(freq_hz=telemetry.freq_of(sampler.cores.cpu))
+    core_p_dyn = compute_dynamic_power_batch(
+        voltage_v=voltage_v,
+        freq_hz=cores.freq_hz,
+        activity=cores.share,
+    )
+
+    # A process's ticks are spread over the cores it ran on; price them at
+    # the busy-weighted frequency so processes sum to the per-core total.
+    freq_hz = cores.effective_freq_hz() or float(telemetry.freq_of([core_id])[0])
+
+    p_dyn = compute_dynamic_power_batch(
+        voltage_v=voltage_v,
+        freq_hz=freq_hz,
+        activity=procs.cpu / 100.0,
+    )
+
+    p_leak = compute_leakage_power_batch(
+        mem_kb=procs.mem,
+        voltage_v=voltage_v,
+        model=leak_model,
+        temperature_c=temperature_c,
+    )
+
+    # --- Measured dynamic power, apportioned by CPU share ---
+    measured_mw = power_meter.sample() if power_meter is not None else None
+    if measured_mw is not None:
+        busy = float(cores.share.sum())     # busy fraction of all-core time
+        power_meter.idle.update(measured_mw, busy)
+        static_mw = power_model.P_IDLE_MW or power_meter.idle.mw
+        dynamic_mw = max(measured_mw - static_mw, 0.0)
+        scale = dynamic_mw / busy if busy > 0 else 0.0
+        p_dyn      = procs.cpu / 100.0 * scale
+        p_leak     = np.zeros_like(p_dyn)
+        core_p_dyn = cores.share * scale
+
+    return PowerFrame(
+        timestamp     = timestamp,
+        voltage_v     = voltage_v,
+        freq_hz       = freq_hz,
+        temperature_c = temperature_c,
+        pid           = procs.pid,
+        name          = procs.name,
+        cpu_percent   = procs.cpu,
+        mem_kb        = procs.mem,
+        p_dyn_mw      = p_dyn,
+        p_leak_mw     = p_leak,
+        p_total_mw    = p_dyn + p_leak,
+        starttime     = procs.starttime,
+        cores         = cores,
+        core_p_dyn_mw = core_p_dyn,
+        measured_mw   = measured_mw,
+        sample_ns     = sampler.window_ns[1] if sampler.window_ns else None,
+    )
+
+
+async def stream_power_states(interval: float,
+                              pids=None,
+                              leak_model: str = "linear",
+                              telemetry_sampler: TelemetrySampler = None,
+                              power_meter: PowerMeter = None,
+                              cache: SnapshotCache = None,
+                              executor=None,
+                              clock_ns=time.monotonic_ns,
+                              cpu_backend: str = "stat",
+                              scheduler: PeriodicScheduler = None,
+                              ) -> AsyncIterator[PowerFrame]:
+    """
+    Yield a PowerFrame every `interval` seconds, forever.
+
+    Ticks fall on absolute deadlines (start + k · interval on `clock_ns`,
+    see telemetry.periodic), so sampling time and consumer time do not
+    accumulate into drift.
+    Deadlines missed because a consumer was slow are skipped, not
+    replayed. The /proc scan and pricing run in `executor` (the loop's
+    default thread pool when None), so the event loop keeps serving
+    other tasks while a snapshot is taken.
+
+    Each frame's CPU% covers exactly the time since the previous frame;
+    the first one is yielded after one interval. `pids` restricts the
+    sample as in get_power_states, `cpu_backend` selects the CPU
+    accounting as in ProcessSampler; the other parameters are passed on.
+    Pass `scheduler` to tick on it instead of a new one (its interval
+    then wins), e.g. to read its stats afterwards.
+    """
+    loop = asyncio.get_running_loop()
+    sampler = ProcessSampler(pids=pids, sample_delay=0.0, clock_ns=clock_ns,
+                             backend=cpu_backend)
+    sample = functools.partial(
+        get_power_states, leak_model=leak_model, sampler=sampler,
+        telemetry_sampler=telemetry_sampler, power_meter=power_meter,
+        cache=cache,
+    )
+    if scheduler is None:
+        scheduler = PeriodicScheduler(interval, clock_ns=clock_ns)
+    pending = None
+    try:
+        async for k in scheduler.aticks():
+            # Baseline on the first deadline, a frame on every later one
+            pending = loop.run_in_executor(
+                executor, sampler.warm_up if k == 0 else sample)
+            # Shielded: cancelling the consumer does not abandon a scan
+            # that is still using the sampler's descriptors
+            frame = await asyncio.shield(pending)
+            if k > 0:
+                yield frame
+    finally:
+        if pending is not None and not pending.done():
+            await asyncio.wait([pending])
+        sampler.close()
+
+
+class ThreadPowerState(NamedTuple):
+    """
+    Per-thread power for one tick, with its per-process and per-core sums.
+
+    threads  : ThreadColumns of the sample
+    freq_hz  : per-core frequency array used to price each thread
+    p_dyn_mw : dynamic power per thread row
+    process  : PowerFrame aggregated per process (leakage per process)
+    core_mw  : dynamic power per CPU index
+    """
+    threads:  ThreadColumns
+    freq_hz:  np.ndarray
+    p_dyn_mw: np.ndarray
+    process:  PowerFrame
+    core_mw:  np.ndarray
+
+
+def get_thread_power_states(sampler: ThreadSampler,
+                            leak_model: str = "linear",
+                            telemetry_sampler: TelemetrySampler = None
+                            ) -> ThreadPowerState:
+    """
+    Compute per-thread power for the sampler's PIDs.
+
+    Each thread's dynamic power uses the frequency of the core it last
+    ran on (stat field 39), so on hosts with per-core or per-cluster
+    clocks a thread on a fast core is not priced at core 0's frequency.
+    Leakage depends on resident memory, which threads share, so it is
+    computed once per process. `telemetry_sampler` is used as in
+    get_power_states.
+    """
+    timestamp = datetime.now()
+    threads   = sampler.sample_columns()
+
+    telemetry     = _window_telemetry(sampler, telemetry_sampler)
+    voltage_v     = telemetry.voltage_v
+    temperature_c = telemetry.temperature_c
+    freq_hz       = telemetry.freq_of(np.arange(sampler.n_cpus))
+
+    p_dyn = compute_dynamic_power_batch(
+        voltage_v=voltage_v,
+        freq_hz=telemetry.freq_of(threads.last_cpu),
+        activity=threads.cpu / 100.0,
+    )
+
+    pid, first, inverse = threads.by_process()
+    n = len(pid)
+    proc_cpu  = np.bincount(inverse, weights=threads.cpu, minlength=n).round(2)
+    proc_dyn  = np.bincount(inverse, weights=p_dyn, minlength=n)
+    proc_mem  = threads.mem[first]
+    proc_leak = compute_leakage_power_batch(
+        mem_kb=proc_mem,
+        voltage_v=voltage_v,
+        model=leak_model,
+        temperature_c=temperature_c,
+    )
+
+    process = PowerFrame(
+        timestamp     = timestamp,
+        voltage_v     = voltage_v,
+        freq_hz       = float(freq_hz.mean()),   # per-core values in freq_hz
+        temperature_c = temperature_c,
+        pid           = pid,
+        name          = threads.name[first],
+        cpu_percent   = proc_cpu,
+        mem_kb        = proc_mem,
+        p_dyn_mw      = proc_dyn,
+        p_leak_mw     = proc_leak,
+        p_total_mw    = proc_dyn + proc_leak,
+        starttime     = threads.starttime[first],
+    )
+
+    return ThreadPowerState(
+        threads  = threads,
+        freq_hz  = freq_hz,
+        p_dyn_mw = p_dyn,
+        process  = process,
+        core_mw  = threads.by_core(sampler.n_cpus, weights=p_dyn),
+    )
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+akxOS Snapshot Cache
+--------------------
+Reuse of one PowerFrame by every consumer within a freshness window.
+
+A snapshot scans /proc, reads sysfs and prices every process. When the
+live views, the logger and the budget engine each do that on their own
+interval, the host pays for N scans per tick. With a SnapshotCache
+passed to get_power_states(), a request is answered from the newest
+frame if it is younger than `max_age_s` and covers the requested PIDs.
+Only a miss takes a new sample.
+
+Frames are kept:
+
+- in process, per key (leak model and power source);
+- optionally across processes, in a small mmap'd file (`path`). It
+  holds the newest frame of any key, serialized as .npz (no pickle)
+  behind a seqlock header:
+
+      magic "AKXSNAP1" | seq u64 | t_ns i64 | length u64 | payload
+
+  A writer holds an flock, grows the file if needed, makes seq odd,
+  writes the payload, then makes seq even. A reader takes no lock and
+  never resizes the file: it copies the payload and retries if seq
+  changed or was odd. t_ns is CLOCK_MONOTONIC, which all processes on
+  the host share. The file is opened without following symlinks and
+  only if the caller owns it.
+
+A fresh frame covering every process is not replaced by a narrower one
+(for example the budget engine's budgeted PIDs), so a side-by-side
+"akxos log" keeps serving the engine.
+
+"""
+
+import fcntl
+import io
+import mmap
+import os
+import stat
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from power.power_frame import PowerFrame
+from proc.cpu_stat import CoreUtil
+
+
+DEFAULT_MAX_AGE_S = 0.5
+# One file per user: /dev/shm is world-writable, so another user's file
+# (or a symlink planted under this name) is never opened
+SNAPSHOT_FILE     = Path(f"/dev/shm/akxos-snapshot-{os.getuid()}") \
+    if os.path.isdir("/dev/shm") else Path.home() / ".akxos" / "snapshot"
+
+_MAGIC    = b"AKXSNAP1"
+_HEADER   = struct.Struct("<8sQqQ")          # magic, seq, t_ns, length
+_MIN_SIZE = 256 * 1024
+_RETRIES  = 8
+
+
+# ==========================================================
+# Frame (de)serialization
+# ==========================================================
+
+def _nan_if_none(x) -> float:
+    return np.nan if x is None else float(x)
+
+
+def _none_if_nan(x):
+    x = float(x)
+    return None if np.isnan(x) else x
+
+
+def encode_frame(key: str, scope, frame: PowerFrame) -> bytes:
+    """Frame and its cache key/scope as .npz bytes."""
+    arrays = {
+        "key":       np.array(key),
+        "scope":     np.array(sorted(scope) if scope is not None else [], dtype=np.int64),
+        "all":       np.array(scope is None),
+        "timestamp": np.array(frame.timestamp.isoformat()),
+        "scalars":   np.array([frame.voltage_v, frame.freq_hz,
+                               _nan_if_none(frame.temperature_c),
+                               _nan_if_none(frame.measured_mw)]),
+        "name":      np.array([str(n) for n in frame.name], dtype=str),
+    }
+    for col in PowerFrame.COLUMNS:
+        if col != "name":
+            arrays[col] = np.asarray(getattr(frame, col))
+    if frame.starttime is not None:
+        arrays["starttime"] = frame.starttime
+    if frame.cores is not None:
+        arrays.update(core_cpu=frame.cores.cpu, core_busy=frame.cores.busy,
+                      core_freq_hz=frame.cores.freq_hz)
+    if frame.core_p_dyn_mw is not None:
+        arrays["core_p_dyn_mw"] = frame.core_p_dyn_mw
+    if frame.sample_ns is not None:
+        arrays["sample_ns"] = np.array(frame.sample_ns, dtype=np.int64)
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+
+def decode_frame(payload: bytes):
+    """(key, scope, PowerFrame) from encode_frame() bytes."""
+    with np.load(io.BytesIO(payload), allow_pickle=False) as d:
+        scope = None if bool(d["all"]) else frozenset(d["scope"].tolist())
+        voltage_v, freq_hz, temp, measured = d["scalars"].tolist()
+        cores = (CoreUtil(d["core_cpu"], d["core_busy"], d["core_freq_hz"])
+                 if "core_cpu" in d else None)
+        frame = PowerFrame(
+            datetime.fromisoformat(str(d["timestamp"])),
+            voltage_v, freq_hz, _none_if_nan(temp),
+            name=d["name"].astype(object),
+            **{col: d[col] for col in PowerFrame.COLUMNS if col != "name"},
+            starttime=d["starttime"] if "starttime" in d else None,
+            cores=cores,
+            core_p_dyn_mw=d["core_p_dyn_mw"] if "core_p_dyn_mw" in d else None,
+            measured_mw=_none_if_nan(measured),
+            sample_ns=int(d["sample_ns"]) if "sample_ns" in d else None,
+        )
+        return str(d["key"]), scope, frame
+
+
+def decode_scope(payload: bytes):
+    """Only the scope of encode_frame() bytes (npz members load lazily)."""
+    with np.load(io.BytesIO(payload), allow_pickle=False) as d:
+        return None if bool(d["all"]) else frozenset(d["scope"].tolist())
+
+
+# ==========================================================
+# Cache
+# ==========================================================
+
+def _covers(have, want) -> bool:
+    """True if a frame of scope `have` contains every PID of `want`."""
+    return have is None or (want is not None and want <= have)
+
+
+def _select(frame: PowerFrame, scope) -> PowerFrame:
+    if scope is None:
+        return frame
+    return frame.take(np.flatnonzero(np.isin(frame.pid, list(scope))))
+
+
+class SnapshotCache:
+    """
+    Freshness-window cache of PowerFrames.
+
+    Parameters
+    ----------
+    max_age_s : float
+        Oldest frame that is still served.
+    path : str | PathLike | None
+        Shared mmap file; None keeps the cache in process.
+    clock_ns : callable
+        Monotonic clock; must be CLOCK_MONOTONIC when `path` is shared.
+
+    `hits` and `misses` count get() results.
+    """
+
+    def __init__(self, max_age_s: float = DEFAULT_MAX_AGE_S, path=None,
+                 clock_ns=time.monotonic_ns):
+        self.max_age_ns = int(max_age_s * 1e9)
+        self.path = None if path is None else Path(path)
+        self.clock_ns = clock_ns
+        self.hits = self.misses = 0
+        self._local: dict = {}      # key → (t_ns, scope, frame)
+        self._fd = None
+        self._map = None
+        self._seen_seq = None       # seq of the shared frame last decoded
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = self._open_shared(self.path)
+
+    # ---------- Shared file ----------
+
+    @staticmethod
+    def _open_shared(path: Path) -> int:
+        """Open `path` read-write, refusing symlinks and foreign files."""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC | os.O_NOFOLLOW,
+                     0o600)
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid():
+            os.close(fd)
+            raise PermissionError(f"{path} is not a regular file owned by this user")
+        return fd
+
+    def _mapped(self):
+        """The file's mmap at its current size, or None if it has no header."""
+        size = os.fstat(self._fd).st_size
+        if size < _HEADER.size:
+            return None
+        if self._map is None or len(self._map) != size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._fd, size)
+        return self._map
+
+    def _grow(self, need: int):
+        """Extend the file to hold `need` bytes. Call with the flock held."""
+        if os.fstat(self._fd).st_size < need:
+            os.ftruncate(self._fd, max(need, _MIN_SIZE))
+
+    def _read_shared(self):
+        """(t_ns, key, scope, frame) of the shared file, or None."""
+        for _ in range(_RETRIES):
+            m = self._mapped()
+            if m is None:
+                return None
+            magic, seq, t_ns, length = _HEADER.unpack_from(m, 0)
+            if magic != _MAGIC:
+                return None
+            if seq & 1 or _HEADER.size + length > len(m):
+                time.sleep(0)
+                continue
+            if seq == self._seen_seq or self.clock_ns() - t_ns > self.max_age_ns:
+                return None     # already in _local, or stale
+            payload = m[_HEADER.size:_HEADER.size + length]
+            if _HEADER.unpack_from(m, 0)[1] != seq:
+                continue
+            try:
+                key, scope, frame = decode_frame(payload)
+            except (OSError, ValueError, KeyError):
+                return None
+            self._seen_seq = seq
+            return t_ns, key, scope, frame
+        return None
+
+    def _write_shared(self, t_ns: int, key: str, scope, frame: PowerFrame):
+        payload = encode_frame(key, scope, frame)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            self._grow(_HEADER.size + len(payload))
+            m = self._mapped()
+            magic, seq, old_t, _ = _HEADER.unpack_from(m, 0)
+            if magic != _MAGIC:
+                seq = 0
+            elif (self.clock_ns() - old_t <= self.max_age_ns
+                  and not _covers(scope, self._shared_scope(m))):
+                return      # keep the fresher, wider frame
+            seq |= 1                    # odd: write in progress
+            _HEADER.pack_into(m, 0, _MAGIC, seq, t_ns, len(payload))
+            m[_HEADER.size:_HEADER.size + len(payload)] = payload
+            _HEADER.pack_into(m, 0, _MAGIC, seq + 1, t_ns, len(payload))
+            self._seen_seq = seq + 1
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _shared_scope(m):
+        """Scope of the frame currently in the file (under the lock)."""
+        _, _, _, length = _HEADER.unpack_from(m, 0)
+        try:
+            return decode_scope(m[_HEADER.size:_HEADER.size + length])
+        except (OSError, ValueError, KeyError):
+            return frozenset()
+
+    # ---------- API ----------
+
+    def get(self, key: str, pids=None):
+        """
+        A fresh frame for `key` holding `pids` (None: every process),
+        or None. Wider frames are narrowed to `pids`.
+        """
+        want = None if pids is None else frozenset(int(p) for p in pids)
+        now = self.clock_ns()
+
+        entry = self._local.get(key)
+        if entry is not None and now - entry[0] <= self.max_age_ns \
+                and _covers(entry[1], want):
+            self.hits += 1
+            return _select(entry[2], want)
+
+        if self._fd is not None:
+            shared = self._read_shared()
+            if shared is not None:
+                t_ns, s_key, scope, frame = shared
+                self._local[s_key] = (t_ns, scope, frame)
+                if s_key == key and _covers(scope, want):
+                    self.hits += 1
+                    return _select(frame, want)
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, frame: PowerFrame, pids=None, t_ns: int = None):
+        """Store a frame sampled at `t_ns` (default now) for `pids`."""
+        scope = None if pids is None else frozenset(int(p) for p in pids)
+        t_ns = self.clock_ns() if t_ns is None else t_ns
+        self._local[key] = (t_ns, scope, frame)
+        if self._fd is not None:
+            self._write_shared(t_ns, key, scope, frame)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
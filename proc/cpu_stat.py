@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+akxOS Per-Core CPU Stat Parser
+------------------------------
+Reads every line of /proc/stat that describes a CPU in one read:
+- the aggregate "cpu" line (total ticks, as read_total_cpu_time)
+- one "cpuN" line per online core
+
+and turns successive reads into per-core busy fractions. Cores idle
+and change frequency independently, so dynamic power is computed per
+core rather than from one lumped CPU.
+
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from hostfs.roots import proc_root
+from telemetry.reader import TelemetryReader, TelemetrySample
+
+
+# Column order of a cpuN line (proc(5)); guest time is already included
+# in user/nice, so guest and guest_nice are left out of the totals.
+_USER, _NICE, _SYSTEM, _IDLE, _IOWAIT, _IRQ, _SOFTIRQ, _STEAL = range(8)
+_N_COUNTERS = 8
+
+
+def read_cpu_stat():
+    """
+    Parse /proc/stat once.
+
+    Returns
+    -------
+    tuple : (total: int, cpu: int64 ndarray, counters: int64 ndarray)
+        `total` is the sum of every field on the aggregate line (the
+        read_total_cpu_time value); `counters` is one row per core in
+        `cpu`, columns user … steal, in clock ticks.
+    """
+    with open(proc_root().join("stat"), "rb") as f:
+        data = f.read()
+
+    total = 1
+    cpus, rows = [], []
+    for line in data.split(b"\n"):
+        if not line.startswith(b"cpu"):
+            break               # cpu lines come first; stop at "intr"
+        fields = line.split()
+        if fields[0] == b"cpu":
+            total = sum(map(int, fields[1:]))
+        else:
+            cpus.append(int(fields[0][3:]))
+            rows.append(fields[1:_N_COUNTERS + 1])
+
+    counters = np.array(rows, dtype=np.int64).reshape(len(rows), -1)
+    if counters.shape[1] < _N_COUNTERS:   # pre-2.6.11 kernels: no steal etc.
+        counters = np.pad(counters, ((0, 0), (0, _N_COUNTERS - counters.shape[1])))
+    return total, np.array(cpus, dtype=np.int64), counters
+
+
+class CoreUtil(NamedTuple):
+    """
+    Per-core utilization over one window.
+
+    cpu : int64 ndarray      busy : float64 ndarray (0.0–1.0 of that core)
+    freq_hz : float64 ndarray (current frequency of the core's policy)
+    """
+    cpu:     np.ndarray
+    busy:    np.ndarray
+    freq_hz: np.ndarray
+
+    @property
+    def share(self) -> np.ndarray:
+        """Each core's busy time as a share of all-core time."""
+        return self.busy / max(len(self.cpu), 1)
+
+    def effective_freq_hz(self) -> float:
+        """Busy-weighted mean frequency; the plain mean when all idle."""
+        w = self.busy.sum()
+        if w <= 0:
+            return float(self.freq_hz.mean()) if len(self.freq_hz) else 0.0
+        return float((self.busy * self.freq_hz).sum() / w)
+
+
+class CoreSampler:
+    """
+    Keeps the previous /proc/stat counters and returns per-core busy
+    fractions since the last call. The first call measures since boot.
+
+    `total` is the aggregate-line tick count of the latest read, so one
+    read serves both per-process CPU% and per-core power. `telemetry`
+    is the TelemetrySample (voltage, temperature, per-core frequency)
+    read alongside it through `reader`, created on first use.
+    """
+
+    def __init__(self, reader: TelemetryReader = None):
+        self.total = 1
+        self.reader = reader
+        self.telemetry: TelemetrySample | None = None
+        self._cpu  = None
+        self._prev = None
+
+    def sample(self) -> CoreUtil:
+        """Read /proc/stat and sysfs telemetry; return CoreUtil."""
+        try:
+            self.total, cpu, counters = read_cpu_stat()
+        except (OSError, ValueError):
+            self.total = 1
+            cpu      = np.zeros(0, dtype=np.int64)
+            counters = np.zeros((0, _N_COUNTERS), dtype=np.int64)
+
+        idle = counters[:, _IDLE] + counters[:, _IOWAIT]
+        all_ = counters.sum(axis=1)
+
+        # Hotplug changes the core set: fall back to since-boot for this window
+        if self._prev is not None and np.array_equal(cpu, self._cpu):
+            d_all  = all_ - self._prev[0]
+            d_idle = idle - self._prev[1]
+        else:
+            d_all, d_idle = all_, idle
+        self._cpu, self._prev = cpu, (all_, idle)
+
+        busy = np.clip((d_all - d_idle) / np.maximum(d_all, 1), 0.0, 1.0)
+
+        if self.reader is None:
+            self.reader = TelemetryReader()
+        self.telemetry = self.reader.read()
+
+        return CoreUtil(
+            cpu     = cpu,
+            busy    = busy,
+            freq_hz = self.telemetry.freq_of(cpu),
+        )
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+akxOS Process Identity
+----------------------
+A PID alone does not name a process: the kernel recycles PIDs, so a
+delta, cache entry or budget keyed by PID can silently attach to an
+unrelated process. (pid, starttime) does — starttime (/proc/<pid>/stat
+field 22, clock ticks since boot) is fixed for a process's lifetime and
+two processes cannot hold the same PID at the same tick.
+
+Anything that remembers a process across samples or restarts should
+store a ProcessIdentity and compare it on every read.
+
+"""
+
+from typing import NamedTuple, Optional
+
+from hostfs.roots import proc_root
+from proc.stat_parser import parse_pid_stat
+
+
+class ProcessIdentity(NamedTuple):
+    """A process that survives PID reuse: (pid, starttime)."""
+    pid:       int
+    starttime: int    # clock ticks since boot (stat field 22)
+
+    @classmethod
+    def of(cls, pid: int) -> Optional["ProcessIdentity"]:
+        """Identity of the process currently holding `pid`, or None."""
+        try:
+            with open(proc_root().join(pid, "stat"), "rb") as f:
+                st = parse_pid_stat(f.read())
+        except OSError:
+            return None
+        return None if st is None else cls(int(pid), st.starttime)
+
+    def is_alive(self) -> bool:
+        """True while this exact process (not a PID reuse) exists."""
+        return ProcessIdentity.of(self.pid) == self
+
+    def __str__(self) -> str:
+        return f"{self.pid}@{self.starttime}"
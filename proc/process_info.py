@@ -7,8 +7,33 @@ Reads process information from /proc/[pid]/stat and computes:
 
 """
 
+import errno
 import os
+import resource
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from hostfs.roots import proc_root
+from proc.cpu_stat import CoreSampler, CoreUtil
+from proc.identity import ProcessIdentity
+from proc.stat_parser import parse_pid_stat
+
+
+STAT_BUF_SIZE = 4096   # /proc/<pid>/stat is well under one page
+FD_POOL_MAX   = 4096   # Upper bound on cached descriptors, all pools together
+
+# Below this many PIDs a parallel scan costs more in thread hand-off than
+# it saves, so the sampler stays serial even when workers > 1.
+PARALLEL_MIN_PIDS = 1024
+
+CLK_TCK     = os.sysconf("SC_CLK_TCK")   # typically 100 on Linux
+NS_PER_TICK = 1_000_000_000 // CLK_TCK
+
+CPU_BACKENDS = ("stat", "schedstat", "auto")
 
 
 # --- Internal Helpers ---
@@ -16,78 +41,560 @@ import time
 def read_total_cpu_time() -> int:
     """Reads total CPU time from /proc/stat (sum of all core ticks)."""
     try:
-        with open("/proc/stat", "r") as f:
+        with open(proc_root().join("stat"), "r") as f:
             fields = f.readline().split()[1:]
             return sum(map(int, fields))
     except Exception:
         return 1  # Prevent division by zero downstream
 
 
-def _read_pid_stat(pid: str):
+def count_online_cpus() -> int:
+    """Number of cpuN lines in /proc/stat (online CPUs)."""
+    try:
+        with open(proc_root().join("stat"), "r") as f:
+            n = sum(1 for line in f
+                    if line.startswith("cpu") and line[3].isdigit())
+        return max(n, 1)
+    except Exception:
+        return os.cpu_count() or 1
+
+
+def _read_pid_stat(pid: str, pool=None):
     """
-    Read /proc/{pid}/stat once and return (name, mem_kb, cpu_ticks).
+    Read /proc/{pid}/stat once and return (name, mem_kb, cpu_ticks, starttime).
 
     Previously this was two separate functions (read_pid_cpu_time and
     read_pid_name_and_mem) each opening the file independently.
     Combining them halves the syscall count and removes the tiny timestamp
     skew between the two reads.
 
+    When a StatFdPool is given, the file is re-read through its cached
+    descriptor instead of being opened and closed again. Parsing goes
+    through proc.stat_parser, which tolerates spaces and parentheses in
+    the process name.
+
     Returns
     -------
-    tuple : (name: str | None, mem_kb: int, cpu_ticks: int)
+    tuple : (name: str | None, mem_kb: int, cpu_ticks: int, starttime: int)
+    """
+    if pool is not None:
+        st = pool.read(pid)
+    else:
+        try:
+            with open(proc_root().join(pid, "stat"), "rb") as f:
+                st = parse_pid_stat(f.read())
+        except OSError:
+            st = None
+    if st is None:
+        return None, 0, 0, 0
+    # utime + stime; RSS pages × 4 KB
+    return st.comm, st.rss_pages * 4, st.utime + st.stime, st.starttime
+
+
+def _fd_pool_cap() -> int:
+    """
+    Process-wide descriptor budget for every pool together: half the
+    soft RLIMIT_NOFILE, at most FD_POOL_MAX.
     """
     try:
-        with open(f"/proc/{pid}/stat", "r") as f:
-            data = f.read().split()
-        name = data[1].strip("()")
-        cpu_ticks = int(data[13]) + int(data[14])   # utime + stime
-        mem_kb = int(data[23]) * 4                  # RSS pages × 4 KB
-        return name, mem_kb, cpu_ticks
-    except Exception:
-        return None, 0, 0
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ValueError, OSError):
+        soft = 1024
+    if soft == resource.RLIM_INFINITY:
+        soft = 2 * FD_POOL_MAX
+    return max(16, min(FD_POOL_MAX, soft // 2))
 
 
-# --- Core Function ---
+def _fd_pool_share(kinds: int, workers: int = 1) -> int:
+    """
+    One pool's slice of _fd_pool_cap(), for a sampler holding `kinds`
+    kinds of pool (stat, schedstat, …) per worker across `workers`.
+    """
+    return max(16, _fd_pool_cap() // (kinds * workers))
+
 
-def get_process_stats(sample_delay: float = 0.05) -> list:
+# --- Descriptor Pool ---
+
+_STALE    = object()   # Sentinel from ProcFdPool._decode: reopen the entry
+_UNCACHED = object()   # Sentinel from ProcFdPool._open: out of descriptors
+
+
+class ProcFdPool:
     """
-    Returns a list of dicts:
-        {'pid': int, 'name': str, 'cpu': float, 'mem': int}
+    LRU cache of open /proc/<pid>/<filename> descriptors.
+
+    The file stays open between samples and is re-read with preadv() at
+    offset 0 into one reusable buffer, replacing an open/read/close per
+    PID per snapshot. Entries are evicted when the process exits (the
+    kernel fails reads on a stale descriptor with ESRCH), when `retain()`
+    no longer lists the PID, or when the LRU cap is reached.
+
+    Running out of descriptors (EMFILE/ENFILE) is not taken for an exited
+    process: the least recently used entry is closed and the file is read
+    once without caching it.
+    """
+
+    def __init__(self, filename: str, max_fds: int | None = None):
+        self.filename = filename
+        self.max_fds  = max_fds if max_fds is not None else _fd_pool_cap()
+
+        # pid -> [fd, identity tag]
+        self._entries: OrderedDict = OrderedDict()
+        self._buf  = bytearray(STAT_BUF_SIZE)
+        self._view = memoryview(self._buf)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _open(self, pid: str):
+        try:
+            fd = os.open(proc_root().join(pid, self.filename),
+                         os.O_RDONLY | os.O_CLOEXEC)
+        except OSError as e:
+            if e.errno not in (errno.EMFILE, errno.ENFILE):
+                return None
+            # Out of descriptors, not an exited process: hand back the
+            # least recently used one and let read() go uncached
+            if self._entries:
+                self._evict(next(iter(self._entries)))
+            return _UNCACHED
+        self._entries[pid] = [fd, None]
+        while len(self._entries) > self.max_fds:
+            _, (old_fd, _) = self._entries.popitem(last=False)
+            os.close(old_fd)
+        return fd
+
+    def _evict(self, pid: str):
+        entry = self._entries.pop(pid, None)
+        if entry is not None:
+            os.close(entry[0])
+
+    def _pread(self, fd: int) -> bytes:
+        n = os.preadv(fd, (self._buf,), 0)
+        return self._view[:n].tobytes()
+
+    def _read_once(self, pid: str):
+        """open/pread/close without caching; None if the process is gone."""
+        try:
+            fd = os.open(proc_root().join(pid, self.filename),
+                         os.O_RDONLY | os.O_CLOEXEC)
+        except OSError as e:
+            if e.errno in (errno.EMFILE, errno.ENFILE):
+                raise
+            return None
+        try:
+            return self._pread(fd)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+
+    def _decode(self, entry: list, data: bytes):
+        """
+        Hook: turn raw file bytes into the value `read()` returns.
+        Return _STALE if the data shows the entry no longer refers to
+        the process it was opened for.
+        """
+        return data
+
+    def read(self, pid: str):
+        """Return the decoded file contents for `pid`, or None if gone."""
+        entry = self._entries.get(pid)
+
+        if entry is not None:
+            self._entries.move_to_end(pid)
+            try:
+                data = self._pread(entry[0])
+            except OSError as e:
+                # ESRCH: the process behind this descriptor has exited.
+                # Reopen below in case the PID already belongs to a new one.
+                self._evict(pid)
+                if e.errno != errno.ESRCH:
+                    return None
+                entry = None
+
+        if entry is None:
+            fd = self._open(pid)
+            if fd is None:
+                return None
+            if fd is _UNCACHED:
+                data = self._read_once(pid)
+                return None if data is None else self._decode([None, None], data)
+            try:
+                data = self._pread(fd)
+            except OSError:
+                self._evict(pid)
+                return None
+            entry = self._entries[pid]
+
+        value = self._decode(entry, data)
+        if value is _STALE:
+            self._evict(pid)
+            return self.read(pid)
+
+        return value
+
+    def retain(self, pids):
+        """Close descriptors for PIDs not in `pids`."""
+        for pid in [p for p in self._entries if p not in pids]:
+            self._evict(pid)
+
+    def close(self):
+        """Close every cached descriptor."""
+        for fd, _ in self._entries.values():
+            os.close(fd)
+        self._entries.clear()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class StatFdPool(ProcFdPool):
+    """
+    ProcFdPool for /proc/<pid>/stat that returns parsed PidStat records
+    (or TaskStat with `parser=parse_task_stat`). Entries are bound to a
+    process identity (pid, starttime) on first read. A later starttime
+    mismatch means the descriptor no longer refers to the process it was
+    opened for, and the entry is reopened.
+    """
+
+    def __init__(self, max_fds: int | None = None, parser=parse_pid_stat):
+        super().__init__("stat", max_fds)
+        self._parse = parser
+
+    def _decode(self, entry: list, data: bytes):
+        st = self._parse(data)
+        if st is None:
+            return None
+        if entry[1] is None:
+            entry[1] = st.starttime
+        return st if entry[1] == st.starttime else _STALE
+
+
+def _read_pid_schedstat(pid: str, pool: ProcFdPool):
+    """Return sum_exec_runtime (ns) from /proc/<pid>/schedstat, or None."""
+    data = pool.read(pid)
+    if not data:
+        return None
+    try:
+        return int(data.split(None, 1)[0])
+    except ValueError:
+        return None
+
+
+def _scan_shard(pids, pool: StatFdPool, sched_pool: ProcFdPool = None) -> dict:
+    """
+    Read one shard of PIDs through its own pools; safe to run in a thread.
+
+    With `sched_pool`, the CPU counter is sum_exec_runtime in ns; a PID
+    without a readable schedstat falls back to its stat ticks in ns.
+    """
+    snapshot: dict = {}
+    for pid in pids:
+        name, mem_kb, cpu, starttime = _read_pid_stat(pid, pool)
+        if not name:
+            continue
+        if sched_pool is not None:
+            runtime_ns = _read_pid_schedstat(pid, sched_pool)
+            cpu = runtime_ns if runtime_ns is not None else cpu * NS_PER_TICK
+        snapshot[pid] = (name, mem_kb, cpu, starttime)
+    pool.retain(snapshot)
+    if sched_pool is not None:
+        sched_pool.retain(snapshot)
+    return snapshot
+
+
+# --- Columnar Result ---
+
+class ProcessColumns(NamedTuple):
+    """
+    One sample as parallel arrays instead of one dict per process.
+
+    pid : int64 ndarray     cpu : float64 ndarray (%)
+    name : object ndarray   mem : int64 ndarray (KB)
+    starttime : int64 ndarray (ticks since boot; with pid, the
+                ProcessIdentity of each row)
+    """
+    pid:       np.ndarray
+    name:      np.ndarray
+    cpu:       np.ndarray
+    mem:       np.ndarray
+    starttime: np.ndarray
+
+    def identity(self, i: int) -> ProcessIdentity:
+        """ProcessIdentity of row `i`."""
+        return ProcessIdentity(int(self.pid[i]), int(self.starttime[i]))
+
+    def rows(self) -> list:
+        """Expand to the legacy list-of-dicts form."""
+        return [
+            {"pid": pid, "name": name, "cpu": cpu, "mem": mem}
+            for pid, name, cpu, mem in zip(
+                self.pid.tolist(), self.name.tolist(),
+                self.cpu.tolist(), self.mem.tolist(),
+            )
+        ]
+
+
+# --- Incremental Sampler ---
+
+class ProcessSampler:
+    """
+    Stateful /proc sampler that keeps the previous snapshot between calls.
+
+    Each `sample()` returns CPU deltas since the previous call, so periodic
+    callers (live views, logger, budget engine) pay for one /proc scan per
+    tick and never sleep. Only the first call, or an explicit `warm_up()`,
+    blocks for `sample_delay` to establish a baseline.
+
+    With `pids` set, only those /proc/<pid>/stat files (plus /proc/stat)
+    are read instead of sweeping all of /proc. PIDs that have exited are
+    silently dropped from the result.
+
+    Stat files are read through a persistent StatFdPool, so steady-state
+    ticks cost one preadv() per process instead of open/read/close.
 
-    Two-snapshot approach to compute CPU delta. Each PID's stat file is
-    opened once per snapshot (not twice as before).
+    With `workers` > 1, PIDs are sharded by `pid % workers` across a
+    thread pool; each shard owns its descriptor pool so threads share no
+    state. File reads release the GIL. Tables smaller than
+    `parallel_threshold` are still scanned serially. `workers=None`
+    picks one worker per CPU.
+
+    CPU accounting backends:
+        stat        utime + stime in clock ticks (SC_CLK_TCK, ~10 ms)
+                    against the /proc/stat total.
+        schedstat   sum_exec_runtime in ns from /proc/<pid>/schedstat
+                    against elapsed monotonic time × online CPUs. Sub-tick
+                    precision, so windows of 10–20 ms stay meaningful.
+        auto        schedstat when available, otherwise stat.
+    Requesting schedstat on a kernel without it also falls back to stat.
+    `clock_ns` replaces time.monotonic_ns for synthetic hosts.
+
+    After each sample, `cores` holds per-core busy fractions and
+    frequencies (proc.cpu_stat.CoreUtil) for the same window,
+    `telemetry` the voltage/temperature read in the same pass, and
+    `window_ns` the window's (start, end) on `clock_ns`.
     """
-    # --- First snapshot ---
-    total_time_1 = read_total_cpu_time()
-    snapshot_1: dict = {}
 
-    for pid in filter(str.isdigit, os.listdir("/proc")):
-        name, mem_kb, cpu_ticks = _read_pid_stat(pid)
-        if name:
-            snapshot_1[pid] = (name, mem_kb, cpu_ticks)
+    def __init__(self,
+                 sample_delay:       float = 0.05,
+                 pids=None,
+                 workers:            int | None = 1,
+                 parallel_threshold: int = PARALLEL_MIN_PIDS,
+                 backend:            str = "stat",
+                 clock_ns=time.monotonic_ns):
+        if backend not in CPU_BACKENDS:
+            raise ValueError(f"Unknown CPU accounting backend: {backend!r}")
+
+        self.sample_delay       = sample_delay
+        self.workers            = workers if workers else (os.cpu_count() or 1)
+        self.parallel_threshold = parallel_threshold
+        self.backend            = backend
+        self.clock_ns           = clock_ns
+
+        self._pids:          frozenset | None = None
+        self._prev_total:    int | None       = None
+        self._prev_ns:       int              = 0
+        self._snap_ns:       int              = 0
+        # (start, end) clock_ns of the latest sample's window
+        self.window_ns: tuple | None = None
+        self._prev_snapshot: dict             = {}
+        self._executor: ThreadPoolExecutor | None = None
+        # stat pools, and schedstat pools if that backend is picked, split
+        # one descriptor budget between them and across workers
+        cap = _fd_pool_share(1 if backend == "stat" else 2, self.workers)
+        self._fd_pools = [StatFdPool(cap) for _ in range(self.workers)]
+        self._sched_pools = None
+        self._n_cpus      = 1
+
+        # /proc/stat is read once per snapshot for both the CPU% total and
+        # per-core utilization; `cores` covers the same window as the
+        # latest sample_columns().
+        self._core_sampler = CoreSampler()
+        self.cores: CoreUtil | None = None
+
+        self.pids = pids
+
+    @property
+    def telemetry(self):
+        """TelemetrySample read with the latest snapshot, or None."""
+        return self._core_sampler.telemetry
+
+    @property
+    def pids(self):
+        """PIDs to sample, or None to scan every process."""
+        return self._pids
+
+    @pids.setter
+    def pids(self, pids):
+        new = None if pids is None else frozenset(str(int(p)) for p in pids)
+
+        # A newly targeted PID has no baseline and has been running for an
+        # unknown time, so its ticks cannot be attributed to this window.
+        # Re-baseline instead of reporting its lifetime CPU as one tick.
+        if self._pids is not None and (new is None or not new <= self._pids):
+            self.reset()
+        self._pids = new
 
-    time.sleep(sample_delay)
+    def _resolve_backend(self):
+        """
+        Settle 'auto'/'schedstat' against what this kernel exposes.
 
-    # --- Second snapshot ---
-    total_time_2 = read_total_cpu_time()
-    total_delta = max(total_time_2 - total_time_1, 1)
+        Runs once, on the first snapshot, so the baseline and every later
+        snapshot use the same units.
+        """
+        root  = proc_root().base
+        probe = next((p for p in os.listdir(root) if p.isdigit()), None)
+        if probe and os.path.exists(proc_root().join(probe, "schedstat")):
+            self.backend = "schedstat"
+            self._n_cpus = count_online_cpus()
+            cap = self._fd_pools[0].max_fds
+            self._sched_pools = [ProcFdPool("schedstat", cap)
+                                 for _ in range(self.workers)]
+        else:
+            self.backend = "stat"
 
-    process_data = []
+    def _snapshot(self):
+        """Return (total_cpu_time, {pid: (name, mem_kb, cpu_time)})."""
+        if self.backend != "stat" and self._sched_pools is None:
+            self._resolve_backend()
 
-    for pid, (name, mem_kb, t1) in snapshot_1.items():
-        _, _, t2 = _read_pid_stat(pid)
+        if self._pids is not None:
+            pids = self._pids
+        else:
+            pids = [p for p in os.listdir(proc_root().base) if p.isdigit()]
+
+        self.cores = self._core_sampler.sample()
+        now_ns = self._snap_ns = self.clock_ns()
+        if self._sched_pools is not None:
+            total_time = now_ns * self._n_cpus
+        else:
+            total_time = self._core_sampler.total
+
+        snapshot: dict = {}
+        for part in self._scan(pids):
+            snapshot.update(part)
+
+        return total_time, snapshot
+
+    def _scan(self, pids):
+        """Return per-shard snapshots, scanned in parallel for large tables."""
+        n = len(self._fd_pools)
+        sched_pools = self._sched_pools or [None] * n
+        if n == 1:
+            return [_scan_shard(pids, self._fd_pools[0], sched_pools[0])]
+
+        shards = [[] for _ in range(n)]
+        for pid in pids:
+            shards[int(pid) % n].append(pid)
+
+        if sum(map(len, shards)) < self.parallel_threshold:
+            return map(_scan_shard, shards, self._fd_pools, sched_pools)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=n, thread_name_prefix="akxos-proc"
+            )
+        return self._executor.map(_scan_shard, shards, self._fd_pools,
+                                  sched_pools)
+
+    def warm_up(self):
+        """Take a baseline snapshot and block for `sample_delay`."""
+        self._prev_total, self._prev_snapshot = self._snapshot()
+        self._prev_ns = self._snap_ns
+        time.sleep(self.sample_delay)
+
+    def reset(self):
+        """Drop the baseline; the next `sample()` blocks again."""
+        self._prev_total    = None
+        self._prev_snapshot = {}
+
+    def close(self):
+        """Release cached /proc descriptors and worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for pool in self._fd_pools + (self._sched_pools or []):
+            pool.close()
+        self._core_sampler.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sample_columns(self) -> ProcessColumns:
+        """
+        Take one sample and return it as ProcessColumns.
+
+        CPU% is computed over the window since the previous call.
+        """
+        if self._prev_total is None:
+            self.warm_up()
+
+        total_time, snapshot = self._snapshot()
+        total_delta = max(total_time - self._prev_total, 1)
+
+        n    = len(snapshot)
+        prev = self._prev_snapshot
+        no_prev = (None, 0, 0, -1)
+
+        keys = list(snapshot)
+        rows = list(snapshot.values())
+        t2 = np.fromiter((r[2] for r in rows), dtype=np.int64, count=n)
+        start = np.fromiter((r[3] for r in rows), dtype=np.int64, count=n)
+        before = [prev.get(k, no_prev) for k in keys]
+        t1 = np.fromiter((r[2] for r in before), dtype=np.int64, count=n)
+        # A PID missing from the previous snapshot, or now held by a
+        # different process (starttime changed: PID reuse), was spawned
+        # inside the window, so all of its ticks belong to this window.
+        reused = np.fromiter((r[3] for r in before), dtype=np.int64, count=n) != start
+        t1[reused] = 0
 
         # Clamp to 0: kernel accounting quirks can yield t2 < t1
-        cpu_percent = max(0.0, 100.0 * (t2 - t1) / total_delta)
+        cpu = np.maximum(0.0, 100.0 * (t2 - t1) / total_delta).round(2)
+
+        self._prev_total    = total_time
+        self.window_ns      = (self._prev_ns, self._snap_ns)
+        self._prev_ns       = self._snap_ns
+        self._prev_snapshot = snapshot
+
+        return ProcessColumns(
+            pid       = np.fromiter(map(int, keys), dtype=np.int64, count=n),
+            name      = np.array([r[0] for r in rows], dtype=object),
+            cpu       = cpu,
+            mem       = np.fromiter((r[1] for r in rows), dtype=np.int64, count=n),
+            starttime = start,
+        )
+
+    def sample(self) -> list:
+        """
+        Returns a list of dicts:
+            {'pid': int, 'name': str, 'cpu': float, 'mem': int}
+
+        CPU% is computed over the window since the previous call.
+        """
+        return self.sample_columns().rows()
 
-        process_data.append({
-            "pid":  int(pid),
-            "name": name,
-            "cpu":  round(cpu_percent, 2),
-            "mem":  mem_kb,
-        })
 
-    return process_data
+# --- Core Function ---
+
+def get_process_stats(sample_delay: float = 0.05, pids=None) -> list:
+    """
+    Returns a list of dicts:
+        {'pid': int, 'name': str, 'cpu': float, 'mem': int}
+
+    One-shot helper: blocks for `sample_delay` between two snapshots.
+    Periodic callers should hold a ProcessSampler instead so that only
+    the first tick pays for the delay. Pass `pids` to read only those
+    processes.
+    """
+    with ProcessSampler(sample_delay=sample_delay, pids=pids) as sampler:
+        return sampler.sample()
 
 
 # --- Standalone Execution ---
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+akxOS /proc/<pid>/stat Parser
+-----------------------------
+Bytes-level parser for the per-process stat line.
+
+The second field, comm, is wrapped in parentheses but is otherwise
+arbitrary: it may contain spaces and parentheses ("Web Content",
+"kworker/u8:2 (events)", "a) b"). Splitting the whole line on
+whitespace shifts every later field for such names, so the line is cut
+at the LAST ')' instead. Only the numeric prefix up to the fields we
+need is tokenised; the tail is left unsplit. Input stays bytes until
+the final int() calls, so no whole-line decode is needed.
+
+"""
+
+from typing import NamedTuple
+
+
+# Index of stat field N in the token list that starts after "comm) ",
+# i.e. N - 3 (field 3, state, is index 0). See proc(5).
+_UTIME       = 14 - 3
+_STIME       = 15 - 3
+_NUM_THREADS = 20 - 3
+_STARTTIME   = 22 - 3
+_RSS         = 24 - 3
+_PROCESSOR   = 39 - 3
+
+_new_tuple = tuple.__new__
+
+
+class PidStat(NamedTuple):
+    """Fields akxOS uses from /proc/<pid>/stat."""
+    comm:      str
+    utime:     int    # clock ticks
+    stime:     int    # clock ticks
+    starttime: int    # clock ticks since boot
+    rss_pages: int
+
+
+class TaskStat(NamedTuple):
+    """Fields akxOS uses from /proc/<pid>/task/<tid>/stat."""
+    comm:        str
+    utime:       int    # clock ticks
+    stime:       int    # clock ticks
+    num_threads: int
+    starttime:   int    # clock ticks since boot
+    rss_pages:   int    # shared by every thread of the process
+    processor:   int    # CPU the task last ran on
+
+
+def parse_pid_stat(buf: bytes):
+    """
+    Parse a /proc/<pid>/stat (or task/<tid>/stat) line.
+
+    Parameters
+    ----------
+    buf : bytes
+        Raw file contents.
+
+    Returns
+    -------
+    PidStat | None
+        None if the line is truncated or malformed.
+    """
+    head, sep, tail = buf.rpartition(b")")
+    lparen = head.find(b"(")
+    if not sep or lparen < 0:
+        return None
+
+    # maxsplit: tokenise up to RSS, leave the remaining ~28 fields joined
+    f = tail.split(None, _RSS + 1)
+    try:
+        # tuple.__new__ skips the generated NamedTuple __new__ (~25 % of
+        # the per-line cost)
+        return _new_tuple(PidStat, (
+            head[lparen + 1:].decode(errors="replace"),
+            int(f[_UTIME]),
+            int(f[_STIME]),
+            int(f[_STARTTIME]),
+            int(f[_RSS]),
+        ))
+    except (IndexError, ValueError):
+        return None
+
+
+def parse_task_stat(buf: bytes):
+    """
+    Parse a stat line for thread accounting (adds num_threads and
+    processor, so it tokenises further than parse_pid_stat).
+
+    Returns
+    -------
+    TaskStat | None
+        None if the line is truncated or malformed.
+    """
+    head, sep, tail = buf.rpartition(b")")
+    lparen = head.find(b"(")
+    if not sep or lparen < 0:
+        return None
+
+    f = tail.split(None, _PROCESSOR + 1)
+    try:
+        return _new_tuple(TaskStat, (
+            head[lparen + 1:].decode(errors="replace"),
+            int(f[_UTIME]),
+            int(f[_STIME]),
+            int(f[_NUM_THREADS]),
+            int(f[_STARTTIME]),
+            int(f[_RSS]),
+            int(f[_PROCESSOR]),
+        ))
+    except (IndexError, ValueError):
+        return None
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+akxOS Thread Info Parser
+------------------------
+Per-thread accounting from /proc/<pid>/task/<tid>/stat for selected
+processes:
+- PID, TID, Name, CPU usage (%), last-run CPU (field 39), Memory (KB)
+
+Process totals hide which thread is burning power and on which core.
+Thread rows carry the core each thread last ran on, so dynamic power
+can be priced at that core's frequency and summed per process or per
+core (see power.power_state.get_thread_power_states).
+
+"""
+
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from hostfs.roots import proc_root
+from proc.process_info import (
+    CPU_BACKENDS,
+    NS_PER_TICK,
+    ProcFdPool,
+    StatFdPool,
+    _fd_pool_share,
+    _read_pid_schedstat,
+    count_online_cpus,
+)
+from proc.cpu_stat import CoreSampler
+from proc.stat_parser import parse_task_stat
+
+
+# --- Columnar Result ---
+
+class ThreadColumns(NamedTuple):
+    """
+    One thread sample as parallel arrays.
+
+    pid : int64 ndarray      cpu : float64 ndarray (% of all-CPU time)
+    tid : int64 ndarray      last_cpu : int64 ndarray (field 39)
+    name : object ndarray    mem : int64 ndarray (owning process RSS, KB)
+    starttime : int64 ndarray (per task; the main thread's equals the
+                process starttime)
+
+    Threads share their process's address space, so `mem` repeats the
+    process RSS on every thread row; sum it per process, not per row.
+    """
+    pid:       np.ndarray
+    tid:       np.ndarray
+    name:      np.ndarray
+    cpu:       np.ndarray
+    last_cpu:  np.ndarray
+    mem:       np.ndarray
+    starttime: np.ndarray
+
+    def rows(self) -> list:
+        """Expand to a list of per-thread dicts."""
+        return [
+            {"pid": pid, "tid": tid, "name": name, "cpu": cpu,
+             "last_cpu": last_cpu, "mem": mem}
+            for pid, tid, name, cpu, last_cpu, mem in zip(
+                self.pid.tolist(), self.tid.tolist(), self.name.tolist(),
+                self.cpu.tolist(), self.last_cpu.tolist(), self.mem.tolist(),
+            )
+        ]
+
+    def by_process(self):
+        """
+        Aggregate to one row per process.
+
+        Returns
+        -------
+        tuple : (pid, first_row, inverse)
+            Unique PIDs, the index of each PID's first (main) thread row,
+            and the row → process index mapping for np.bincount.
+        """
+        return np.unique(self.pid, return_index=True, return_inverse=True)
+
+    def by_core(self, n_cpus: int, weights=None) -> np.ndarray:
+        """Sum `weights` (default: cpu) per last-run CPU."""
+        w = self.cpu if weights is None else weights
+        return np.bincount(self.last_cpu, weights=w, minlength=n_cpus)[:n_cpus]
+
+
+# --- Incremental Sampler ---
+
+class ThreadSampler:
+    """
+    Stateful per-thread sampler for a fixed set of PIDs.
+
+    Works like ProcessSampler (deltas against the previous call, same
+    `stat` / `schedstat` / `auto` backends) but reads every thread of
+    each selected process.
+
+    Thread lists are cached. Each tick reads /proc/<pid>/stat first and
+    only re-lists /proc/<pid>/task when its num_threads differs from the
+    cached count, or when a cached thread could not be read last tick
+    (it exited, possibly replaced by a new one). A steady 500-thread JVM
+    therefore costs one preadv() per thread and no directory walks.
+    """
+
+    def __init__(self,
+                 pids,
+                 sample_delay: float = 0.05,
+                 backend:      str   = "stat",
+                 clock_ns=time.monotonic_ns):
+        if backend not in CPU_BACKENDS:
+            raise ValueError(f"Unknown CPU accounting backend: {backend!r}")
+
+        self.sample_delay = sample_delay
+        self.backend      = backend
+        self.clock_ns     = clock_ns
+        self.n_cpus       = count_online_cpus()
+
+        self._pids:          frozenset = frozenset()
+        self._prev_total:    int | None = None
+        self._prev_ns:       int        = 0
+        self._snap_ns:       int        = 0
+        # (start, end) clock_ns of the latest sample's window
+        self.window_ns: tuple | None = None
+        self._prev_snapshot: dict       = {}
+
+        # pid -> (process starttime, [(task key "pid/task/tid", tid)]),
+        # main thread first; the starttime drops the list on PID reuse
+        self._tasks: dict = {}
+        # proc, task and (schedstat backend) sched pools share one budget
+        cap = _fd_pool_share(2 if backend == "stat" else 3)
+        self._proc_pool  = StatFdPool(cap, parser=parse_task_stat)
+        self._task_pool  = StatFdPool(cap, parser=parse_task_stat)
+        self._sched_pool = None
+
+        # /proc/stat total plus voltage/temperature/per-core frequency
+        self._core_sampler = CoreSampler()
+
+        self.pids = pids
+
+    @property
+    def telemetry(self):
+        """TelemetrySample read with the latest snapshot, or None."""
+        return self._core_sampler.telemetry
+
+    @property
+    def pids(self) -> frozenset:
+        """PIDs whose threads are sampled."""
+        return self._pids
+
+    @pids.setter
+    def pids(self, pids):
+        new = frozenset(str(int(p)) for p in pids)
+        # Same rule as ProcessSampler: a new PID has no baseline
+        if not new <= self._pids:
+            self.reset()
+        self._pids = new
+
+    def _resolve_backend(self, pid: str):
+        """Settle 'auto'/'schedstat' once, on the first snapshot."""
+        if os.path.exists(proc_root().join(pid, "schedstat")):
+            self.backend = "schedstat"
+            self._sched_pool = ProcFdPool("schedstat",
+                                          self._task_pool.max_fds)
+        else:
+            self.backend = "stat"
+
+    def _list_tasks(self, pid: str):
+        """Re-list /proc/<pid>/task; None if the process is gone."""
+        try:
+            tids = sorted(int(t) for t in os.listdir(proc_root().join(pid, "task"))
+                          if t.isdigit())
+        except OSError:
+            return None
+        return [(f"{pid}/task/{tid}", tid) for tid in tids]
+
+    def _snapshot(self):
+        """
+        Return (total_cpu_time,
+                {task_key: (pid, tid, name, cpu, last_cpu, mem_kb, starttime)}).
+        """
+        if self.backend != "stat" and self._sched_pool is None and self._pids:
+            self._resolve_backend(next(iter(self._pids)))
+        sched_pool = self._sched_pool
+
+        self._core_sampler.sample()
+        now_ns = self._snap_ns = self.clock_ns()
+        if sched_pool is not None:
+            total_time = now_ns * self.n_cpus
+        else:
+            total_time = self._core_sampler.total
+
+        snapshot: dict = {}
+        for pid in self._pids:
+            st = self._proc_pool.read(pid)
+            if st is None:
+                self._tasks.pop(pid, None)
+                continue
+
+            start, tasks = self._tasks.get(pid, (None, None))
+            if (tasks is None or start != st.starttime
+                    or len(tasks) != st.num_threads):
+                tasks = self._list_tasks(pid)
+                if tasks is None:
+                    self._tasks.pop(pid, None)
+                    continue
+                self._tasks[pid] = (st.starttime, tasks)
+
+            pid_i  = int(pid)
+            mem_kb = st.rss_pages * 4
+            lost   = False
+            for key, tid in tasks:
+                ts = self._task_pool.read(key)
+                if ts is None:
+                    lost = True
+                    continue
+                cpu = ts.utime + ts.stime
+                if sched_pool is not None:
+                    runtime_ns = _read_pid_schedstat(key, sched_pool)
+                    cpu = runtime_ns if runtime_ns is not None else cpu * NS_PER_TICK
+                snapshot[key] = (pid_i, tid, ts.comm, cpu, ts.processor,
+                                 mem_kb, ts.starttime)
+
+            # A thread exited; the count may still match if another was
+            # spawned in its place, so re-list next tick regardless.
+            if lost:
+                del self._tasks[pid]
+
+        self._proc_pool.retain(self._tasks)
+        self._task_pool.retain(snapshot)
+        if sched_pool is not None:
+            sched_pool.retain(snapshot)
+
+        return total_time, snapshot
+
+    def warm_up(self):
+        """Take a baseline snapshot and block for `sample_delay`."""
+        self._prev_total, self._prev_snapshot = self._snapshot()
+        self._prev_ns = self._snap_ns
+        time.sleep(self.sample_delay)
+
+    def reset(self):
+        """Drop the baseline; the next sample blocks again."""
+        self._prev_total    = None
+        self._prev_snapshot = {}
+
+    def close(self):
+        """Release cached /proc descriptors."""
+        for pool in (self._proc_pool, self._task_pool, self._sched_pool):
+            if pool is not None:
+                pool.close()
+        self._core_sampler.close()
+
+    def sample_columns(self) -> ThreadColumns:
+        """
+        Take one sample and return it as ThreadColumns.
+
+        CPU% is computed over the window since the previous call, as a
+        share of all-CPU time (same scale as ProcessSampler).
+        """
+        if self._prev_total is None:
+            self.warm_up()
+
+        total_time, snapshot = self._snapshot()
+        total_delta = max(total_time - self._prev_total, 1)
+
+        n    = len(snapshot)
+        prev = self._prev_snapshot
+        no_prev = (0, 0, None, 0, 0, 0, -1)
+
+        keys = list(snapshot)
+        rows = list(snapshot.values())
+        t2 = np.fromiter((r[3] for r in rows), dtype=np.int64, count=n)
+        # A thread missing from the previous snapshot, or whose TID now
+        # belongs to a different task (starttime changed), started in
+        # the window
+        before = [prev.get(k, no_prev) for k in keys]
+        t1 = np.array([b[3] if b[6] == r[6] else 0
+                       for b, r in zip(before, rows)], dtype=np.int64)
+
+        cpu = np.maximum(0.0, 100.0 * (t2 - t1) / total_delta).round(2)
+
+        self._prev_total    = total_time
+        self.window_ns      = (self._prev_ns, self._snap_ns)
+        self._prev_ns       = self._snap_ns
+        self._prev_snapshot = snapshot
+
+        return ThreadColumns(
+            pid       = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n),
+            tid       = np.fromiter((r[1] for r in rows), dtype=np.int64, count=n),
+            name      = np.array([r[2] for r in rows], dtype=object),
+            cpu       = cpu,
+            last_cpu  = np.fromiter((r[4] for r in rows), dtype=np.int64, count=n),
+            mem       = np.fromiter((r[5] for r in rows), dtype=np.int64, count=n),
+            starttime = np.fromiter((r[6] for r in rows), dtype=np.int64, count=n),
+        )
+
+    def sample(self) -> list:
+        """
+        Returns a list of dicts:
+            {'pid', 'tid', 'name', 'cpu', 'last_cpu', 'mem'}
+        """
+        return self.sample_columns().rows()
+
+
+# --- Standalone Execution ---
+
+if __name__ == "__main__":
+    import sys
+
+    sampler = ThreadSampler(sys.argv[1:] or [os.getpid()])
+    cols = sampler.sample_columns()
+    print(f"{'PID':<8}{'TID':<8}{'Name':<20}{'CPU%':<8}{'Core':<6}")
+    print("-" * 50)
+    for i in np.argsort(-cols.cpu, kind="stable")[:20]:
+        print(f"{cols.pid[i]:<8}{cols.tid[i]:<8}{cols.name[i]:<20}"
+              f"{cols.cpu[i]:<8.2f}{cols.last_cpu[i]:<6}")
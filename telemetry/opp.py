@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+akxOS OPP Voltage Table
+-----------------------
+Operating performance points: the core voltage for each available CPU
+frequency.
+
+On most Pi kernels the regulator microvolts file is absent, so voltage
+falls back to DEFAULT_VOLTAGE forever, or it reports a rail that is not
+the CPU core rail. The V² term of the dynamic power model then ignores
+DVFS entirely. With an OPP table, voltage is looked up from the
+frequency already being read, with no extra sysfs read per sample.
+
+The table is loaded, in order, from:
+
+1. ~/.akxos/opp.json, written by hand or by an earlier run:
+       {"version": 1, "opp": [{"khz": 600000, "uv": 850000}, ...]}
+2. the device tree's CPU OPP table (opp-hz / opp-microvolt under
+   /sys/firmware/devicetree/base). The result is saved to (1), so the
+   device tree is only parsed once.
+
+(1) describes this machine, so it is only used with the real /sys. Under
+another sysfs root (AKXOS_SYS_ROOT, a FakeHost) the table comes from
+that root's device tree alone and is not saved.
+
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from hostfs.roots import sys_root
+
+
+OPP_FILE    = Path.home() / ".akxos" / "opp.json"
+OPP_VERSION = 1
+
+
+class OppTable:
+    """
+    Frequency → voltage table.
+
+    Frequencies between two OPPs are interpolated linearly, and values
+    outside the table are clamped to its first or last voltage.
+    """
+
+    def __init__(self, freqs_khz, volts_uv):
+        order = np.argsort(freqs_khz)
+        self.freqs_khz = np.asarray(freqs_khz, dtype=np.float64)[order]
+        self.volts_uv  = np.asarray(volts_uv, dtype=np.float64)[order]
+        if not len(self.freqs_khz):
+            raise ValueError("OPP table is empty.")
+
+    def __len__(self) -> int:
+        return len(self.freqs_khz)
+
+    def voltage_at(self, freq_hz):
+        """Core voltage (V) at `freq_hz`; scalar or array."""
+        v = np.interp(np.asarray(freq_hz, dtype=np.float64) / 1e3,
+                      self.freqs_khz, self.volts_uv) / 1e6
+        return float(v) if np.ndim(v) == 0 else v
+
+    # ---------- Persistence ----------
+
+    @classmethod
+    def load(cls, path=None) -> "OppTable | None":
+        """Table from a JSON file, or None if missing or malformed."""
+        try:
+            with open(path or OPP_FILE) as f:
+                data = json.load(f)
+            if data.get("version") != OPP_VERSION:
+                return None
+            opp = data["opp"]
+            return cls([int(p["khz"]) for p in opp], [int(p["uv"]) for p in opp])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path=None):
+        path = Path(path or OPP_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": OPP_VERSION,
+            "opp": [{"khz": int(f), "uv": int(v)}
+                    for f, v in zip(self.freqs_khz, self.volts_uv)],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
+
+    # ---------- Device tree ----------
+
+    @classmethod
+    def from_devicetree(cls) -> "OppTable | None":
+        """
+        CPU OPP table from the flattened device tree in sysfs.
+
+        Scans top-level and /cpus nodes whose name contains "opp-table"
+        or "opp_table". Properties are big-endian cells: opp-hz is one
+        u64, and opp-microvolt is a u32 (target) optionally followed by
+        min and max. OPPs without a voltage are skipped.
+        """
+        base = sys_root().path("firmware/devicetree/base")
+        candidates = []
+        for parent in (base, base / "cpus"):
+            try:
+                candidates += sorted(
+                    d for d in parent.iterdir()
+                    if d.is_dir() and ("opp-table" in d.name or "opp_table" in d.name)
+                )
+            except OSError:
+                pass
+
+        for table in candidates:
+            freqs, volts = [], []
+            for opp in sorted(table.glob("opp*")):
+                try:
+                    hz = int.from_bytes((opp / "opp-hz").read_bytes()[:8], "big")
+                    uv = int.from_bytes((opp / "opp-microvolt").read_bytes()[:4], "big")
+                except OSError:
+                    continue
+                if hz and uv:
+                    freqs.append(hz // 1000)
+                    volts.append(uv)
+            if freqs:
+                return cls(freqs, volts)
+        return None
+
+
+_cache: dict = {}
+
+
+def _persisted() -> bool:
+    """Whether OPP_FILE applies to the current sysfs root (the real /sys)."""
+    return sys_root().base == "/sys"
+
+
+def opp_table() -> "OppTable | None":
+    """
+    Cached OPP table for the current sysfs root: OPP_FILE, else the
+    device tree (then saved to OPP_FILE), else None. OPP_FILE is only
+    read and written for the real /sys.
+    """
+    persisted = _persisted()
+    key = (sys_root().base, os.fspath(OPP_FILE) if persisted else None)
+    if key not in _cache:
+        table = OppTable.load() if persisted else None
+        if table is None:
+            table = OppTable.from_devicetree()
+            if table is not None and persisted:
+                try:
+                    table.save()
+                except OSError:
+                    pass
+        _cache[key] = table
+    return _cache[key]
+
+
+if __name__ == "__main__":
+    table = opp_table()
+    if table is None:
+        print(f"[akxOS] No OPP table ({OPP_FILE} or device tree).")
+    else:
+        print(f"akxOS OPP table ({OPP_FILE})\n")
+        for f, v in zip(table.freqs_khz, table.volts_uv):
+            print(f"  {f / 1000:>6.0f} MHz  {v / 1e6:.4f} V")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+akxOS Periodic Scheduler
+------------------------
+Drift-free periodic ticks on absolute monotonic deadlines.
+
+`work(); sleep(interval)` ticks every interval + work time, and the
+error accumulates: a "1 s" logger whose snapshot takes 100 ms runs at
+1.1 s. PeriodicScheduler instead wakes at start + k · interval, so work
+time only delays a tick, never the ones after it.
+
+When work runs past the next deadline (an overrun), `overrun` decides:
+
+- "skip": drop the missed deadlines and resume on the next future one
+  (control loops, live views: a late sample is stale anyway);
+- "catch_up": run the missed ticks back to back, so the tick count
+  matches elapsed time (at most `max_catch_up` in a row, then skip).
+
+Each tick's lateness (wake time − deadline), overruns and skipped
+deadlines are kept in `stats`.
+
+"""
+
+import asyncio
+import os
+import select
+import time
+
+import numpy as np
+
+
+OVERRUN_POLICIES = ("skip", "catch_up")
+
+DEFAULT_MAX_CATCH_UP = 10
+_LATENESS_HISTORY    = 1024      # ticks kept for percentiles
+
+
+class TickStats:
+    """
+    Per-tick timing of a PeriodicScheduler.
+
+    `ticks`, `overruns` (work ran past the next deadline), `skipped`
+    (deadlines dropped); lateness in ms as `mean_late_ms`,
+    `max_late_ms` and `p99_late_ms` (over the last 1024 ticks).
+    """
+
+    def __init__(self):
+        self.ticks    = 0
+        self.overruns = 0
+        self.skipped  = 0
+        self._late_sum_ns = 0
+        self._late_max_ns = 0
+        self._late = np.zeros(_LATENESS_HISTORY, dtype=np.int64)
+
+    def record(self, late_ns: int):
+        late_ns = max(late_ns, 0)
+        self._late[self.ticks % _LATENESS_HISTORY] = late_ns
+        self.ticks += 1
+        self._late_sum_ns += late_ns
+        self._late_max_ns = max(self._late_max_ns, late_ns)
+
+    @property
+    def mean_late_ms(self) -> float:
+        return self._late_sum_ns / max(self.ticks, 1) / 1e6
+
+    @property
+    def max_late_ms(self) -> float:
+        return self._late_max_ns / 1e6
+
+    @property
+    def p99_late_ms(self) -> float:
+        n = min(self.ticks, _LATENESS_HISTORY)
+        return float(np.percentile(self._late[:n], 99)) / 1e6 if n else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.ticks} ticks | late mean {self.mean_late_ms:.2f} ms, "
+                f"p99 {self.p99_late_ms:.2f} ms, max {self.max_late_ms:.2f} ms | "
+                f"{self.overruns} overruns, {self.skipped} skipped")
+
+    def __repr__(self):
+        return f"TickStats({self.summary()})"
+
+
+class PeriodicScheduler:
+    """
+    Ticks every `interval` seconds on absolute deadlines.
+
+    Parameters
+    ----------
+    interval : float
+        Period in seconds.
+    overrun : str
+        "skip" or "catch_up" (see module docstring).
+    max_catch_up : int
+        Longest burst of back-to-back ticks under "catch_up".
+    clock_ns : callable
+        Monotonic clock.
+
+    Iterate `ticks()` (or `aticks()` in a coroutine); the loop body is
+    the work. `stop()` ends the iteration from another thread or a
+    signal handler. It only sets a flag and writes one byte to a pipe
+    that ticks() sleeps on, so it takes no lock (a lock taken in a
+    signal handler can deadlock the thread it interrupted) and ticks()
+    does not wait out the current sleep. aticks() stops at its next
+    wake-up.
+    """
+
+    def __init__(self, interval: float, overrun: str = "skip",
+                 max_catch_up: int = DEFAULT_MAX_CATCH_UP,
+                 clock_ns=time.monotonic_ns):
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        if overrun not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy: {overrun!r}")
+        self.period_ns    = int(interval * 1e9)
+        self.overrun      = overrun
+        self.max_catch_up = max_catch_up
+        self.clock_ns     = clock_ns
+        self.stats        = TickStats()
+        self._stopped     = False
+        self._wake        = None        # (read fd, write fd), made by ticks()
+        self._burst       = 0
+
+    @property
+    def interval(self) -> float:
+        return self.period_ns / 1e9
+
+    def stop(self):
+        self._stopped = True
+        wake = self._wake
+        if wake is not None:
+            try:
+                os.write(wake[1], b"\0")
+            except OSError:
+                pass            # pipe full: a wake-up is already pending
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    def _sleep(self, delay_ns: int):
+        """Sleep up to `delay_ns`, returning early on stop()."""
+        if self._wake is None:
+            r, w = os.pipe()
+            os.set_blocking(w, False)
+            self._wake = (r, w)
+        if not self._stopped:
+            select.select([self._wake[0]], [], [], delay_ns / 1e9)
+
+    def close(self):
+        """Release the wake-up pipe."""
+        wake, self._wake = self._wake, None
+        if wake is not None:
+            os.close(wake[0])
+            os.close(wake[1])
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _advance(self, deadline: int) -> int:
+        """Deadline after `deadline`, applying the overrun policy."""
+        deadline += self.period_ns
+        late_ns = self.clock_ns() - deadline
+        if late_ns < 0:
+            self._burst = 0
+            return deadline
+
+        self.stats.overruns += 1
+        if self.overrun == "catch_up" and self._burst < self.max_catch_up:
+            self._burst += 1
+            return deadline                     # due now
+        missed = late_ns // self.period_ns + 1
+        self.stats.skipped += missed
+        self._burst = 0
+        return deadline + missed * self.period_ns
+
+    def _end(self, duration):
+        if duration is None:
+            return None
+        return self.clock_ns() + int(duration * 1e9)
+
+    def ticks(self, duration: float = None):
+        """
+        Yield the tick index at each deadline, starting now, until
+        `duration` seconds have passed (forever if None) or stop().
+        """
+        end = self._end(duration)
+        deadline = self.clock_ns()
+        k = 0
+        while not self._stopped:
+            if end is not None and deadline >= end:
+                return
+            delay_ns = deadline - self.clock_ns()
+            if delay_ns > 0:
+                self._sleep(delay_ns)
+                if self._stopped:
+                    return
+            self.stats.record(self.clock_ns() - deadline)
+            yield k
+            k += 1
+            deadline = self._advance(deadline)
+
+    async def aticks(self, duration: float = None):
+        """ticks() for coroutines: sleeps with asyncio.sleep."""
+        end = self._end(duration)
+        deadline = self.clock_ns()
+        k = 0
+        while not self._stopped:
+            if end is not None and deadline >= end:
+                return
+            delay_ns = deadline - self.clock_ns()
+            if delay_ns > 0:
+                await asyncio.sleep(delay_ns / 1e9)
+                if self._stopped:
+                    return
+            self.stats.record(self.clock_ns() - deadline)
+            yield k
+            k += 1
+            deadline = self._advance(deadline)
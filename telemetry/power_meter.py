@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+akxOS Measured Power
+--------------------
+Reads real board power where the hardware exposes it:
+
+- powercap energy counters (class/powercap/<zone>/energy_uj, µJ,
+  wrapping at max_energy_range_uj). Only top-level zones are summed,
+  because sub-zones ("intel-rapl:0:0") are already part of their parent.
+- hwmon power sensors (class/hwmon/hwmonN/power*_input, µW), e.g. an
+  INA219 or INA3221 on I²C. All channels are summed.
+
+Energy counters give the exact mean over a window, so they are
+preferred. A power sensor gives one instantaneous reading per sample.
+
+The meter is read once per process snapshot. get_power_states() then
+subtracts the static baseline and splits the rest across processes by
+their share of busy CPU time, in place of the modeled values.
+
+Without a calibration the baseline comes from the meter itself
+(IdleBaseline): measured power against the host's busy CPU fraction,
+extrapolated to an idle host. Both come from system-wide counters, so
+the estimate does not depend on which processes are sampled.
+
+"""
+
+import os
+import time
+
+from hostfs.roots import sys_root
+
+
+POWER_SOURCES = ("auto", "powercap", "hwmon")
+
+_VALUE_BUF = 64
+
+# Idle-baseline fit: per-sample forgetting (~100-sample memory), and the
+# spread of the busy fraction needed before extrapolating to idle
+IDLE_FORGETTING = 0.99
+IDLE_MIN_SPREAD = 0.05
+
+
+def _pread(fd):
+    try:
+        return int(os.pread(fd, _VALUE_BUF, 0))
+    except (OSError, ValueError):
+        return None
+
+
+def _read_int(path: str):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def find_powercap_zones() -> list:
+    """Top-level powercap zones with an energy_uj counter."""
+    base = sys_root().join("class/powercap")
+    try:
+        names = sorted(os.listdir(base))
+    except OSError:
+        return []
+    return [f"{base}/{n}" for n in names
+            if n.count(":") == 1 and os.path.exists(f"{base}/{n}/energy_uj")]
+
+
+def find_hwmon_power_inputs() -> list:
+    """Every hwmon power*_input file."""
+    base = sys_root().join("class/hwmon")
+    try:
+        devices = sorted(os.listdir(base))
+    except OSError:
+        return []
+    paths = []
+    for dev in devices:
+        try:
+            files = sorted(os.listdir(f"{base}/{dev}"))
+        except OSError:
+            continue
+        paths += [f"{base}/{dev}/{f}" for f in files
+                  if f.startswith("power") and f.endswith("_input")]
+    return paths
+
+
+class IdleBaseline:
+    """
+    Power drawn with every CPU idle, estimated from measurements.
+
+    Fits measured = p_idle + k · busy (busy: busy fraction of all-core
+    time) with exponential forgetting and reads off p_idle. Until busy
+    has varied by IDLE_MIN_SPREAD (std), or if the fit is not physical,
+    the lowest measurement so far stands in. The estimate never exceeds
+    that lowest measurement, so idle power is never charged to processes.
+    """
+
+    def __init__(self, forgetting: float = IDLE_FORGETTING):
+        self.forgetting = forgetting
+        self.floor_mw = None
+        self._sums = [0.0] * 5  # Σw, Σw·b, Σw·b², Σw·P, Σw·b·P
+
+    def update(self, measured_mw: float, busy: float):
+        point = (1.0, busy, busy * busy, measured_mw, busy * measured_mw)
+        self._sums = [s * self.forgetting + x for s, x in zip(self._sums, point)]
+        if self.floor_mw is None or measured_mw < self.floor_mw:
+            self.floor_mw = measured_mw
+
+    @property
+    def mw(self):
+        """Idle power in mW, or None before the first measurement."""
+        if self.floor_mw is None:
+            return None
+        n, sb, sbb, sp, sbp = self._sums
+        b, p = sb / n, sp / n
+        var = sbb / n - b * b
+        if var < IDLE_MIN_SPREAD ** 2:
+            return self.floor_mw
+        slope = (sbp / n - b * p) / var
+        if slope <= 0:
+            return self.floor_mw
+        return min(max(p - slope * b, 0.0), self.floor_mw)
+
+
+class PowerMeter:
+    """
+    System power from powercap or hwmon.
+
+    Parameters
+    ----------
+    source : str
+        "auto" (powercap if present, else hwmon), "powercap" or "hwmon".
+    clock_ns : callable
+        Timestamp source for energy-counter windows; use the same clock
+        as the process sampler.
+
+    `kind` is the source found ("powercap", "hwmon") or None when the
+    host has no measurable power; `available` is then False and
+    `sample()` always returns None. `idle` is the IdleBaseline that
+    get_power_states() feeds and uses when the host is not calibrated.
+    """
+
+    def __init__(self, source: str = "auto", clock_ns=time.monotonic_ns):
+        if source not in POWER_SOURCES:
+            raise ValueError(f"Unknown power source: {source!r}")
+        self.clock_ns = clock_ns
+        self.kind = None
+        self._fds: list = []
+        self._wrap: list = []
+        self._prev = None       # (t_ns, [energy_uj per zone])
+        self.idle = IdleBaseline()
+
+        if source in ("auto", "powercap"):
+            zones = find_powercap_zones()
+            if zones:
+                self.kind = "powercap"
+                self._fds = [os.open(f"{z}/energy_uj", os.O_RDONLY | os.O_CLOEXEC)
+                             for z in zones]
+                self._wrap = [_read_int(f"{z}/max_energy_range_uj") or 0
+                              for z in zones]
+        if self.kind is None and source in ("auto", "hwmon"):
+            inputs = find_hwmon_power_inputs()
+            if inputs:
+                self.kind = "hwmon"
+                self._fds = [os.open(p, os.O_RDONLY | os.O_CLOEXEC)
+                             for p in inputs]
+
+    @property
+    def available(self) -> bool:
+        return self.kind is not None
+
+    def sample(self):
+        """
+        Measured system power in mW, or None.
+
+        powercap: mean since the previous call (None on the first call).
+        hwmon: sum of the current readings.
+        """
+        if self.kind == "hwmon":
+            values = [_pread(fd) for fd in self._fds]
+            values = [v for v in values if v is not None]
+            return sum(values) / 1000.0 if values else None
+
+        if self.kind == "powercap":
+            now = self.clock_ns()
+            energy = [_pread(fd) for fd in self._fds]
+            prev, self._prev = self._prev, (now, energy)
+            if prev is None or None in energy or None in prev[1]:
+                return None
+            dt_ns = now - prev[0]
+            if dt_ns <= 0:
+                return None
+            used_uj = 0
+            for e, e0, wrap in zip(energy, prev[1], self._wrap):
+                d = e - e0
+                used_uj += d + wrap if d < 0 else d
+            return used_uj / dt_ns * 1e6     # µJ/ns → mW
+
+        return None
+
+    def close(self):
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+        self.kind = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
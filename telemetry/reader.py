@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+akxOS Telemetry Reader
+----------------------
+Batched sysfs telemetry with persistent descriptors.
+
+sys_telemetry's getters open and close a file per value and re-try
+every candidate path on each call. At control-loop rates (10–100 Hz)
+that is most of the telemetry cost. TelemetryReader instead:
+
+- probes once which regulator / thermal / cpufreq files exist, using
+  the shared Topology for cores, policies and thermal zones,
+- keeps them open,
+- re-reads each with os.pread() at offset 0 (sysfs regenerates the
+  value on every read from the start of the file),
+- reads each shared cpufreq policy once, however many cores it covers,
+
+and returns voltage, temperature and per-core frequency together.
+
+When an OPP table is available (telemetry.opp), voltage is looked up
+from the frequency just read instead of the regulator, at the highest
+policy frequency because the core rail is shared. This saves a read
+and makes V track DVFS on boards whose regulator file is missing or
+reports another rail.
+
+Frequency is, by default, the time-weighted average since the previous
+read() taken from cpufreq/stats/time_in_state (ticks spent at each
+frequency), not the instantaneous scaling_cur_freq: with ondemand or
+schedutil the clock changes many times between samples, and one
+instantaneous reading prices the whole window at whatever happened to
+be current. Policies without stats (CONFIG_CPU_FREQ_STAT off), the first
+read, and windows shorter than one stats tick use scaling_cur_freq.
+
+"""
+
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from hostfs.roots import sys_root
+from telemetry.opp import opp_table
+from telemetry.topology import topology
+from telemetry.sys_telemetry import DEFAULT_FREQ, DEFAULT_VOLTAGE
+
+
+_VALUE_BUF = 64     # sysfs numeric attributes are a few bytes
+_STATS_BUF = 4096   # time_in_state: one "khz ticks" line per OPP
+
+# "auto": time_in_state average when available; "cur": scaling_cur_freq
+FREQ_SOURCES = ("auto", "cur")
+
+# "auto": OPP table when available, else regulator
+VOLTAGE_SOURCES = ("auto", "regulator", "opp")
+
+_REGULATOR_PATHS = (
+    "class/regulator/regulator.0/microvolts",
+    "class/regulator/regulator.1/microvolts",
+)
+
+
+class TelemetrySample(NamedTuple):
+    """
+    Telemetry read in one batch.
+
+    voltage_v : float        cpu : int64 ndarray (core ids)
+    temperature_c : float    freq_hz : float64 ndarray (per core)
+    """
+    voltage_v:     float
+    temperature_c: float
+    cpu:           np.ndarray
+    freq_hz:       np.ndarray
+
+    def freq_of(self, cpus) -> np.ndarray:
+        """Frequency (Hz) of each core in `cpus`; DEFAULT_FREQ if unknown."""
+        cpus = np.asarray(cpus, dtype=np.int64)
+        if not len(self.cpu):
+            return np.full(len(cpus), DEFAULT_FREQ * 1e6)
+        idx   = np.minimum(np.searchsorted(self.cpu, cpus), len(self.cpu) - 1)
+        known = self.cpu[idx] == cpus
+        return np.where(known, self.freq_hz[idx], DEFAULT_FREQ * 1e6)
+
+
+def _open(path: str):
+    try:
+        return os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return None
+
+
+class TelemetryReader:
+    """
+    Probe-once, read-many sysfs telemetry.
+
+    Parameters
+    ----------
+    cores : iterable of int, optional
+        Cores whose frequency to report. Defaults to the online CPUs of
+        the shared Topology.
+    freq_source : str
+        "auto" (window average from time_in_state, falling back to
+        scaling_cur_freq) or "cur" (always instantaneous; for callers
+        that average high-rate samples themselves).
+    voltage_source : str
+        "auto" (OPP table if one is found, else the regulator),
+        "regulator" or "opp" (DEFAULT_VOLTAGE without a table).
+
+    Missing files fall back to the same defaults as sys_telemetry
+    (DEFAULT_VOLTAGE, DEFAULT_FREQ, 0 °C). The reader re-probes by
+    itself when the Topology changes (CPU hotplug); call `reprobe()`
+    after a driver reload.
+    """
+
+    def __init__(self, cores=None, freq_source: str = "auto",
+                 voltage_source: str = "auto"):
+        if freq_source not in FREQ_SOURCES:
+            raise ValueError(f"Unknown frequency source: {freq_source!r}")
+        if voltage_source not in VOLTAGE_SOURCES:
+            raise ValueError(f"Unknown voltage source: {voltage_source!r}")
+        self.freq_source = freq_source
+        self.voltage_source = voltage_source
+        self._cores = None if cores is None else sorted(int(c) for c in cores)
+        self._fds: list = []
+        self._probe()
+
+    def _probe(self):
+        root = sys_root()
+        topo = topology()
+        self._topo_gen = (topo, topo.generation)
+        cores = self._cores if self._cores is not None else list(topo.online)
+
+        self.opp = (opp_table() if self.voltage_source != "regulator"
+                    else None)
+        self._fd_volt = None
+        if self.opp is None and self.voltage_source != "opp":
+            for rel in _REGULATOR_PATHS:
+                self._fd_volt = _open(root.join(rel))
+                if self._fd_volt is not None:
+                    break
+        zone = topo.cpu_thermal_zone()
+        self._fd_temp = _open(f"{zone.path}/temp") if zone else None
+
+        # One descriptor per cpufreq policy; cores map onto policies
+        policies: dict = {}
+        self._policy_of = np.empty(len(cores), dtype=np.int64)
+        self._fd_freq: list = []
+        self._fd_stats: list = []
+        for i, core in enumerate(cores):
+            policy = topo.policy_of(core)
+            if policy not in policies:
+                policies[policy] = len(self._fd_freq)
+                self._fd_freq.append(
+                    _open(policy.attr("scaling_cur_freq")) if policy else None
+                )
+                self._fd_stats.append(
+                    _open(policy.attr("stats/time_in_state"))
+                    if policy and self.freq_source == "auto" else None
+                )
+            self._policy_of[i] = policies[policy]
+
+        # Previous (khz, ticks) arrays per policy, for the window average
+        self._prev_stats: list = [None] * len(self._fd_freq)
+
+        self.cpu = np.array(cores, dtype=np.int64)
+        self._fds = [fd for fd in (self._fd_volt, self._fd_temp,
+                                   *self._fd_freq, *self._fd_stats)
+                     if fd is not None]
+
+    @staticmethod
+    def _pread(fd):
+        """Numeric value of an open sysfs file, or None."""
+        if fd is None:
+            return None
+        try:
+            return float(os.pread(fd, _VALUE_BUF, 0))
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _pread_stats(fd):
+        """time_in_state as (khz, ticks) int64 arrays, or None."""
+        if fd is None:
+            return None
+        try:
+            vals = np.array(os.pread(fd, _STATS_BUF, 0).split(), dtype=np.int64)
+        except (OSError, ValueError):
+            return None
+        if not len(vals) or len(vals) % 2:
+            return None
+        return vals[0::2], vals[1::2]
+
+    def _policy_khz(self, p: int):
+        """Frequency of policy `p` for this window, in kHz, or None."""
+        stats = self._pread_stats(self._fd_stats[p])
+        prev, self._prev_stats[p] = self._prev_stats[p], stats
+        if (stats is not None and prev is not None
+                and np.array_equal(stats[0], prev[0])):
+            dt = stats[1] - prev[1]
+            total = dt.sum()
+            if total > 0 and (dt >= 0).all():
+                return float((stats[0] * dt).sum() / total)
+        return self._pread(self._fd_freq[p])
+
+    def read(self) -> TelemetrySample:
+        """Read voltage, temperature and per-core frequency in one pass."""
+        topo = topology()
+        if self._topo_gen != (topo, topo.generation):
+            self.reprobe()
+
+        mc = self._pread(self._fd_temp)
+
+        policy_mhz = np.array([
+            (khz / 1000.0) if khz else DEFAULT_FREQ
+            for khz in map(self._policy_khz, range(len(self._fd_freq)))
+        ])
+        freq_hz = (policy_mhz[self._policy_of] if len(policy_mhz)
+                   else np.zeros(0)) * 1e6
+
+        if self.opp is not None:
+            volt = self.opp.voltage_at(policy_mhz.max() * 1e6
+                                       if len(policy_mhz) else DEFAULT_FREQ * 1e6)
+        else:
+            uv = self._pread(self._fd_volt)
+            volt = (uv / 1e6) if uv else DEFAULT_VOLTAGE
+
+        return TelemetrySample(
+            voltage_v     = volt,
+            temperature_c = (mc / 1000.0) if mc else 0.0,
+            cpu           = self.cpu,
+            freq_hz       = freq_hz,
+        )
+
+    def reprobe(self):
+        """Close all descriptors and probe the paths again."""
+        self.close()
+        self._probe()
+
+    def close(self):
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+        self._fd_volt = self._fd_temp = None
+        self._fd_freq  = [None] * len(self._fd_freq)
+        self._fd_stats = [None] * len(self._fd_stats)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+akxOS Background Telemetry Sampler
+----------------------------------
+Reads voltage, temperature and per-core frequency on a background
+thread at a fixed rate into a preallocated NumPy ring buffer.
+
+get_power_states() otherwise reads telemetry once per tick and treats
+it as constant across the whole /proc window, so a DVFS step halfway
+through the window is either missed or applied to all of it. With a
+TelemetrySampler running, consumers ask for the time-weighted mean over
+exactly the window between two process snapshots, and the hot path
+never blocks on sysfs.
+
+The buffer has a single writer (the sampler thread) and any number of
+readers, and takes no lock: the writer fills a slot and then publishes
+it by bumping `_count`; readers copy the buffer and keep only the
+slots that cannot have been overwritten while they copied.
+
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from telemetry.periodic import PeriodicScheduler
+from telemetry.reader import TelemetryReader, TelemetrySample
+from telemetry.topology import topology
+
+
+DEFAULT_RATE_HZ  = 100.0
+DEFAULT_CAPACITY = 1024     # ~10 s of history at 100 Hz
+
+
+class TelemetrySampler:
+    """
+    Fixed-rate telemetry history for window averages.
+
+    Parameters
+    ----------
+    rate_hz : float
+        Sampling rate of the background thread.
+    capacity : int
+        Ring buffer length in samples. The newest capacity - 1 are
+        readable (one slot is the writer's); windows older than that
+        are only partly covered.
+    reader : TelemetryReader, optional
+        Defaults to a new instantaneous-frequency TelemetryReader over
+        the cores online at construction.
+    clock_ns : callable
+        Timestamp source; must match the clock of the process samplers
+        whose windows are averaged (time.monotonic_ns by default).
+    """
+
+    def __init__(self,
+                 rate_hz:  float = DEFAULT_RATE_HZ,
+                 capacity: int   = DEFAULT_CAPACITY,
+                 reader:   TelemetryReader = None,
+                 clock_ns=time.monotonic_ns):
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive.")
+
+        self.period   = 1.0 / rate_hz
+        self.capacity = capacity
+        # Instantaneous frequency: the window mean is computed here. The
+        # core set is pinned so hotplug cannot change the row width.
+        self.reader   = (reader if reader is not None
+                         else TelemetryReader(cores=topology().online,
+                                              freq_source="cur"))
+        self.clock_ns = clock_ns
+
+        n_cores = len(self.reader.cpu)
+        self._t    = np.zeros(capacity, dtype=np.int64)
+        self._volt = np.zeros(capacity)
+        self._temp = np.zeros(capacity)
+        self._freq = np.zeros((capacity, n_cores))
+        self._count = 0     # samples published so far; written by one thread
+
+        # Per-run tick timing: scheduler.stats
+        self.scheduler: PeriodicScheduler | None = None
+        self._thread: threading.Thread | None = None
+
+    # ---------- Lifecycle ----------
+
+    def start(self) -> "TelemetrySampler":
+        """Start the background thread (idempotent). Returns self."""
+        if self._thread is None:
+            self.scheduler = PeriodicScheduler(self.period)
+            self._thread = threading.Thread(
+                target=self._run, name="akxos-telemetry", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread and close the reader."""
+        if self._thread is not None:
+            self.scheduler.stop()
+            self._thread.join()
+            self.scheduler.close()
+            self._thread = None
+        self.reader.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---------- Writer ----------
+
+    def sample_once(self):
+        """Read telemetry now and append it to the ring buffer."""
+        s = self.reader.read()
+        i = self._count % self.capacity
+        self._t[i]    = self.clock_ns()
+        self._volt[i] = s.voltage_v
+        self._temp[i] = s.temperature_c
+        self._freq[i] = s.freq_hz
+        self._count  += 1     # publish
+
+    def _run(self):
+        # Overruns skip ahead rather than burst
+        for _ in self.scheduler.ticks():
+            self.sample_once()
+
+    # ---------- Readers ----------
+
+    def _history(self):
+        """Consistent chronological copy: (t, volt, temp, freq)."""
+        start = self._count
+        t, volt, temp, freq = (self._t.copy(), self._volt.copy(),
+                               self._temp.copy(), self._freq.copy())
+        end = self._count
+
+        # Slot of sample `end` (in progress) may be half-written, and
+        # samples up to end - capacity were overwritten during the copy.
+        first = max(0, end - self.capacity + 1)
+        seq = np.arange(first, start)
+        idx = seq % self.capacity
+        return t[idx], volt[idx], temp[idx], freq[idx]
+
+    def latest(self) -> TelemetrySample | None:
+        """Most recent sample, or None before the first one."""
+        t, volt, temp, freq = self._history()
+        if not len(t):
+            return None
+        return TelemetrySample(float(volt[-1]), float(temp[-1]),
+                               self.reader.cpu, freq[-1])
+
+    def window_mean(self, t0_ns: int, t1_ns: int) -> TelemetrySample | None:
+        """
+        Time-weighted mean telemetry over [t0_ns, t1_ns].
+
+        Each sample holds until the next one. The sample in force at
+        t0 (the last one at or before it) covers the start of the
+        window; if the history starts later, the window is shortened.
+        Returns the latest sample for an empty or zero-length window,
+        and None before the first sample.
+        """
+        t, volt, temp, freq = self._history()
+        if not len(t):
+            return None
+
+        lo = max(np.searchsorted(t, t0_ns, side="right") - 1, 0)
+        hi = np.searchsorted(t, t1_ns, side="right")
+        if hi <= lo or t1_ns <= t0_ns:
+            return self.latest()
+
+        edges = np.clip(t[lo:hi], t0_ns, t1_ns)
+        w = np.diff(np.append(edges, t1_ns)).astype(np.float64)
+        if w.sum() <= 0:
+            return self.latest()
+        w /= w.sum()
+
+        return TelemetrySample(
+            voltage_v     = float(w @ volt[lo:hi]),
+            temperature_c = float(w @ temp[lo:hi]),
+            cpu           = self.reader.cpu,
+            freq_hz       = w @ freq[lo:hi],
+        )
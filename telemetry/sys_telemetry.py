@@ -5,7 +5,7 @@ Reads live voltage, frequency, and temperature from Raspberry Pi 4 /sys.
 
 """
 
-from pathlib import Path
+from hostfs.roots import sys_root
 
 DEFAULT_VOLTAGE = 0.95   # Volts — used when regulator sysfs is unavailable
 DEFAULT_FREQ    = 1200.0 # MHz  — Pi 4 base clock, used when sysfs is unavailable
@@ -30,7 +30,7 @@ def get_cpu_freq(core: int = 0) -> float:
     (was previously returning 0.0, which silently zeroed dynamic power).
     """
     val = _read_value(
-        f"/sys/devices/system/cpu/cpu{core}/cpufreq/scaling_cur_freq"
+        sys_root().join(f"devices/system/cpu/cpu{core}/cpufreq/scaling_cur_freq")
     )
     return (val / 1000.0) if val else DEFAULT_FREQ  # kHz → MHz
 
@@ -41,11 +41,19 @@ def get_cpu_voltage(core: int = 0) -> float:
 
     NOTE: The `core` argument is accepted for API symmetry but is NOT used —
     on Raspberry Pi 4 all cores share a single voltage domain and the
-    regulator paths are global. Falls back to DEFAULT_VOLTAGE if unavailable.
+    regulator paths are global. With an OPP table (telemetry.opp) the
+    voltage is looked up from `core`'s frequency instead. Falls back to
+    DEFAULT_VOLTAGE if unavailable.
     """
+    from telemetry.opp import opp_table
+
+    table = opp_table()
+    if table is not None:
+        return table.voltage_at(get_cpu_freq(core) * 1e6)
+
     paths = [
-        "/sys/class/regulator/regulator.0/microvolts",
-        "/sys/class/regulator/regulator.1/microvolts",
+        sys_root().join("class/regulator/regulator.0/microvolts"),
+        sys_root().join("class/regulator/regulator.1/microvolts"),
     ]
     for p in paths:
         val = _read_value(p)
@@ -56,26 +64,20 @@ def get_cpu_voltage(core: int = 0) -> float:
 
 def get_cpu_temp() -> float:
     """Return SoC temperature in °C."""
-    val = _read_value("/sys/class/thermal/thermal_zone0/temp")
+    val = _read_value(sys_root().join("class/thermal/thermal_zone0/temp"))
     return (val / 1000.0) if val else 0.0
 
 
 def read_all_cores() -> dict:
     """Return {core_id: {'V': float, 'f': float, 'T': float}} for all cores."""
-    cpu_dir = Path("/sys/devices/system/cpu/")
-    cores = [
-        int(d.name[3:])
-        for d in cpu_dir.iterdir()
-        if d.name.startswith("cpu") and d.name[3:].isdigit()
-    ]
-    temp = get_cpu_temp()
+    from telemetry.reader import TelemetryReader
+
+    reader = TelemetryReader()
+    t = reader.read()
+    reader.close()
     return {
-        core: {
-            "V": get_cpu_voltage(core),
-            "f": get_cpu_freq(core),
-            "T": temp,
-        }
-        for core in cores
+        core: {"V": t.voltage_v, "f": f / 1e6, "T": t.temperature_c}
+        for core, f in zip(t.cpu.tolist(), t.freq_hz.tolist())
     }
 
 
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+akxOS CPU Topology
+------------------
+One-time discovery of what /sys/devices/system/cpu and
+/sys/class/thermal expose:
+
+- online CPUs
+- cpufreq policies (policyN, related_cpus, available frequencies,
+  hardware min/max)
+- thermal zones
+
+Telemetry and enforcement used to glob cpu[0-9]* on every call and
+write scaling_max_freq once per CPU even when all CPUs share a policy.
+They now go through topology(), which is discovered once per sysfs root
+and refreshed only on a CPU hotplug uevent or an explicit invalidate().
+Consumers that cache paths derived from it compare `generation`.
+
+"""
+
+import os
+import socket
+import struct
+from typing import NamedTuple, Optional
+
+from hostfs.roots import sys_root
+
+
+class CpufreqPolicy(NamedTuple):
+    """One cpufreq policy: CPUs that share a clock."""
+    name:          str      # "policy0"
+    path:          str      # sysfs directory
+    cpus:          tuple    # related_cpus that are online
+    min_khz:       int      # cpuinfo_min_freq (hardware limit)
+    max_khz:       int      # cpuinfo_max_freq
+    available_khz: tuple    # scaling_available_frequencies, ascending
+
+    def attr(self, name: str) -> str:
+        """Path of attribute `name` in this policy."""
+        return f"{self.path}/{name}"
+
+
+class ThermalZone(NamedTuple):
+    name: str       # "thermal_zone0"
+    type: str       # "cpu-thermal"
+    path: str
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_int(path: str, default: int = 0) -> int:
+    text = _read_text(path)
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_cpu_list(text: str) -> tuple:
+    """Parse a sysfs CPU list ("0-3,6,8-9") into a sorted tuple."""
+    cpus = set()
+    for part in (text or "").replace(" ", ",").split(","):
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cpus.update(range(int(lo), int(hi or lo) + 1))
+    return tuple(sorted(cpus))
+
+
+class Topology:
+    """
+    CPU, cpufreq-policy and thermal-zone layout of one sysfs root.
+
+    Attributes are plain tuples, so reading them costs nothing; call
+    `invalidate()` (or let a hotplug uevent do it) to rediscover.
+    """
+
+    def __init__(self, root=None):
+        self.root = root if root is not None else sys_root()
+        self.generation = 0
+        self._stale = True
+        self._uevents = self._open_uevents()
+        self._discover()
+
+    # ---------- Discovery ----------
+
+    def _discover(self):
+        cpu_dir = self.root.join("devices/system/cpu")
+
+        online = parse_cpu_list(_read_text(f"{cpu_dir}/online"))
+        if not online:
+            try:
+                online = tuple(sorted(
+                    int(n[3:]) for n in os.listdir(cpu_dir)
+                    if n.startswith("cpu") and n[3:].isdigit()
+                ))
+            except OSError:
+                online = ()
+
+        # Group online CPUs by the policy directory their cpufreq link
+        # resolves to (works with and without cpufreq/policyN dirs).
+        groups: dict = {}
+        for cpu in online:
+            path = os.path.realpath(f"{cpu_dir}/cpu{cpu}/cpufreq")
+            if os.path.isdir(path):
+                groups.setdefault(path, []).append(cpu)
+
+        policies = []
+        for path, cpus in sorted(groups.items(), key=lambda kv: kv[1][0]):
+            related = parse_cpu_list(_read_text(f"{path}/related_cpus"))
+            avail = _read_text(f"{path}/scaling_available_frequencies")
+            policies.append(CpufreqPolicy(
+                name          = os.path.basename(path),
+                path          = path,
+                cpus          = tuple(c for c in related if c in online) or tuple(cpus),
+                min_khz       = _read_int(f"{path}/cpuinfo_min_freq"),
+                max_khz       = _read_int(f"{path}/cpuinfo_max_freq"),
+                available_khz = tuple(sorted(int(f) for f in (avail or "").split())),
+            ))
+
+        zones = []
+        tz_dir = self.root.join("class/thermal")
+        try:
+            names = sorted(n for n in os.listdir(tz_dir)
+                           if n.startswith("thermal_zone"))
+        except OSError:
+            names = []
+        for name in names:
+            path = f"{tz_dir}/{name}"
+            zones.append(ThermalZone(name, _read_text(f"{path}/type") or "", path))
+
+        self.online        = online
+        self.policies      = tuple(policies)
+        self.thermal_zones = tuple(zones)
+        self._policy_of    = {c: p for p in self.policies for c in p.cpus}
+        self.generation   += 1
+        self._stale        = False
+
+    def invalidate(self):
+        """Force rediscovery on the next refresh()."""
+        self._stale = True
+
+    def refresh(self) -> "Topology":
+        """Rediscover if invalidated or a CPU hotplug uevent arrived."""
+        if self._uevents is not None and self._drain_uevents():
+            self._stale = True
+        if self._stale:
+            self._discover()
+        return self
+
+    # ---------- Queries ----------
+
+    def policy_of(self, cpu: int) -> Optional[CpufreqPolicy]:
+        """The cpufreq policy of `cpu`, or None."""
+        return self._policy_of.get(cpu)
+
+    def available_freqs_khz(self) -> list:
+        """Frequencies every policy supports, ascending (first policy's
+        table on asymmetric systems)."""
+        if not self.policies:
+            return []
+        common = set(self.policies[0].available_khz)
+        for p in self.policies[1:]:
+            common &= set(p.available_khz)
+        return sorted(common or self.policies[0].available_khz)
+
+    def cpu_thermal_zone(self) -> Optional[ThermalZone]:
+        """The zone whose type mentions the CPU/SoC, else the first."""
+        for z in self.thermal_zones:
+            if "cpu" in z.type or "soc" in z.type:
+                return z
+        return self.thermal_zones[0] if self.thermal_zones else None
+
+    # ---------- Hotplug uevents ----------
+
+    def _open_uevents(self):
+        """Kernel uevent socket, only when reading the real /sys."""
+        if self.root.base != "/sys" or not hasattr(socket, "AF_NETLINK"):
+            return None
+        try:
+            s = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM,
+                              socket.NETLINK_KOBJECT_UEVENT)
+            s.bind((0, 1))          # multicast group 1: kernel events
+            s.setblocking(False)
+            return s
+        except (OSError, AttributeError, struct.error):
+            return None
+
+    def _drain_uevents(self) -> bool:
+        """Consume pending uevents; True if any was a CPU or cpufreq change."""
+        hit = False
+        while True:
+            try:
+                msg = self._uevents.recv(8192)
+            except BlockingIOError:
+                return hit
+            except OSError:
+                return hit
+            if b"SUBSYSTEM=cpu" in msg or b"/devices/system/cpu/" in msg:
+                hit = True
+
+    def close(self):
+        if self._uevents is not None:
+            self._uevents.close()
+            self._uevents = None
+
+
+_topologies: dict = {}
+
+
+def topology() -> Topology:
+    """Shared Topology for the current sysfs root, refreshed if stale."""
+    root = sys_root()
+    topo = _topologies.get(root.base)
+    if topo is None:
+        topo = _topologies[root.base] = Topology(root)
+        return topo
+    return topo.refresh()
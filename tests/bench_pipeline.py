@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark — Sampler / Logger / Budget Engine Tick Cost
+======================================================
+Times one tick of each periodic consumer against a synthetic host
+(hostfs.fixture.FakeHost), so the full pipeline can be profiled at
+10k-PID scale on any Linux box.
+
+  sampler   ProcessSampler.sample_columns()
+  power     get_power_states(sampler=...)
+  logger    PowerLogger._log_snapshot() into an in-memory CSV
+  engine    BudgetEngine._control_step() with --policies budgeted PIDs
+
+Usage:
+  python3 tests/bench_pipeline.py
+  python3 tests/bench_pipeline.py --procs 10000 --ticks 20 --policies 3
+"""
+
+import argparse
+import csv
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from hostfs.fixture import FakeHost
+from proc.process_info import ProcessSampler
+from power.power_state import get_power_states
+from log.logger import PowerLogger
+from budget import budget_engine
+from budget.budget_engine import BudgetEngine
+from budget.policy import BudgetPolicy
+
+DEFAULT_PROCS    = 10_000
+DEFAULT_TICKS    = 10
+DEFAULT_POLICIES = 3
+
+
+def time_ticks(host: FakeHost, fn, ticks: int) -> float:
+    """Median seconds per call of fn(), advancing the host between calls."""
+    fn()
+    times = []
+    for _ in range(ticks):
+        host.advance(1.0)
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--procs",    type=int, default=DEFAULT_PROCS)
+    ap.add_argument("--ticks",    type=int, default=DEFAULT_TICKS)
+    ap.add_argument("--policies", type=int, default=DEFAULT_POLICIES)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="akxos_host_") as tmp:
+        tmp = Path(tmp)
+        host = FakeHost(tmp / "host", n_procs=args.procs).build()
+
+        # Keep the engine's persisted budgets out of the real ~/.akxos
+        budget_engine.CONFIG_DIR  = tmp / "akxos"
+        budget_engine.CONFIG_FILE = budget_engine.CONFIG_DIR / "budgets.json"
+
+        with host.activate():
+            sampler = ProcessSampler(sample_delay=0.0)
+            power_sampler = ProcessSampler(sample_delay=0.0)
+
+            logger = PowerLogger(log_dir=str(tmp / "logs"))
+            writer = csv.writer(io.StringIO())
+
+            engine = BudgetEngine()
+            for pid in host.pids[:args.policies].tolist():
+                # Generous limit: measure the sampling path, not enforcement
+                engine.add_policy(BudgetPolicy(pid, 1e9, "sched_weight"))
+
+            results = {
+                "sampler": time_ticks(host, sampler.sample_columns, args.ticks),
+                "power":   time_ticks(
+                    host, lambda: get_power_states(sampler=power_sampler),
+                    args.ticks,
+                ),
+                "logger":  time_ticks(
+                    host, lambda: logger._log_snapshot(writer), args.ticks
+                ),
+                "engine":  time_ticks(host, engine._control_step, args.ticks),
+            }
+
+    print(f"\nTick cost at {args.procs} PIDs "
+          f"(median of {args.ticks}, engine with {args.policies} policies)")
+    print("-" * 40)
+    for name, secs in results.items():
+        print(f"  {name:<10}{secs * 1e3:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
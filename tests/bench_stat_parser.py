@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark — /proc/<pid>/stat Line Parsing
+=========================================
+Per-line cost of proc.stat_parser.parse_pid_stat against the previous
+implementation (decode, split the whole line on whitespace, index fields
+by position), for ordinary and awkward process names. Both extract the
+same fields: comm, utime, stime, starttime and rss.
+
+The legacy parser is also checked for correctness: names with spaces
+shift its fields and produce garbage CPU/RSS values.
+
+Usage:
+  python3 tests/bench_stat_parser.py
+  python3 tests/bench_stat_parser.py --number 500000
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from hostfs.fixture import FakeHost
+from proc.stat_parser import parse_pid_stat
+
+DEFAULT_NUMBER = 200_000
+REPEAT         = 5
+
+CASES = {
+    "plain":       "bash",
+    "space":       "Web Content",
+    "parens":      "kworker/u8:2 (events)",
+}
+
+
+def legacy_parse(buf: bytes):
+    """The split-everything parser this module replaced."""
+    data = buf.decode().split()
+    return (data[1].strip("()"), int(data[13]), int(data[14]),
+            int(data[21]), int(data[23]))
+
+
+def new_parse(buf: bytes):
+    return tuple(parse_pid_stat(buf))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--number", type=int, default=DEFAULT_NUMBER)
+    args = ap.parse_args()
+
+    print(f"{'case':<10}{'legacy (ns)':>14}{'new (ns)':>12}{'legacy correct':>17}")
+    print("-" * 53)
+    for label, comm in CASES.items():
+        buf = FakeHost._stat_line(4242, comm, 1234, 56, 99999, 789, 1).encode()
+        expected = (comm, 1234, 56, 99999, 789)
+
+        t_old = min(timeit.repeat(lambda: legacy_parse(buf),
+                                  number=args.number, repeat=REPEAT))
+        t_new = min(timeit.repeat(lambda: parse_pid_stat(buf),
+                                  number=args.number, repeat=REPEAT))
+
+        assert new_parse(buf) == expected
+        try:
+            ok = legacy_parse(buf) == expected
+        except ValueError:
+            ok = False
+
+        print(f"{label:<10}"
+              f"{t_old / args.number * 1e9:>14.0f}"
+              f"{t_new / args.number * 1e9:>12.0f}"
+              f"{'yes' if ok else 'NO':>17}")
+
+
+if __name__ == "__main__":
+    main()
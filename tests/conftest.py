@@ -0,0 +1,53 @@
+import pytest
+
+from budget import budget_engine
+from hostfs.fixture import FakeHost
+from power import calibration, energy, power_model
+from telemetry import opp
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "fakehost(**kwargs): FakeHost arguments (n_procs, n_cpus, threads, …) "
+        "for the `host` fixture",
+    )
+
+
+@pytest.fixture(autouse=True)
+def akxos_files(tmp_path, monkeypatch):
+    """
+    Keep ~/.akxos out of every test: OPP_FILE, CALIBRATION_FILE and
+    ENERGY_FILE point into tmp_path, and the model constants are
+    reloaded from the (missing) calibration there.
+    """
+    monkeypatch.setattr(opp, "OPP_FILE", tmp_path / "akxos" / "opp.json")
+    monkeypatch.setattr(calibration, "CALIBRATION_FILE",
+                        tmp_path / "akxos" / "calibration.json")
+    monkeypatch.setattr(energy, "ENERGY_FILE", tmp_path / "akxos" / "energy.npz")
+    monkeypatch.setattr(opp, "_cache", {})
+    power_model.reload_calibration()
+    yield
+    monkeypatch.undo()
+    power_model.reload_calibration()
+
+
+@pytest.fixture
+def host(request, tmp_path):
+    """
+    A built FakeHost under tmp_path/host, active for the test. Size it
+    with `pytestmark = pytest.mark.fakehost(n_procs=..., ...)` or the
+    same mark on one test.
+    """
+    mark = request.node.get_closest_marker("fakehost")
+    h = FakeHost(tmp_path / "host", **(mark.kwargs if mark else {})).build()
+    with h.activate():
+        yield h
+
+
+@pytest.fixture
+def budget_config(tmp_path, monkeypatch):
+    """Keep BudgetEngine's budgets.json under tmp_path."""
+    monkeypatch.setattr(budget_engine, "CONFIG_DIR", tmp_path / "akxos")
+    monkeypatch.setattr(budget_engine, "CONFIG_FILE",
+                        tmp_path / "akxos" / "budgets.json")
@@ -11,7 +11,8 @@ At each available frequency the experiment:
   1. Locks the CPU to that frequency via scaling_min/max_freq
   2. Runs a full-CPU workload with a permissive budget (no throttling)
   3. Reads freq_khz, util_permille, power_mw from /proc/akxos_sched
-  4. Computes the analytical model prediction and the residual
+  4. Computes the analytical model prediction and the residual, and the
+     prediction with the constant fitted by `akxos calibrate`
   5. Also checks whether the kernel reads the set frequency correctly
 
 Metrics:
@@ -40,8 +41,9 @@ from experiment_utils import (
     set_budget, clear_budget, reset_ctrl,
     launch_workload, terminate_workload,
     proc_read, get_available_freqs_khz, set_cpu_freq_khz, reset_cpu_freq,
-    model_predict_mw, save_csv, print_header,
+    model_predict_mw, MODEL_CONST_FP, save_csv, print_header,
 )
+from power.calibration import load_calibration
 
 # Permissive budget so the workload appears in /proc without any throttling
 MEASURE_BUDGET_MW = 999
@@ -84,9 +86,10 @@ def measure_at_freq(pid: int, freq_khz: int, sample_s: float) -> list:
 
 # ─── Analysis ────────────────────────────────────────────────
 
-def analyse(all_freq_rows: dict) -> list:
+def analyse(all_freq_rows: dict, const_cal: float) -> list:
     """
     For each frequency bucket compute accuracy metrics.
+    `const_cal` is the calibrated K (MODEL_CONST_FP without calibration).
     Returns list of per-frequency summary dicts.
     """
     results = []
@@ -110,6 +113,12 @@ def analyse(all_freq_rows: dict) -> list:
         ])
         avg_pred = float(np.mean(pred_per_sample))
 
+        # Same inputs, calibrated constant
+        avg_pred_cal = float(np.mean([
+            model_predict_mw(int(r["freq_khz"]), int(r["util"]), const_cal)
+            for r in rows
+        ]))
+
         # Prediction using SET freq + expected util=1000
         pred_ideal = model_predict_mw(freq_khz, 1000)
 
@@ -130,6 +139,7 @@ def analyse(all_freq_rows: dict) -> list:
             avg_power_mw      = round(avg_power, 2),
             pred_mw           = round(avg_pred, 2),
             pred_ideal_mw     = round(pred_ideal, 2),
+            pred_cal_mw       = round(avg_pred_cal, 2),
             residual_mw       = round(avg_power - avg_pred, 2),
             mape_pct          = round(mape, 2),
             rmse_mw           = round(rmse, 2),
@@ -146,6 +156,7 @@ def plot(pid: int, results: list):
     avg_pwr   = [r["avg_power_mw"]  for r in results]
     pred_pwr  = [r["pred_mw"]       for r in results]
     pred_ideal= [r["pred_ideal_mw"] for r in results]
+    pred_cal  = [r["pred_cal_mw"]   for r in results]
     mape      = [r["mape_pct"]      for r in results]
     freq_err  = [r["freq_err_pct"]  for r in results]
     avg_util  = [r["avg_util"]      for r in results]
@@ -167,6 +178,8 @@ def plot(pid: int, results: list):
             color="crimson", label="Model prediction (kernel freq+util)")
     ax.plot(freqs_mhz, pred_ideal, marker="^", linewidth=1.2, linestyle=":",
             color="orange", label="Ideal prediction (set freq, util=1000)")
+    ax.plot(freqs_mhz, pred_cal,  marker="d", linewidth=1.2, linestyle="-.",
+            color="seagreen", label="Calibrated prediction (kernel freq+util)")
     ax.fill_between(freqs_mhz,
                     [p - r for p, r in zip(avg_pwr, residuals)],
                     [p + r for p, r in zip(avg_pwr, residuals)],
@@ -269,13 +282,14 @@ def main():
                   "error_mw", "energy_uj", "viol"]
     save_csv(OUTPUT_DIR / f"model_accuracy_raw_pid{pid}.csv", raw_fields, flat)
 
-    results = analyse(all_freq_rows)
+    const_cal = load_calibration()["model_const_fp"]
+    results = analyse(all_freq_rows, const_cal)
 
     print_header("Model Accuracy Analysis")
     print(f"{'Freq(MHz)':>10} {'KernFreq':>9} {'FreqErr%':>9} "
-          f"{'Util‰':>7} {'AvgP(mW)':>10} {'Pred(mW)':>9} "
+          f"{'Util‰':>7} {'AvgP(mW)':>10} {'Pred(mW)':>9} {'Cal(mW)':>9} "
           f"{'Resid':>7} {'MAPE%':>7} {'RMSE':>7}")
-    print("─" * 82)
+    print("─" * 92)
     for r in results:
         print(
             f"{r['set_freq_mhz']:>10} "
@@ -284,6 +298,7 @@ def main():
             f"{r['avg_util']:>7.0f} "
             f"{r['avg_power_mw']:>10.2f} "
             f"{r['pred_mw']:>9.2f} "
+            f"{r['pred_cal_mw']:>9.2f} "
             f"{r['residual_mw']:>+7.2f} "
             f"{r['mape_pct']:>7.2f} "
             f"{r['rmse_mw']:>7.2f}"
@@ -294,6 +309,7 @@ def main():
         print(f"\n  Overall MAPE : {np.mean(mapes):.2f}%  (max={max(mapes):.2f}%)")
         rmses = [r["rmse_mw"] for r in results]
         print(f"  Overall RMSE : {np.mean(rmses):.2f} mW")
+        print(f"  Model K      : {MODEL_CONST_FP} (kernel), {const_cal:g} (calibrated)")
 
         save_csv(OUTPUT_DIR / f"model_accuracy_summary_pid{pid}.csv",
                  list(results[0].keys()), results)
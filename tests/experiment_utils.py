@@ -17,11 +17,16 @@ from pathlib import Path
 
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from hostfs.roots import proc_root
+from proc.stat_parser import parse_pid_stat
+from telemetry.topology import topology
+
 # ─────────────────────────────────────────────────────────────
 # Constants (must mirror akxos_sched.h)
 # ─────────────────────────────────────────────────────────────
 
-PROC_PATH       = Path("/proc/akxos_sched")
+PROC_PATH       = proc_root().path("akxos_sched")
 OUTPUT_DIR      = Path("tests/results")
 POLL_S          = 0.5
 
@@ -166,10 +171,10 @@ def terminate_workload(proc: subprocess.Popen):
 def read_exec_ticks(pid: int) -> int | None:
     """Return utime + stime (clock ticks) for pid from /proc/<pid>/stat."""
     try:
-        data = Path(f"/proc/{pid}/stat").read_text().split()
-        return int(data[13]) + int(data[14])
-    except Exception:
+        st = parse_pid_stat(proc_root().path(str(pid), "stat").read_bytes())
+    except OSError:
         return None
+    return None if st is None else st.utime + st.stime
 
 
 def pid_cpu_pct(pid: int, window_s: float = POLL_S) -> float | None:
@@ -235,52 +240,41 @@ def compute_metrics(times, raw, budget, smooth_w=10, tol_pct=5.0):
 # ─────────────────────────────────────────────────────────────
 
 def get_available_freqs_khz() -> list:
-    p = Path("/sys/devices/system/cpu/cpu0/cpufreq/scaling_available_frequencies")
-    if not p.exists():
-        return []
-    return sorted(int(f) for f in p.read_text().split())
+    return topology().available_freqs_khz()
+
+
+def _sudo_write(path: str, value):
+    subprocess.run(
+        ["sudo", "sh", "-c", f"echo {value} > {path}"],
+        capture_output=True,
+    )
 
 
 def set_cpu_freq_khz(freq_khz: int):
-    """Lock all CPUs to freq_khz via scaling_min/max_freq."""
-    cpu_dir = Path("/sys/devices/system/cpu")
-    for cpu in sorted(cpu_dir.glob("cpu[0-9]*")):
+    """Lock all CPUs to freq_khz via scaling_min/max_freq (once per policy)."""
+    for policy in topology().policies:
         for attr in ("scaling_min_freq", "scaling_max_freq"):
-            p = cpu / "cpufreq" / attr
-            if p.exists():
-                subprocess.run(
-                    ["sudo", "sh", "-c", f"echo {freq_khz} > {p}"],
-                    capture_output=True,
-                )
+            _sudo_write(policy.attr(attr), freq_khz)
     time.sleep(0.6)   # wait for governor to settle
 
 
 def reset_cpu_freq():
     """Restore hardware min/max limits."""
-    cpu_dir = Path("/sys/devices/system/cpu")
-    for cpu in sorted(cpu_dir.glob("cpu[0-9]*")):
-        fd = cpu / "cpufreq"
-        if not fd.exists():
-            continue
-        for attr, hw_attr in [
-            ("scaling_min_freq", "cpuinfo_min_freq"),
-            ("scaling_max_freq", "cpuinfo_max_freq"),
-        ]:
-            hw, sc = fd / hw_attr, fd / attr
-            if hw.exists() and sc.exists():
-                subprocess.run(
-                    ["sudo", "sh", "-c", f"echo {hw.read_text().strip()} > {sc}"],
-                    capture_output=True,
-                )
+    for policy in topology().policies:
+        if policy.min_khz:
+            _sudo_write(policy.attr("scaling_min_freq"), policy.min_khz)
+        if policy.max_khz:
+            _sudo_write(policy.attr("scaling_max_freq"), policy.max_khz)
 
 
 # ─────────────────────────────────────────────────────────────
 # Power model
 # ─────────────────────────────────────────────────────────────
 
-def model_predict_mw(freq_khz: int, util_permille: int = 1000) -> float:
-    """Reproduce the kernel's linear power model."""
-    return (MODEL_CONST_FP * freq_khz * util_permille) / MODEL_DIVISOR
+def model_predict_mw(freq_khz: int, util_permille: int = 1000,
+                     const: float = MODEL_CONST_FP) -> float:
+    """Reproduce the kernel's linear power model (optionally with another K)."""
+    return (const * freq_khz * util_permille) / MODEL_DIVISOR
 
 
 # ─────────────────────────────────────────────────────────────
@@ -0,0 +1,58 @@
+import pytest
+
+from budget.budget_engine import BudgetEngine
+from budget.policy import BudgetPolicy
+from power.energy import EnergyAccountant
+from power.power_state import get_power_states
+from proc.process_info import ProcessSampler
+
+
+pytestmark = [
+    pytest.mark.fakehost(n_procs=10),
+    pytest.mark.usefixtures("budget_config"),
+]
+
+
+def test_budget_dropped_when_pid_is_reused(host):
+    pid = int(host.pids[0])
+    engine = BudgetEngine()
+    engine.add_policy(BudgetPolicy(pid, 1e9, "cpu_quota"))
+    assert engine.policies[pid].starttime == host.starttime[0]
+
+    host.advance(1.0)
+    engine._control_step()
+    assert pid in engine.policies
+
+    host.respawn(0)
+    host.advance(1.0)
+    engine._control_step()
+    assert pid not in engine.policies
+    assert pid not in engine.runtime
+
+    # Also gone after a restart
+    assert pid not in BudgetEngine().policies
+
+
+def test_persisted_budget_for_reused_pid_is_not_loaded(host):
+    pid = int(host.pids[1])
+    BudgetEngine().add_policy(BudgetPolicy(pid, 1e9, "sched_weight"))
+    assert pid in BudgetEngine().policies
+
+    host.respawn(1)
+    host.advance(1.0)
+    assert pid not in BudgetEngine().policies
+
+
+def test_energy_counts_only_budgeted_processes_of_a_full_scan(host):
+    pid = int(host.pids[2])
+    engine = BudgetEngine()
+    engine.add_policy(BudgetPolicy(pid, 1e9, "cpu_quota"))
+    engine.energy = EnergyAccountant(None)
+
+    sampler = ProcessSampler(sample_delay=0.0)     # a logger's full scan
+    for _ in range(2):
+        host.advance(1.0)
+        engine.step(get_power_states(sampler=sampler))
+    sampler.close()
+
+    assert engine.energy.pid[:engine.energy.n].tolist() == [pid]
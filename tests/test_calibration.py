@@ -0,0 +1,147 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from power import power_model
+from power.calibration import (
+    CALIBRATION_VERSION,
+    DEFAULTS,
+    fit_logs,
+    host_features,
+    load_calibration,
+    save_calibration,
+)
+
+
+K_DYN, K_LEAK, P_IDLE, K_FP = 2.5e-10, 0.004, 1800.0, 150.0
+
+HEADER = ["timestamp", "pid", "name", "cpu_percent", "mem_kb", "voltage_v",
+          "freq_hz", "temperature_c", "p_dyn_mw", "p_leak_mw", "p_total_mw",
+          "measured_mw", "system_measured_mw"]
+
+
+def _write(path, header, rows):
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        w.writerows(rows)
+
+
+@pytest.fixture
+def logs(tmp_path):
+    """A PowerLogger CSV of 400 ticks and an experiment CSV."""
+    rng = np.random.default_rng(1)
+    rows = []
+    for tick in range(400):
+        n = int(rng.integers(5, 20))
+        cols = {
+            "voltage_v":   np.full(n, rng.uniform(0.85, 1.0)),
+            "freq_hz":     np.full(n, rng.choice([6e8, 1e9, 1.5e9])),
+            "cpu_percent": rng.uniform(0, 25, n),
+            "mem_kb":      rng.uniform(1e3, 2e5, n),
+        }
+        system = (host_features(cols).sum(axis=0) @ [K_DYN, K_LEAK]
+                  + P_IDLE + rng.normal(0, 0.5))
+        share = system * cols["cpu_percent"] / cols["cpu_percent"].sum()
+        # Every 7th tick is modeled; ticks share one wall-clock second
+        measured = tick % 7 != 0
+        rows += [[f"2026-01-01 00:00:{tick // 4 % 60:02d}", 1000 + i, "x",
+                  cols["cpu_percent"][i], cols["mem_kb"][i],
+                  cols["voltage_v"][i], cols["freq_hz"][i], 50, 0, 0, 0,
+                  f"{share[i]:.4f}" if measured else "",
+                  f"{system:.4f}" if measured else ""]
+                 for i in range(n)]
+    host = tmp_path / "power_log.csv"
+    _write(host, HEADER, rows)
+
+    freq = rng.choice([600_000, 1_500_000], 200)
+    util = rng.integers(500, 1001, 200)
+    kern = tmp_path / "model_accuracy_raw.csv"
+    _write(kern, ["freq_khz", "util", "power_mw", "measured_mw"],
+           [[f, u, 162 * f * u / 1e9, K_FP * f * u / 1e9]
+            for f, u in zip(freq, util)])
+    return host, kern
+
+
+def test_streaming_fit_recovers_coefficients(logs):
+    result = fit_logs(logs, chunk_rows=128, current=DEFAULTS)
+    host, kern = result["host"], result["kernel"]
+    assert host["rows"] == 400 - len(range(0, 400, 7))     # one per tick
+    assert host["k_dyn"] == pytest.approx(K_DYN, rel=1e-2)
+    assert host["k_leak"] == pytest.approx(K_LEAK, rel=1e-2)
+    assert host["p_idle_mw"] == pytest.approx(P_IDLE, rel=1e-2)
+    assert host["rmse_mw"] < host["rmse_before_mw"]
+    assert kern["model_const_fp"] == pytest.approx(K_FP)
+
+    # Chunking only changes where whole ticks are cut
+    assert fit_logs(logs[:1], current=DEFAULTS)["host"]["k_dyn"] == \
+        pytest.approx(host["k_dyn"])
+
+
+def test_calibration_file_is_loaded_by_power_model(logs, tmp_path):
+    path = tmp_path / "calibration.json"
+    save_calibration(fit_logs(logs[1:], current=DEFAULTS), path)
+    save_calibration(fit_logs(logs[:1], current=DEFAULTS), path)
+
+    cal = load_calibration(path)
+    assert cal["model_const_fp"] == pytest.approx(K_FP)     # kept on refit
+    assert cal["k_dyn"] == pytest.approx(K_DYN, rel=1e-2)
+    assert cal["p_idle_mw"] == pytest.approx(P_IDLE, rel=1e-2)
+
+    try:
+        power_model.reload_calibration(path)
+        assert power_model.compute_dynamic_power(1.0, 1e9, 1.0) == \
+            pytest.approx(K_DYN * 1e9 * 1e3, rel=1e-2)
+    finally:
+        power_model.reload_calibration(tmp_path / "missing.json")
+    assert power_model.K_DYN == DEFAULTS["k_dyn"]
+    assert power_model.K_LEAK_LINEAR == DEFAULTS["k_leak"]
+
+
+def test_collinear_leakage_is_held_and_coefficients_stay_physical(tmp_path):
+    # A stable process table: Σ M·V drifts by ~0.1 %, so it cannot be
+    # told apart from the idle term
+    rng = np.random.default_rng(2)
+    mem = rng.uniform(1e3, 2e5, 30)
+    rows = []
+    for tick in range(300):
+        mem = mem * rng.normal(1.0, 1e-4, mem.size)
+        cpu = rng.uniform(0, 25, mem.size)
+        cols = {"voltage_v": np.full(mem.size, 0.9),
+                "freq_hz": np.full(mem.size, 1.5e9),
+                "cpu_percent": cpu, "mem_kb": mem}
+        system = (host_features(cols).sum(axis=0) @ [K_DYN, 0.0]
+                  + P_IDLE + rng.normal(0, 20))
+        rows += [[f"t{tick}", 1000 + i, "x", cpu[i], mem[i], 0.9, 1.5e9,
+                  50, 0, 0, 0, "", f"{system:.4f}"] for i in range(mem.size)]
+    path = tmp_path / "power_log.csv"
+    _write(path, HEADER, rows)
+
+    host = fit_logs([path], current=DEFAULTS)["host"]
+    assert not host["k_leak_fitted"]
+    assert host["k_leak"] == DEFAULTS["k_leak"]
+    assert host["k_dyn"] == pytest.approx(K_DYN, rel=0.05)
+    leak = DEFAULTS["k_leak"] * (mem / 1024 * 0.9).sum()
+    assert host["p_idle_mw"] == pytest.approx(P_IDLE - leak, rel=0.02)
+
+
+def test_unphysical_section_is_rejected_whole(tmp_path):
+    path = tmp_path / "calibration.json"
+    path.write_text(json.dumps({
+        "version": CALIBRATION_VERSION,
+        "host":   {"k_dyn": K_DYN, "k_leak": 2.5, "p_idle_mw": -3000.0},
+        "kernel": {"model_const_fp": K_FP},
+    }))
+    cal = load_calibration(path)
+    assert [cal[k] for k in ("k_dyn", "k_leak", "p_idle_mw")] == \
+        [DEFAULTS[k] for k in ("k_dyn", "k_leak", "p_idle_mw")]
+    assert cal["model_const_fp"] == K_FP
+
+
+def test_fit_without_target_column_fails(tmp_path):
+    path = tmp_path / "plain.csv"
+    _write(path, ["freq_khz", "util", "power_mw"], [[600_000, 1000, 97.2]])
+    with pytest.raises(ValueError):
+        fit_logs([path], current=DEFAULTS)
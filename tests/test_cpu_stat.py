@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from power.power_state import get_power_states
+from proc.cpu_stat import CoreSampler
+from proc.process_info import ProcessSampler
+
+
+pytestmark = pytest.mark.fakehost(n_procs=50, n_cpus=4)
+
+
+def test_core_sampler_reports_per_core_busy_and_freq(host):
+    cores = CoreSampler()
+    cores.sample()
+    busy_before = host.cpu_busy.copy()
+    host.advance(10.0)
+    util = cores.sample()
+
+    assert util.cpu.tolist() == [0, 1, 2, 3]
+    expected = (host.cpu_busy - busy_before) / (10.0 * host.clk_tck)
+    assert np.allclose(util.busy, expected, atol=0.01)
+    assert np.all(util.freq_hz == host.cur_freq_khz * 1e3)
+
+
+def test_per_core_power_matches_process_total(host):
+    sampler = ProcessSampler(sample_delay=0.0)
+    sampler.sample()
+    host.advance(10.0)
+    frame = get_power_states(sampler=sampler)
+
+    assert len(frame.core_p_dyn_mw) == host.n_cpus
+    assert np.isclose(frame.core_p_dyn_mw.sum(), frame.p_dyn_mw.sum(), rtol=0.02)
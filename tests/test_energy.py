@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from power.energy import EnergyAccountant
+from power.power_frame import PowerFrame
+
+
+def _frame(pids, starts, p_mw, sample_ns=None):
+    n = len(pids)
+    z = np.zeros(n)
+    p = np.asarray(p_mw, dtype=np.float64)
+    return PowerFrame(
+        datetime.now(), 1.0, 1.5e9, 45.0,
+        pid=np.asarray(pids, dtype=np.int64),
+        name=np.array([f"proc{pid}" for pid in pids], dtype=object),
+        cpu_percent=z, mem_kb=z, p_dyn_mw=p, p_leak_mw=z, p_total_mw=p,
+        starttime=np.asarray(starts, dtype=np.int64),
+        sample_ns=sample_ns,
+    )
+
+
+class Clock:
+    def __init__(self):
+        self.t = 1_000_000.0
+
+    def wall(self):
+        return self.t
+
+    def mono_ns(self):
+        return int(self.t * 1e9)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def _accountant(path, clock, **kw):
+    return EnergyAccountant(path, clock_ns=clock.mono_ns, wall=clock.wall, **kw)
+
+
+def test_trapezoidal_integration_per_identity(tmp_path, clock):
+    acc = _accountant(tmp_path / "e.npz", clock)
+    acc.add(_frame([10, 20], [100, 200], [1000.0, 0.0]))
+    clock.t += 2.0
+    acc.add(_frame([10, 20], [100, 200], [3000.0, 500.0]))
+    clock.t += 1.0
+    # PID 10 reused by a new process: a separate identity, no energy yet
+    acc.add(_frame([10, 20], [999, 200], [8000.0, 500.0]))
+
+    top = acc.top(5)
+    assert [(r["pid"], r["starttime"]) for r in top] == [(10, 100), (20, 200)]
+    assert top[0]["joules"] == pytest.approx(4.0)          # (1 + 3) / 2 W · 2 s
+    assert top[1]["joules"] == pytest.approx(0.5 + 0.5)    # 0.25·2 + 0.5·1
+
+
+def test_window_drops_old_energy_and_keeps_totals(tmp_path, clock):
+    acc = _accountant(tmp_path / "e.npz", clock, window_s=120, bucket_s=60)
+    acc.add(_frame([1], [1], [1000.0]))
+    clock.t += 10
+    acc.add(_frame([1], [1], [1000.0]))
+    assert acc.top(1)[0]["joules"] == pytest.approx(10.0)
+
+    clock.t += 300
+    assert acc.top(1) == []
+    assert acc.top(1, window=False)[0]["joules"] == pytest.approx(10.0)
+
+
+def test_checkpoint_survives_restart(tmp_path, clock):
+    path = tmp_path / "e.npz"
+    acc = _accountant(path, clock, checkpoint_s=5)
+    acc.add(_frame([1, 2], [1, 2], [2000.0, 1000.0]))
+    clock.t += 6
+    acc.add(_frame([1, 2], [1, 2], [2000.0, 1000.0]))      # auto checkpoint
+    assert path.exists()
+
+    clock.t += 60
+    again = _accountant(path, clock)
+    top = again.top(2)
+    assert [r["pid"] for r in top] == [1, 2]
+    assert top[0]["joules"] == pytest.approx(12.0)
+    assert top[1]["name"] == "proc2"
+
+    # Monotonic time does not survive a restart: no trapezoid over the gap
+    again.add(_frame([1], [1], [2000.0]))
+    assert again.top(1)[0]["joules"] == pytest.approx(12.0)
+
+
+def test_frames_are_integrated_at_their_sample_time(clock):
+    acc = _accountant(None, clock)
+    t0 = clock.mono_ns()
+    acc.add(_frame([1], [1], [1000.0], sample_ns=t0))
+    clock.t += 5.0                          # consumed late: 5 s, sampled 1 s apart
+    acc.add(_frame([1], [1], [1000.0], sample_ns=t0 + 1_000_000_000))
+    assert acc.top(1)[0]["joules"] == pytest.approx(1.0)
+
+    acc.checkpoint()                        # no file: nothing to write
@@ -0,0 +1,121 @@
+import errno
+import shutil
+
+import pytest
+
+from proc import process_info
+from proc.process_info import ProcessSampler, StatFdPool, _fd_pool_cap
+from proc.thread_info import ThreadSampler
+
+
+pytestmark = pytest.mark.fakehost(n_procs=8, n_cpus=2)
+
+
+def _pids(host):
+    return [str(p) for p in host.pids.tolist()]
+
+
+def test_lru_cap_evicts_least_recently_read(host):
+    pids = _pids(host)
+    pool = StatFdPool(max_fds=4)
+    for pid in pids[:4]:
+        assert pool.read(pid) is not None
+    pool.read(pids[0])                      # most recent again
+    pool.read(pids[4])                      # over the cap: drops pids[1]
+
+    assert len(pool) == 4
+    assert set(pool._entries) == {pids[0], pids[2], pids[3], pids[4]}
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_exited_process_is_evicted(host, monkeypatch):
+    pids = _pids(host)
+    pool = StatFdPool()
+    for pid in pids:
+        pool.read(pid)
+
+    # procfs fails reads on a descriptor whose process exited with ESRCH;
+    # the plain files of FakeHost stay readable, so inject it.
+    gone = pids[2]
+    fd = pool._entries[gone][0]
+    pread = pool._pread
+
+    def dead_pread(f):
+        if f == fd:
+            raise OSError(errno.ESRCH, "No such process")
+        return pread(f)
+
+    monkeypatch.setattr(pool, "_pread", dead_pread)
+    shutil.rmtree(host.proc.path(gone))     # reopen then fails with ENOENT
+
+    assert pool.read(gone) is None
+    assert gone not in pool._entries
+    assert pool.read(pids[3]) is not None
+
+    # Never-seen PID: nothing cached
+    assert pool.read("999999") is None
+    assert "999999" not in pool._entries
+
+    pool.retain(set(pids[:2]))
+    assert set(pool._entries) == set(pids[:2])
+    pool.close()
+
+
+def test_reused_pid_is_reopened_and_rebound(host):
+    pid = _pids(host)[1]
+    pool = StatFdPool()
+    first = pool.read(pid)
+    assert first.starttime == host.starttime[1]
+    assert pool._entries[pid][1] == first.starttime
+
+    host.respawn(1)
+    host.advance(1.0)
+
+    again = pool.read(pid)
+    assert again.starttime == host.starttime[1] != first.starttime
+    assert pool._entries[pid][1] == again.starttime
+    assert len(pool) == 1
+    pool.close()
+
+
+def test_descriptor_exhaustion_reads_uncached(host, monkeypatch):
+    pids = _pids(host)
+    pool = StatFdPool()
+    pool.read(pids[0])
+    pool.read(pids[1])
+
+    # The process is out of descriptors while the pool holds two
+    open_ = process_info.os.open
+
+    def tight_open(path, flags):
+        if len(pool) >= 2:
+            raise OSError(errno.EMFILE, "Too many open files")
+        return open_(path, flags)
+
+    monkeypatch.setattr(process_info.os, "open", tight_open)
+
+    st = pool.read(pids[2])
+    assert st is not None and st.starttime == host.starttime[2]
+    assert list(pool._entries) == [pids[1]]
+    pool.close()
+
+
+def test_samplers_split_one_descriptor_budget(host):
+    cap = _fd_pool_cap()
+
+    procs = ProcessSampler(sample_delay=0.0, backend="auto", workers=4,
+                           clock_ns=host.monotonic_ns)
+    procs.sample()
+    assert procs.backend == "schedstat"
+    pools = procs._fd_pools + procs._sched_pools
+    assert sum(p.max_fds for p in pools) <= cap
+    procs.close()
+
+    threads = ThreadSampler(host.pids[:2], sample_delay=0.0, backend="auto",
+                            clock_ns=host.monotonic_ns)
+    threads.sample()
+    assert threads.backend == "schedstat"
+    pools = (threads._proc_pool, threads._task_pool, threads._sched_pool)
+    assert sum(p.max_fds for p in pools) <= cap
+    threads.close()
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from budget.budget_engine import BudgetEngine
+from budget.pid_controller import QuotaPIDController
+from budget.policy import BudgetPolicy
+from power.live_model import LivePowerModel, RecursiveLeastSquares
+from power.power_state import get_power_states
+from proc.process_info import ProcessSampler
+from telemetry.power_meter import PowerMeter
+
+
+def test_rls_converges_and_tracks_a_gain_change():
+    rng = np.random.default_rng(0)
+    rls = RecursiveLeastSquares([0.0, 0.0], forgetting=0.9)
+    for theta in ([3.0, 50.0], [6.0, 50.0]):        # plant gain doubles
+        for _ in range(60):
+            phi = [rng.uniform(0, 100), 1.0]
+            rls.update(phi, float(np.dot(theta, phi)) + rng.normal(0, 0.1))
+        assert rls.theta == pytest.approx(theta, rel=0.02)
+
+
+def test_pi_controller_feedforward_is_held_and_rate_limited():
+    ctrl = QuotaPIDController(pid=1, kp=0.3, ki=0.0)
+    # In the deadband only the halved P term acts: 100 - 0.5 * 0.3 * 5
+    assert ctrl.step(105.0, 100.0, feedforward_pct=40.0) == pytest.approx(99.25)
+
+    # Outside it, the pull toward q_ff ramps in and is capped per step
+    ctrl = QuotaPIDController(pid=1, kp=0.0, ki=0.0)
+    quotas = [ctrl.step(0.0, 100.0, feedforward_pct=40.0) for _ in range(30)]
+    steps = -np.diff([100.0] + quotas)
+    assert steps[:5] == pytest.approx([2.0, 4.0, 6.0, 8.0, 10.0])
+    assert np.all(steps >= 0) and np.all(steps <= 10.0 + 1e-9)
+    assert quotas[-1] == pytest.approx(40.0)
+
+    # Losing the model restarts the ramp
+    ctrl.step(0.0, 100.0)
+    assert ctrl.step(0.0, 100.0, feedforward_pct=60.0) == pytest.approx(42.0)
+
+
+pytestmark = [
+    pytest.mark.fakehost(n_procs=20, n_cpus=4),
+    pytest.mark.usefixtures("budget_config"),
+]
+
+
+def test_live_model_learns_measured_power(host):
+    sampler = ProcessSampler(sample_delay=0.0)
+    meter = PowerMeter(source="hwmon")
+    live = LivePowerModel()
+    get_power_states(sampler=sampler, power_meter=meter)
+
+    rng = np.random.default_rng(2)
+    errors = []
+    for _ in range(40):
+        host.util[:] = rng.uniform(0.0, 0.5, len(host.util))
+        host.advance(1.0)
+        frame = get_power_states(sampler=sampler, power_meter=meter)
+        assert live.update(frame)
+        errors.append(abs(live.error_mw))
+    meter.close()
+
+    # The offline model has no idle baseline; RLS learns it
+    assert np.mean(errors[-10:]) < 0.1 * np.mean(errors[:3])
+    assert 1000 < live.idle_mw < 3000
+    priced = live.apply(frame)
+    assert np.all(priced.p_total_mw >= 0)
+    assert priced.measured_mw == frame.measured_mw
+
+
+def test_quota_feedforward_inverts_the_learned_model(host):
+    i = int(np.argmax(host.util))
+    pid = int(host.pids[i])
+    engine = BudgetEngine()
+    engine.add_policy(BudgetPolicy(pid, 1.0, "cpu_quota"))
+
+    rng = np.random.default_rng(3)
+    for _ in range(6):
+        host.util[i] = rng.uniform(0.2, 1.0)
+        host.advance(1.0)
+        engine._control_step()
+
+    assert engine._quota_models[pid].n_updates == 6
+
+    # Modeled power is linear in util x freq: half the dynamic power
+    # should need half the current utilisation
+    host.advance(1.0)
+    row = get_power_states(sampler=engine._sampler).get(pid)
+    policy = engine.policies[pid]
+    policy.power_limit_mw = row["p_leak_mw"] + row["p_dyn_mw"] / 2
+    util = row["cpu_percent"] * host.n_cpus
+    state = engine.runtime[pid]
+    state.add_sample(row["p_total_mw"], util * row["freq_hz"] / 1e9)
+    ff = engine._quota_feedforward(pid, policy, state, row["freq_hz"])
+    assert ff == pytest.approx(max(util / 2, 5.0), rel=0.05)
@@ -0,0 +1,64 @@
+import pytest
+
+from telemetry import opp
+from telemetry.opp import OppTable, opp_table
+from telemetry.reader import TelemetryReader
+from telemetry.sys_telemetry import get_cpu_voltage
+
+
+OPPS = {600_000: 850_000, 1_000_000: 900_000, 1_500_000: 1_000_000}
+
+
+pytestmark = pytest.mark.fakehost(n_procs=10, n_cpus=4)
+
+
+@pytest.fixture(autouse=True)
+def devicetree(host):
+    """CPU OPP table nodes in the host's device tree."""
+    table = host.sys.path("firmware/devicetree/base/cpu-opp-table")
+    for khz, uv in OPPS.items():
+        node = table / f"opp-{khz * 1000}"
+        node.mkdir(parents=True)
+        (node / "opp-hz").write_bytes((khz * 1000).to_bytes(8, "big"))
+        (node / "opp-microvolt").write_bytes(uv.to_bytes(4, "big"))
+
+
+def test_table_learned_from_devicetree_once(host):
+    table = opp_table()
+    assert table.freqs_khz.tolist() == sorted(OPPS)
+    assert opp_table() is table
+    assert not opp.OPP_FILE.exists()     # not the real /sys
+
+    assert table.voltage_at(1.0e9) == pytest.approx(0.90)
+    assert table.voltage_at(1.25e9) == pytest.approx(0.95)     # interpolated
+    assert table.voltage_at(3.0e9) == pytest.approx(1.00)      # clamped
+
+
+def test_table_is_saved_and_preferred_for_the_real_sysfs(host, monkeypatch):
+    monkeypatch.setattr(opp, "_persisted", lambda: True)
+    table = opp_table()
+    saved = OppTable.load(opp.OPP_FILE)
+    assert saved.volts_uv.tolist() == table.volts_uv.tolist()
+
+    OppTable([1_000_000], [777_000]).save()
+    monkeypatch.setattr(opp, "_cache", {})
+    assert opp_table().voltage_at(1.0e9) == pytest.approx(0.777)
+
+
+def test_reader_derives_voltage_from_frequency(host):
+    reader = TelemetryReader(freq_source="cur")
+    assert reader._fd_volt is None
+    assert len(reader._fds) == 2            # thermal + one policy
+
+    # Idle runs at the lowest OPP, saturation at the highest
+    for util, volts in ((0.0, 0.85), (1.0, 1.00)):
+        host.util[:] = util
+        host.advance(1.0)
+        t = reader.read()
+        assert t.voltage_v == pytest.approx(volts)
+        assert t.voltage_v == pytest.approx(get_cpu_voltage())
+    reader.close()
+
+    regulator = TelemetryReader(voltage_source="regulator")
+    assert regulator.opp is None and regulator.read().voltage_v == 0.9
+    regulator.close()
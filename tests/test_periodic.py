@@ -0,0 +1,59 @@
+import signal
+import time
+
+import pytest
+
+from telemetry.periodic import PeriodicScheduler
+
+
+def test_work_time_does_not_stretch_the_period():
+    sched = PeriodicScheduler(0.01)
+    start = time.monotonic()
+    for k in sched.ticks():
+        time.sleep(0.004)                       # work
+        if k == 19:
+            break
+    # Sleeping the interval after the work would take ~20 × 14 ms
+    assert time.monotonic() - start < 0.2 * 1.25
+    assert sched.stats.ticks == 20
+
+
+@pytest.mark.parametrize("overrun, n_ticks", [("skip", 7), ("catch_up", 10)])
+def test_overrun_policies(overrun, n_ticks):
+    sched = PeriodicScheduler(0.02, overrun=overrun)
+    ticks = 0
+    for k in sched.ticks(duration=0.2):
+        ticks += 1
+        if k == 0:
+            time.sleep(0.07)                    # misses three deadlines
+    assert ticks == n_ticks
+    assert sched.stats.overruns >= 1
+    if overrun == "skip":
+        assert sched.stats.skipped == 3
+    else:
+        assert sched.stats.max_late_ms >= 40
+
+
+def test_stop_ends_iteration():
+    sched = PeriodicScheduler(10.0)
+    start = time.monotonic()
+    for k in sched.ticks():
+        if k == 0:
+            sched.stop()
+    assert time.monotonic() - start < 1.0
+    assert sched.stats.ticks == 1
+
+
+def test_stop_from_signal_handler_wakes_the_sleep():
+    sched = PeriodicScheduler(10.0)
+    previous = signal.signal(signal.SIGALRM, lambda *_: sched.stop())
+    try:
+        signal.setitimer(signal.ITIMER_REAL, 0.05)
+        start = time.monotonic()
+        assert list(sched.ticks()) == [0]       # asleep for tick 1 when stopped
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        sched.close()
+    assert sched.stopped
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from power.power_state import get_power_states
+from proc.process_info import ProcessSampler
+
+
+pytestmark = pytest.mark.fakehost(n_procs=20, n_cpus=2)
+
+
+def _frame(host):
+    sampler = ProcessSampler(sample_delay=0.0)
+    get_power_states(sampler=sampler)
+    host.advance(1.0)
+    frame = get_power_states(sampler=sampler)
+    sampler.close()
+    return frame
+
+
+def _legacy_dicts(frame):
+    """Per-process dicts as get_power_states returned them before PowerFrame."""
+    return [
+        {
+            "timestamp": frame.timestamp,
+            "pid": pid,
+            "name": name,
+            "cpu_percent": cpu,
+            "mem_kb": mem,
+            "voltage_v": frame.voltage_v,
+            "freq_hz": frame.freq_hz,
+            "temperature_c": frame.temperature_c,
+            "p_dyn_mw": p_dyn,
+            "p_leak_mw": p_leak,
+            "p_total_mw": p_dyn + p_leak,
+        }
+        for pid, name, cpu, mem, p_dyn, p_leak in zip(
+            frame.pid.tolist(), frame.name.tolist(),
+            frame.cpu_percent.tolist(), frame.mem_kb.tolist(),
+            frame.p_dyn_mw.tolist(), frame.p_leak_mw.tolist(),
+        )
+    ]
+
+
+def _legacy_csv(ps):
+    """One row as PowerLogger wrote it from a legacy dict."""
+    return [
+        ps["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
+        ps["pid"],
+        ps["name"],
+        f"{ps['cpu_percent']:.2f}",
+        ps["mem_kb"],
+        f"{ps['voltage_v']:.3f}",
+        f"{ps['freq_hz']:.0f}",
+        f"{ps['temperature_c']:.1f}",
+        f"{ps['p_dyn_mw']:.3f}",
+        f"{ps['p_leak_mw']:.3f}",
+        f"{ps['p_total_mw']:.3f}",
+    ]
+
+
+def test_row_view_matches_legacy_dicts(host):
+    frame = _frame(host)
+    legacy = _legacy_dicts(frame)
+
+    assert len(frame) == len(legacy) == 20
+    for got, want in zip(frame.rows(), legacy):
+        assert got.keys() == want.keys()
+        assert got["p_total_mw"] == pytest.approx(want.pop("p_total_mw"))
+        assert {k: got[k] for k in want} == want
+    assert frame[3] == frame.row(3) == frame.get(legacy[3]["pid"])
+    assert frame.get(-1) is None
+
+
+def test_take_and_top_select_rows(host):
+    frame = _frame(host)
+    idx = np.array([7, 2, 11])
+    sub = frame.take(idx)
+
+    assert sub.rows() == [frame.row(i) for i in idx]
+    np.testing.assert_array_equal(sub.starttime, frame.starttime[idx])
+    assert sub.identity(0) == frame.identity(7)
+    assert sub.index_of(int(frame.pid[2])) == 1
+    assert sub.cores is frame.cores and sub.measured_mw == frame.measured_mw
+
+    top = frame.top(5, key="p_total_mw")
+    assert top.p_total_mw.tolist() == sorted(frame.p_total_mw, reverse=True)[:5]
+
+
+def test_csv_rows_match_legacy_logger(host):
+    frame = _frame(host)
+    rows = list(frame.csv_rows())
+
+    assert [r[:11] for r in rows] == [_legacy_csv(ps) for ps in _legacy_dicts(frame)]
+    assert all(r[11:] == ["", ""] for r in rows)    # modeled: no measurement
+
+    frame.measured_mw = 4000.0
+    assert [r[11:] for r in frame.csv_rows()] == [[r[10], "4000.000"] for r in rows]
@@ -0,0 +1,119 @@
+import json
+
+import numpy as np
+import pytest
+
+from hostfs.fixture import IDLE_POWER_MW
+from power import power_model
+from power.calibration import CALIBRATION_VERSION, DEFAULTS
+from power.power_state import get_power_states
+from proc.process_info import ProcessSampler
+from telemetry.power_meter import PowerMeter
+
+
+pytestmark = pytest.mark.fakehost(n_procs=50, n_cpus=4)
+
+
+def test_hwmon_reads_instantaneous_power(host):
+    meter = PowerMeter(source="hwmon")
+    assert meter.kind == "hwmon"
+    host.advance(1.0)
+    assert meter.sample() == pytest.approx(host.power_mw, abs=1e-3)
+    meter.close()
+
+
+def test_powercap_averages_top_level_zones_over_window(host):
+    meter = PowerMeter(clock_ns=host.monotonic_ns)
+    assert meter.kind == "powercap"
+    assert meter.sample() is None           # no window yet
+
+    host.advance(1.0)
+    p1 = host.power_mw
+    host.advance(1.0)
+    p2 = host.power_mw
+    # Sub-zone intel-rapl:0:0 is not added on top of its parent
+    assert meter.sample() == pytest.approx((p1 + p2) / 2, rel=1e-6)
+    meter.close()
+
+
+def _vary_load(host, rng, base):
+    host.util[:] = base * rng.uniform(0.2, 1.0)
+    host.advance(1.0)
+
+
+def test_measured_power_is_apportioned_by_cpu_share(host):
+    sampler = ProcessSampler(sample_delay=0.0)
+    meter = PowerMeter(source="hwmon")
+    rng = np.random.default_rng(0)
+    base = host.util.copy()
+    get_power_states(sampler=sampler, power_meter=meter)
+    for _ in range(10):
+        _vary_load(host, rng, base)
+        frame = get_power_states(sampler=sampler, power_meter=meter)
+
+    assert frame.measured_mw == pytest.approx(host.power_mw, abs=1e-3)
+    assert np.all(frame.p_leak_mw == 0)
+    # Uncalibrated, the meter's idle estimate is the static baseline.
+    # Every busy tick belongs to a process, so the shares add up to the rest.
+    dynamic = frame.measured_mw - meter.idle.mw
+    assert dynamic > 0
+    assert frame.p_total_mw.sum() == pytest.approx(dynamic, rel=0.02)
+    assert frame.core_p_dyn_mw.sum() == pytest.approx(dynamic, rel=1e-6)
+    ratio = frame.p_total_mw / np.maximum(frame.cpu_percent, 1e-9)
+    busy = frame.cpu_percent > 0
+    assert np.allclose(ratio[busy], ratio[busy][0])
+
+    modeled = get_power_states(sampler=sampler)
+    assert modeled.measured_mw is None
+    meter.close()
+
+
+def test_idle_baseline_is_not_charged_to_processes(host, tmp_path):
+    path = tmp_path / "calibration.json"
+    path.write_text(json.dumps({"version": CALIBRATION_VERSION, "host": {
+        "k_dyn": DEFAULTS["k_dyn"], "k_leak": DEFAULTS["k_leak"],
+        "p_idle_mw": 2000.0,
+    }}))
+    host.util[:] = 0.0
+    host.util[3] = 0.2                      # one light process, 5% of the box
+
+    sampler = ProcessSampler(sample_delay=0.0)
+    meter = PowerMeter(source="hwmon")
+    try:
+        power_model.reload_calibration(path)
+        get_power_states(sampler=sampler, power_meter=meter)
+        host.advance(10.0)
+        frame = get_power_states(sampler=sampler, power_meter=meter)
+    finally:
+        power_model.reload_calibration(tmp_path / "missing.json")
+        meter.close()
+
+    assert frame.measured_mw > 2000.0
+    light = frame.get(int(host.pids[3]))["p_total_mw"]
+    assert light == pytest.approx(frame.measured_mw - 2000.0, rel=0.05)
+    assert light < 100.0
+    assert frame.p_total_mw.sum() == pytest.approx(light)
+
+
+def test_uncalibrated_idle_baseline_comes_from_the_meter(host):
+    full = ProcessSampler(sample_delay=0.0)
+    targeted = ProcessSampler(sample_delay=0.0, pids=host.pids[:3])
+    meter = PowerMeter(source="hwmon")
+    rng = np.random.default_rng(1)
+    base = host.util.copy()
+
+    get_power_states(sampler=full, power_meter=meter)
+    assert meter.idle.mw == pytest.approx(host.power_mw, abs=1e-3)  # floor only
+    get_power_states(sampler=targeted, power_meter=meter)
+    for _ in range(20):
+        _vary_load(host, rng, base)
+        a = get_power_states(sampler=full, power_meter=meter)
+        b = get_power_states(sampler=targeted, power_meter=meter)
+
+    assert meter.idle.mw == pytest.approx(IDLE_POWER_MW, rel=0.01)
+    # The baseline does not depend on which processes were sampled
+    pid = int(host.pids[0])
+    assert b.get(pid)["p_total_mw"] == pytest.approx(a.get(pid)["p_total_mw"], rel=0.01)
+    full.close()
+    targeted.close()
+    meter.close()
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from power.constants import T_NOM_C
+from power.power_model import (
+    LEAK_MODELS,
+    compute_dynamic_power,
+    compute_dynamic_power_batch,
+    compute_leakage_power,
+    compute_leakage_power_batch,
+)
+
+
+MEM_KB = np.array([1024.0, 65536.0, 4.0])
+
+
+def test_thermal_model_equals_linear_at_nominal_or_unknown_temperature():
+    linear = compute_leakage_power_batch(MEM_KB, 0.9, "linear")
+    for t in (T_NOM_C, None, 0.0):
+        assert np.allclose(
+            compute_leakage_power_batch(MEM_KB, 0.9, "thermal", t), linear
+        )
+
+
+def test_thermal_leakage_grows_with_temperature():
+    temps = [45.0, 60.0, 70.0, 80.0]
+    p = [compute_leakage_power(65536.0, 0.9, "thermal", t) for t in temps]
+    assert p == sorted(p) and len(set(p)) == len(p)
+    # Roughly doubles over 20 °C around the throttling range
+    assert 1.7 < p[3] / compute_leakage_power(65536.0, 0.9, "thermal", 60.0) < 2.3
+
+
+@pytest.mark.parametrize("freq_hz", [1.8e9, np.array([0.6e9, 1.2e9, 2.4e9])])
+def test_dynamic_batch_matches_scalar(freq_hz):
+    activity = np.array([0.0, 0.25, 1.0])
+    batch = compute_dynamic_power_batch(0.95, freq_hz, activity)
+    f = np.broadcast_to(freq_hz, activity.shape)
+    scalar = [compute_dynamic_power(0.95, fi, a) for fi, a in zip(f, activity)]
+    assert batch.shape == activity.shape
+    assert np.allclose(batch, scalar) and batch[2] > 0
+
+
+@pytest.mark.parametrize("model", LEAK_MODELS)
+def test_leakage_batch_matches_scalar(model):
+    batch = compute_leakage_power_batch(MEM_KB, 0.95, model, 72.5)
+    scalar = [compute_leakage_power(m, 0.95, model, 72.5) for m in MEM_KB]
+    assert np.allclose(batch, scalar)
@@ -0,0 +1,79 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from budget.budget_engine import BudgetEngine
+from budget.policy import BudgetPolicy
+from log.logger import PowerLogger
+from power.power_state import stream_power_states
+from telemetry import periodic
+
+
+pytestmark = [
+    pytest.mark.fakehost(n_procs=10),
+    pytest.mark.usefixtures("budget_config"),
+]
+
+
+@pytest.fixture
+def fake_sleep(host, monkeypatch):
+    """asyncio.sleep in the scheduler advances the host's clock instead."""
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        host.advance(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(periodic.asyncio, "sleep", sleep)
+
+
+@pytest.mark.usefixtures("fake_sleep")
+def test_stream_ticks_on_absolute_deadlines(host):
+    interval = 1.0
+
+    async def consume():
+        stamps = []
+        frames = stream_power_states(interval, clock_ns=host.monotonic_ns)
+        async for frame in frames:
+            stamps.append(frame.sample_ns)
+            # Slow consumer: 0.8 interval of work per frame, 2.5 on the 5th
+            host.advance(2.5 if len(stamps) == 5 else 0.8)
+            if len(stamps) == 8:
+                break
+        await frames.aclose()
+        return np.array(stamps), frame
+
+    stamps, frame = asyncio.run(consume())
+    assert len(frame) == len(host.pids)
+    # Work time does not shift later deadlines; the overrun skips two
+    steps = np.diff(stamps) / 1e9
+    assert steps == pytest.approx([1, 1, 1, 1, 3, 1, 1], abs=1e-6)
+
+
+@pytest.mark.usefixtures("fake_sleep")
+def test_engine_and_logger_share_one_stream(host, tmp_path):
+    pid, n = int(host.pids[0]), 3
+    engine = BudgetEngine()
+    engine.add_policy(BudgetPolicy(pid, 1e9, "cpu_quota"))
+    logger = PowerLogger(duration=60, log_dir=str(tmp_path / "logs"))
+
+    async def main():
+        frames = stream_power_states(1.0, clock_ns=host.monotonic_ns)
+
+        async def logged(writer):
+            for _ in range(n):
+                frame = await anext(frames)
+                logger.write_frame(writer, frame)
+                yield frame
+
+        with logger.open_writer() as writer:
+            await engine.run_async(logged(writer))
+        await frames.aclose()
+
+    asyncio.run(main())
+    assert len(engine.runtime[pid].samples) == n
+    with open(logger.log_file) as f:
+        rows = f.read().splitlines()
+    assert len(rows) == 1 + n * len(host.pids)
+
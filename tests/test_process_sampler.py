@@ -0,0 +1,122 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from power.power_state import get_power_states
+from proc import process_info
+from proc.process_info import ProcessSampler, get_process_stats
+
+
+pytestmark = pytest.mark.fakehost(n_procs=50, n_cpus=4)
+
+
+def test_only_the_first_sample_blocks(host, monkeypatch):
+    slept = []
+    monkeypatch.setattr(process_info.time, "sleep", slept.append)
+    sampler = ProcessSampler(sample_delay=0.5)
+    sampler.sample()
+    sampler.sample()
+    assert slept == [0.5]
+
+    sampler.reset()
+    sampler.sample()
+    assert slept == [0.5, 0.5]
+
+
+def test_sampler_tracks_synthetic_utilisation(host):
+    sampler = ProcessSampler(sample_delay=0.0)
+    sampler.sample()
+    host.advance(10.0)
+    cols = sampler.sample_columns()
+
+    order = np.argsort(cols.pid)
+    assert cols.pid[order].tolist() == host.pids.tolist()
+
+    # Share of all-CPU time; FakeHost jitters each process by ±20 %
+    expected = 100.0 * host.util / host.n_cpus
+    assert np.allclose(cols.cpu[order], expected, rtol=0.2, atol=0.1)
+    assert cols.mem[order].tolist() == (host.rss.astype(int) * 4).tolist()
+
+
+def test_targeted_sampler_drops_missing_pids(host):
+    wanted = host.pids[:3].tolist()
+    sampler = ProcessSampler(sample_delay=0.0, pids=wanted + [999_999])
+    sampler.sample()
+    host.advance(1.0)
+    assert sorted(sampler.sample_columns().pid.tolist()) == wanted
+
+
+def test_schedstat_backend_resolves_sub_tick_usage(host):
+    sampler = ProcessSampler(sample_delay=0.0, backend="auto",
+                             clock_ns=host.monotonic_ns)
+    sampler.sample()
+    assert sampler.backend == "schedstat"
+
+    # 20 ms window: two ticks per CPU, below what stat can resolve
+    host.advance(0.02)
+    cols = sampler.sample_columns()
+    order = np.argsort(cols.pid)
+    expected = 100.0 * host.util / host.n_cpus
+    assert np.allclose(cols.cpu[order], expected, rtol=0.2, atol=0.05)
+
+
+def test_reused_pid_is_not_diffed_against_previous_process(host):
+    sampler = ProcessSampler(sample_delay=0.0, pids=host.pids[:1])
+    host.advance(100.0)           # old process accumulates lots of CPU
+    sampler.sample()
+
+    host.respawn(0)
+    host.advance(10.0)
+    cols = sampler.sample_columns()
+
+    # The new process's ticks count in full instead of clamping to 0
+    expected = 100.0 * host.util[0] / host.n_cpus
+    assert np.isclose(cols.cpu[0], expected, rtol=0.2, atol=0.1)
+    assert cols.identity(0).starttime == host.starttime[0]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_sharded_scan_matches_serial_scan(host, monkeypatch, workers):
+    # PIDs listed in /proc but gone by the time their stat is read
+    exited = [str(p) for p in host.pids[::7].tolist()]
+    listdir = process_info.os.listdir
+
+    def racy_listdir(path):
+        names = listdir(path)
+        if path == host.proc.base:
+            for pid in exited:
+                shutil.rmtree(host.proc.path(pid), ignore_errors=True)
+        return names
+
+    monkeypatch.setattr(process_info.os, "listdir", racy_listdir)
+
+    serial  = ProcessSampler(sample_delay=0.0, workers=1)
+    sharded = ProcessSampler(sample_delay=0.0, workers=workers,
+                             parallel_threshold=0)
+    serial.sample_columns()
+    sharded.sample_columns()
+    host.advance(5.0)
+    a = serial.sample_columns()
+    b = sharded.sample_columns()
+
+    assert not set(exited) & set(map(str, b.pid.tolist()))
+    ia, ib = np.argsort(a.pid), np.argsort(b.pid)
+    for col in ("pid", "name", "cpu", "mem", "starttime"):
+        np.testing.assert_array_equal(getattr(a, col)[ia], getattr(b, col)[ib])
+    serial.close()
+    sharded.close()
+
+
+def test_sampler_closes_on_exit_and_one_shots_leave_no_fds(host):
+    before = len(os.listdir("/proc/self/fd"))
+    with ProcessSampler(sample_delay=0.0) as sampler:
+        sampler.sample()
+        assert len(os.listdir("/proc/self/fd")) > before
+    # Released at exit, not when the sampler is collected
+    assert len(os.listdir("/proc/self/fd")) == before
+
+    assert len(get_process_stats(sample_delay=0.0)) == 50
+    assert len(get_power_states()) == 50
+    assert len(os.listdir("/proc/self/fd")) == before
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pytest
+
+from power.power_state import get_power_states
+from power.snapshot_cache import SnapshotCache
+from proc.process_info import ProcessSampler
+
+
+pytestmark = pytest.mark.fakehost(n_procs=50, n_cpus=4)
+
+
+def test_consumers_share_one_sample_within_max_age(host):
+    cache = SnapshotCache(max_age_s=1.0, clock_ns=host.monotonic_ns)
+    view   = ProcessSampler(sample_delay=0.0, clock_ns=host.monotonic_ns)
+    engine = ProcessSampler(sample_delay=0.0, clock_ns=host.monotonic_ns)
+    get_power_states(sampler=view)
+    host.advance(2.0)
+
+    full = get_power_states(sampler=view, cache=cache)
+    engine.pids = full.pid[:3]
+    sub = get_power_states(sampler=engine, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert engine.window_ns is None             # never scanned
+    np.testing.assert_array_equal(sub.pid, full.pid[:3])
+    np.testing.assert_array_equal(sub.p_total_mw, full.p_total_mw[:3])
+
+    # A narrower frame cannot serve a full request, nor another model
+    assert cache.get("linear:model", None) is full
+    assert cache.get("thermal:model", None) is None
+
+    host.advance(1.5)
+    get_power_states(sampler=view, cache=cache)
+    assert cache.misses == 3
+
+
+def test_shared_file_serves_other_processes(host, tmp_path):
+    path = tmp_path / "snapshot"
+    logger = SnapshotCache(1.0, path=path, clock_ns=host.monotonic_ns)
+    engine = SnapshotCache(1.0, path=path, clock_ns=host.monotonic_ns)
+
+    sampler = ProcessSampler(sample_delay=0.0, clock_ns=host.monotonic_ns)
+    get_power_states(sampler=sampler)
+    host.advance(2.0)
+    full = get_power_states(sampler=sampler, cache=logger)
+
+    got = engine.get("linear:model", full.pid[5:8])
+    assert got is not None
+    np.testing.assert_array_equal(got.pid, full.pid[5:8])
+    np.testing.assert_allclose(got.p_total_mw, full.p_total_mw[5:8])
+    np.testing.assert_array_equal(got.name, full.name[5:8])
+    np.testing.assert_array_equal(got.cores.busy, full.cores.busy)
+    assert got.temperature_c == full.temperature_c
+    assert got.sample_ns == full.sample_ns == host.monotonic_ns()
+
+    # The engine's narrower frame does not evict the fresh full one
+    engine.put("linear:model", got, pids=full.pid[5:8])
+    assert SnapshotCache(1.0, path=path, clock_ns=host.monotonic_ns) \
+        .get("linear:model") is not None
+
+    host.advance(1.5)
+    assert engine.get("linear:model", full.pid[5:8]) is None
+    logger.close(); engine.close()
+
+
+def test_shared_file_is_not_followed_or_grown_by_readers(tmp_path):
+    target = tmp_path / "elsewhere"
+    target.write_bytes(b"")
+    link = tmp_path / "snapshot"
+    link.symlink_to(target)
+    with pytest.raises(OSError):
+        SnapshotCache(1.0, path=link)
+
+    path = tmp_path / "own"
+    reader = SnapshotCache(1.0, path=path)
+    assert reader.get("linear:model") is None
+    assert os.path.getsize(path) == 0           # only a writer resizes it
+    reader.close()
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from hostfs.fixture import FakeHost
+from proc.stat_parser import parse_pid_stat
+
+# comm is at most 15 bytes but may hold any byte except NUL
+ODD_COMMS = [
+    "bash",
+    "Web Content",
+    "kworker/u8:2 (events)",
+    "a) b",
+    ")",
+    "(",
+    "))((",
+    "() ()",
+    ") 1 2 3 4 5 6 7",
+    "x" * 15,
+    " ",
+    "",
+    "tab\there",
+    "new\nline",
+    "ümlaut",
+]
+
+
+def _line(comm: str, pid=4242, utime=11, stime=7, starttime=9001, rss=321):
+    return FakeHost._stat_line(pid, comm, utime, stime, starttime, rss, 2).encode()
+
+
+@pytest.mark.parametrize("comm", ODD_COMMS)
+def test_odd_comm_names_keep_fields_aligned(comm):
+    st = parse_pid_stat(_line(comm))
+    assert st.comm == comm
+    assert (st.utime, st.stime, st.starttime, st.rss_pages) == (11, 7, 9001, 321)
+
+
+def test_random_comm_fuzz():
+    rng = random.Random(0)
+    alphabet = "ab() \t:/-_.)(0123456789"
+    for _ in range(2000):
+        comm = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 15)))
+        vals = [rng.randint(0, 2**40) for _ in range(4)]
+        st = parse_pid_stat(_line(comm, 1, *vals))
+        assert st.comm == comm
+        assert [st.utime, st.stime, st.starttime, st.rss_pages] == vals
+
+
+@pytest.mark.parametrize("buf", [
+    b"",
+    b"123",
+    b"123 (noclose S 1 2",
+    b"123 (short) S 1 2 3",
+    _line("ok")[:60],
+])
+def test_malformed_lines_return_none(buf):
+    assert parse_pid_stat(buf) is None
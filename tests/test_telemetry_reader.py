@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from telemetry.reader import TelemetryReader
+from telemetry.sys_telemetry import get_cpu_freq, get_cpu_temp, get_cpu_voltage
+
+
+pytestmark = pytest.mark.fakehost(n_procs=10, n_cpus=4)
+
+
+def test_reader_matches_per_value_getters_across_updates(host):
+    reader = TelemetryReader()
+    assert reader.cpu.tolist() == [0, 1, 2, 3]
+    # Four cores share policy0: one descriptor each for V, T, f and stats
+    assert len(reader._fds) == 4
+
+    for _ in range(3):
+        host.advance(1.0)
+        t = reader.read()
+        assert t.voltage_v == get_cpu_voltage()
+        assert t.temperature_c == get_cpu_temp()
+        assert np.all(t.freq_hz == get_cpu_freq(0) * 1e6)
+    reader.close()
+
+
+def test_reader_falls_back_when_files_are_missing(host):
+    host.sys.path("class/regulator/regulator.0/microvolts").unlink()
+    t = TelemetryReader().read()
+    assert t.voltage_v == get_cpu_voltage()
+    assert t.freq_of([7]).tolist() == [get_cpu_freq(7) * 1e6]
+
+
+def test_frequency_is_time_in_state_average_over_window(host):
+    reader = TelemetryReader()
+    reader.read()
+
+    # 30 ticks at the lowest OPP, 10 at the highest; cur_freq is the last
+    host.time_in_state[0] += 30
+    host.time_in_state[-1] += 10
+    host._write_time_in_state()
+    f = host.freqs_khz
+    expected = (30 * f[0] + 10 * f[-1]) / 40 * 1e3
+    assert np.allclose(reader.read().freq_hz, expected)
+
+    # No stats tick elapsed: instantaneous scaling_cur_freq
+    assert np.all(reader.read().freq_hz == get_cpu_freq(0) * 1e6)
+    assert np.all(TelemetryReader(freq_source="cur").read().freq_hz
+                  == get_cpu_freq(0) * 1e6)
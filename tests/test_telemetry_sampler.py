@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+import pytest
+
+from telemetry.sampler import TelemetrySampler
+
+
+pytestmark = pytest.mark.fakehost(n_procs=1, n_cpus=2)
+
+
+def set_freq(host, khz):
+    host.sys.path("devices/system/cpu/cpufreq/policy0/scaling_cur_freq"
+                  ).write_text(f"{khz}\n")
+
+
+def test_window_mean_weights_dvfs_steps_by_time(host):
+    clock = iter([0, 100, 400])
+    ts = TelemetrySampler(capacity=8, clock_ns=lambda: next(clock))
+
+    for khz in (600_000, 1_500_000, 1_000_000):   # held 100, 300, ... ns
+        set_freq(host, khz)
+        ts.sample_once()
+
+    # [50, 500]: 50 ns @600 MHz, 300 @1500, 100 @1000
+    mean = ts.window_mean(50, 500)
+    expected = (50 * 600e6 + 300 * 1500e6 + 100 * 1000e6) / 450
+    assert np.allclose(mean.freq_hz, expected)
+    assert mean.cpu.tolist() == [0, 1]
+
+    # Window before any sample: shortened to start at the first one
+    assert np.allclose(ts.window_mean(-100, 100).freq_hz, 600e6)
+
+
+def test_ring_keeps_only_latest_capacity_samples(host):
+    clock = iter(range(0, 1000, 10))
+    ts = TelemetrySampler(capacity=4, clock_ns=lambda: next(clock))
+    for khz in (600_000, 750_000, 1_000_000, 1_200_000, 1_500_000, 600_000):
+        set_freq(host, khz)
+        ts.sample_once()
+
+    # One slot is reserved for the sample being written
+    t, _, _, freq = ts._history()
+    assert t.tolist() == [30, 40, 50]
+    assert ts.latest().freq_hz.tolist() == [600e6, 600e6]
+
+
+def test_background_thread_fills_buffer(host):
+    with TelemetrySampler(rate_hz=500.0) as ts:
+        time.sleep(0.05)
+        assert ts.latest() is not None
+        assert ts.latest().voltage_v == pytest.approx(0.9)
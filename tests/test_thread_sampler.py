@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+
+from power.power_state import get_thread_power_states
+from proc.thread_info import ThreadSampler
+
+
+pytestmark = pytest.mark.fakehost(n_procs=20, n_cpus=4, threads=3)
+
+
+def test_threads_sum_to_process_and_report_last_cpu(host):
+    pids = host.pids[:5].tolist()
+    sampler = ThreadSampler(pids, sample_delay=0.0)
+    sampler.sample()
+    host.advance(10.0)
+    state = get_thread_power_states(sampler)
+    cols = state.threads
+
+    assert len(cols.tid) == 15
+    for i, pid in enumerate(pids):
+        rows = cols.pid == pid
+        tids = sorted(cols.tid[rows].tolist())
+        assert tids == sorted(host.tid(pid, j) for j in range(3))
+        assert sorted(cols.last_cpu[rows].tolist()) == sorted(
+            (i + j) % host.n_cpus for j in range(3)
+        )
+
+    expected = 100.0 * host.util[:5] / host.n_cpus
+    assert np.allclose(state.process.cpu_percent, expected, rtol=0.2, atol=0.1)
+    assert np.isclose(state.core_mw.sum(), state.process.p_dyn_mw.sum())
+
+
+def test_thread_list_is_refreshed_only_on_change(host, monkeypatch):
+    pid = int(host.pids[0])
+    sampler = ThreadSampler([pid], sample_delay=0.0)
+    sampler.sample()
+
+    listed = []
+    real_listdir = os.listdir
+    monkeypatch.setattr(os, "listdir",
+                        lambda p: listed.append(p) or real_listdir(p))
+
+    host.advance(1.0)
+    sampler.sample()
+    assert listed == []
+
+    host.threads[0] = 5
+    host.advance(1.0)
+    assert len(sampler.sample()) == 5
+    assert len(listed) == 1
+
+    host.threads[0] = 2
+    host.advance(1.0)
+    assert sorted(r["tid"] for r in sampler.sample()) == [
+        host.tid(pid, 0), host.tid(pid, 1)
+    ]
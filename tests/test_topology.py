@@ -0,0 +1,59 @@
+import builtins
+
+import pytest
+
+from budget import enforcers
+from telemetry.reader import TelemetryReader
+from telemetry.topology import parse_cpu_list, topology
+
+
+pytestmark = pytest.mark.fakehost(n_procs=4, n_cpus=4)
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list("0-3,6,8-9") == (0, 1, 2, 3, 6, 8, 9)
+    assert parse_cpu_list("") == ()
+
+
+def test_topology_discovers_shared_policy_once(host):
+    topo = topology()
+    assert topo.online == (0, 1, 2, 3)
+    assert [p.name for p in topo.policies] == ["policy0"]
+    assert topo.policy_of(2).cpus == (0, 1, 2, 3)
+    assert topo.available_freqs_khz() == sorted(host.freqs_khz)
+    assert topo.cpu_thermal_zone().type == "cpu-thermal"
+    assert topology() is topo and topo.generation == 1
+
+
+def test_dvfs_writes_once_per_policy(host, monkeypatch):
+    written = []
+
+    def spy(path, mode="r", *args, **kwargs):
+        if "w" in mode:
+            written.append(path)
+        return builtins.open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr(enforcers, "open", spy, raising=False)
+    enforcers.apply_budget_dvfs(current_power_mw=2000, budget_mw=1000)
+    enforcers.reset_freq_cap()
+
+    policy = topology().policies[0]
+    assert written == [policy.attr("scaling_max_freq")] * 2
+    with open(policy.attr("scaling_max_freq")) as f:
+        assert int(f.read()) == policy.max_khz
+
+
+def test_invalidate_rediscovers_and_reader_reprobes(host):
+    reader = TelemetryReader()
+    assert reader.cpu.tolist() == [0, 1, 2, 3]
+
+    host.sys.path("devices/system/cpu/online").write_text("0-2\n")
+    topo = topology()
+    assert topo.online == (0, 1, 2, 3)      # not re-read until invalidated
+
+    topo.invalidate()
+    assert topology().online == (0, 1, 2)
+    assert topo.generation == 2
+    assert topo.policy_of(3) is None
+    assert reader.read().cpu.tolist() == [0, 1, 2]
+    reader.close()